@@ -0,0 +1,199 @@
+from morph.core import *
+from morph.selectors import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class MBitsetMatcher(object):
+    """
+    Matches all of the style rules of a Morph document against a list of
+    elements at once, using NumPy.
+
+    The features used by the selectors of the document - ids, class names and
+    element names - make up a vocabulary, and the elements are encoded as one
+    row of bits for each feature, with a bit for each element saying whether
+    it has that feature. The elements that match a compound selector are then
+    found by ANDing together the rows of its features, which NumPy does a
+    byte - eight elements - at a time.
+
+    Subelement selectors are handled a level of the tree at a time - an
+    element has an ancestor that matches a compound selector if its parent
+    matches it or its parent has such an ancestor. This is fastest for large,
+    flat documents.
+
+    Parameters
+    ----------
+    document : MDocument
+        The Morph document to match style rules from
+
+    Attributes
+    ----------
+    document : MDocument
+        The Morph document to match style rules from
+    vocabulary : dict
+        The row of each feature used by the selectors of the document, by
+        feature
+    """
+
+    def __init__(self, document):
+
+        if numpy == None:
+            raise ImportError("NumPy is needed to match style rules with bitsets.")
+
+        self.document = document
+        self.vocabulary = {}
+
+        self._rules = []
+
+        for sr in document.styleRules:
+            compounds = splitSelectors(sr.selectors)
+
+            for compound in compounds:
+                for s in compound:
+                    f = getSelectorFeature(s)
+
+                    if f != None and f not in self.vocabulary:
+                        self.vocabulary[f] = len(self.vocabulary)
+
+            self._rules.append(compounds)
+
+    def encodeElements(self, elements):
+        """
+        Encodes a list of elements as a matrix of bits, with a row for each 
+        feature in the vocabulary and a column for each element. Each row is 
+        packed into bytes, eight elements to a byte, lowest bit first, as 
+        with numpy.packbits(..., bitorder="little").
+        """
+        bits = numpy.zeros((len(self.vocabulary), (len(elements) + 7) // 8), dtype=numpy.uint8)
+
+        vocabulary = self.vocabulary
+        rows = []
+        columns = []
+
+        for i, element in enumerate(elements):
+            for f in getElementFeatures(element):
+                j = vocabulary.get(f)
+
+                if j != None:
+                    rows.append(j)
+                    columns.append(i)
+
+        if rows:
+            rows = numpy.array(rows, dtype=numpy.intp)
+            columns = numpy.array(columns, dtype=numpy.intp)
+
+            values = numpy.left_shift(1, columns % 8).astype(numpy.uint8)
+
+            numpy.bitwise_or.at(bits, (rows, columns // 8), values)
+
+        return bits
+
+    def _getLevels(self, elements):
+        """
+        Gets the index of the parent of each element in the list, or -1 if
+        its parent isn't in the list, and the indices of the elements at each
+        depth below the first, grouped by depth.
+        """
+        indices = {}
+        parents = numpy.full(len(elements), -1, dtype=numpy.intp)
+        depths = numpy.zeros(len(elements), dtype=numpy.intp)
+
+        for i, element in enumerate(elements):
+            indices[id(element)] = i
+
+            p = indices.get(id(element.parent), -1) if element.parent != None else -1
+
+            if p >= 0:
+                parents[i] = p
+                depths[i] = depths[p] + 1
+
+        levels = []
+
+        if len(elements) > 0:
+            order = numpy.argsort(depths, kind="stable")
+            boundaries = numpy.searchsorted(depths[order], numpy.arange(1, depths.max() + 1))
+
+            levels = [order[a:b] for a, b in zip(boundaries, list(boundaries[1:]) + [len(order)])]
+
+        return parents, levels
+
+    def _hasMatchingAncestor(self, matches, parents, levels):
+        """
+        Takes an array saying which elements match a compound selector, and
+        returns an array saying which elements have an ancestor that matches
+        it.
+        """
+        result = numpy.zeros(len(matches), dtype=bool)
+
+        for level in levels:
+            p = parents[level]
+            result[level] = matches[p] | result[p]
+
+        return result
+
+    def _matchCompoundSelector(self, bits, compound):
+        """
+        Gets the packed bits of the elements that match a compound selector.
+        """
+        matches = numpy.full(bits.shape[1], 0xFF, dtype=numpy.uint8)
+
+        for s in compound:
+            f = getSelectorFeature(s)
+
+            if f != None:
+                numpy.bitwise_and(matches, bits[self.vocabulary[f]], out=matches)
+
+        return matches
+
+    def matchElements(self, elements, packed=False):
+        """
+        Matches every style rule of the document against a list of elements, 
+        and returns a matrix of booleans with a row for each style rule, in 
+        document order, and a column for each element. If packed is True, 
+        each row is packed into bytes as in encodeElements, which uses an 
+        eighth of the memory.
+
+        The list of elements should be in document order, such as from 
+        iterateElements, and should include the ancestors of the elements, 
+        since ancestors that aren't in the list can't be matched by 
+        subelement selectors.
+        """
+        n = len(elements)
+        bits = self.encodeElements(elements)
+        result = numpy.zeros((len(self._rules), bits.shape[1]), dtype=numpy.uint8)
+
+        parents = None
+        levels = None
+        compoundMatches = {}
+
+        for i, compounds in enumerate(self._rules):
+            matches = None
+
+            for compound in compounds:
+                key = "".join(["{0}".format(s) for s in compound])
+
+                if key not in compoundMatches:
+                    compoundMatches[key] = self._matchCompoundSelector(bits, compound)
+
+                if matches is None:
+                    matches = compoundMatches[key]
+                else:
+                    if parents is None:
+                        parents, levels = self._getLevels(elements)
+
+                    # Work out which elements have a matching ancestor, one 
+                    # element per boolean, then pack them back into bits.
+                    a = numpy.unpackbits(matches, count=n, bitorder="little").astype(bool)
+                    a = self._hasMatchingAncestor(a, parents, levels)
+
+                    matches = compoundMatches[key] & numpy.packbits(a, bitorder="little")
+
+            result[i] = matches
+
+        if packed:
+            return result
+
+        return numpy.unpackbits(result, axis=1, count=n, bitorder="little").astype(bool)
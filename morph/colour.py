@@ -1,10 +1,46 @@
+import colorsys
+
+
+def getColourComponent(value, maximum=255):
+    """
+    Converts a colour component, which can be a plain number, a Morph number 
+    or a Morph percentage, into a number between 0 and the given maximum.
+    """
+    if hasattr(value, "value"):
+        if isinstance(value.value, str):
+            # A Morph number, which is already on the right scale.
+            return float(value.value)
+        else:
+            # A Morph percentage, which is stored as a fraction.
+            return value.value * maximum
+
+    return float(value)
+
+
+def clampColourComponent(value):
+    return min(255, max(0, int(round(value))))
 
 
 class MColour(object):
     """
     A base class for all Morph colour objects.
     """
-    pass
+
+    def toRGBA(self):
+        """
+        Gets the red, green, blue and alpha components of this colour, as 
+        integers between 0 and 255.
+        """
+        raise NotImplementedError()
+
+    def toPackedRGBA(self):
+        """
+        Gets this colour as a single 32-bit integer, with the red component in 
+        the most significant byte and the alpha component in the least.
+        """
+        r, g, b, a = self.toRGBA()
+
+        return (r << 24) | (g << 16) | (b << 8) | a
 
 
 class MRGBAColour(MColour):
@@ -23,6 +59,9 @@ class MRGBAColour(MColour):
     def __str__(self):
         return "#{:02X}{:02X}{:02X}{:02X}".format(self.r, self.g, self.b, self.a)
 
+    def toRGBA(self):
+        return tuple([clampColourComponent(getColourComponent(c)) for c in [self.r, self.g, self.b, self.a]])
+
 
 class MRGBColour(MRGBAColour):
     """
@@ -35,6 +74,10 @@ class MRGBColour(MRGBAColour):
     def __str__(self):
         return "#{:02X}{:02X}{:02X}".format(self.r, self.g, self.b)
 
+    def toRGBA(self):
+        # RGB colours are opaque.
+        return tuple([clampColourComponent(getColourComponent(c)) for c in [self.r, self.g, self.b]]) + (255,)
+
 
 class MHSLAColour(MColour):
     """
@@ -52,6 +95,15 @@ class MHSLAColour(MColour):
     def __str__(self):
         return "hsla({0}, {1}, {2}, {3})".format(self.h, self.s, self.l, self.a)
 
+    def toRGBA(self):
+        h = getColourComponent(self.h, 360) / 360
+        s = getColourComponent(self.s, 1)
+        l = getColourComponent(self.l, 1)
+
+        r, g, b = colorsys.hls_to_rgb(h % 1, l, s)
+
+        return (clampColourComponent(r * 255), clampColourComponent(g * 255), clampColourComponent(b * 255), clampColourComponent(getColourComponent(self.a)))
+
 
 class MHSLColour(MHSLAColour):
     """
@@ -64,6 +116,10 @@ class MHSLColour(MHSLAColour):
     def __str__(self):
         return "hsl({0}, {1}, {2})".format(self.h, self.s, self.l)
 
+    def toRGBA(self):
+        # HSL colours are opaque.
+        return super(MHSLColour, self).toRGBA()[:3] + (255,)
+
 
 class MCMYKColour(MColour):
     """
@@ -81,6 +137,11 @@ class MCMYKColour(MColour):
     def __str__(self):
         return "cmyk({0}, {1}, {2}, {3})".format(self.c, self.m, self.y, self.k)
 
+    def toRGBA(self):
+        c, m, y, k = [getColourComponent(v, 1) for v in [self.c, self.m, self.y, self.k]]
+
+        return (clampColourComponent(255 * (1 - c) * (1 - k)), clampColourComponent(255 * (1 - m) * (1 - k)), clampColourComponent(255 * (1 - y) * (1 - k)), 255)
+
 
 class MNamedColour(MColour):
     """
@@ -96,6 +157,10 @@ class MNamedColour(MColour):
     def __str__(self):
         return self.name
 
+    def toRGBA(self):
+        # Named colours are opaque.
+        return self.rgbaColour.toRGBA()[:3] + (255,)
+
 
 namedHTMLColours = {"Pink": ["#FFC0CB"],
                     "LightPink": ["#FFB6C1"],
@@ -255,3 +320,17 @@ for c in namedHTMLColours:
     namedColour.rgbaColour = rgbaColour
 
     namedColours[name] = namedColour
+
+
+def getNamedColour(name):
+    """
+    Gets a new colour object for a named colour. The objects in namedColours 
+    are shared, so they are never given out, in case they are changed.
+    """
+    namedColour = namedColours[name]
+    rgbaColour = namedColour.rgbaColour
+
+    c = MNamedColour(name)
+    c.rgbaColour = MRGBAColour(rgbaColour.r, rgbaColour.g, rgbaColour.b, rgbaColour.a)
+
+    return c
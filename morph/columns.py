@@ -0,0 +1,142 @@
+import functools
+
+from morph.core import *
+from morph.validation import apd, getColourFromText, propertySynonyms
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class MStyleColumns(object):
+    """
+    The values of some properties for a list of elements, as one NumPy array
+    per property.
+
+    The type of each column depends on the type of the property:
+
+    lengths - float64, in points, with NaN where the property doesn't apply
+    colours - uint32, as packed RGBA (see MColour.toPackedRGBA), with 0 where
+        the property doesn't apply
+    anything else - int32 category codes, which are indices into the list of
+        categories for the property, with -1 where the property doesn't apply
+
+    Attributes
+    ----------
+    columns : dict
+        The columns, by property name
+    categories : dict
+        The text values that the category codes stand for, by property name
+    """
+
+    def __init__(self):
+
+        self.columns = {}
+        self.categories = {}
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+
+def getPropertyType(name):
+    """
+    Gets the type of a property from the validation schema, or 'str' if the
+    property isn't in the schema.
+    """
+    name = propertySynonyms.get(name, name)
+
+    if name in apd:
+        return apd[name][1]
+
+    return "str"
+
+
+def _getLengthInPoints(value):
+    if isinstance(value, MLengthSet) and len(value.lengths) == 1:
+        value = value.lengths[0]
+
+    if isinstance(value, MLength):
+        return value.toPoints()
+
+    return numpy.nan
+
+
+@functools.lru_cache(maxsize=1024)
+def _getPackedColourFromText(text):
+    colour = getColourFromText(text)
+
+    if colour != None:
+        return colour.toPackedRGBA()
+
+    return 0
+
+
+def _getPackedColour(value):
+    if isinstance(value, str):
+        # The same few texts come up again and again, so each is only 
+        # imported once.
+        return _getPackedColourFromText(value)
+
+    if isinstance(value, MColour):
+        return value.toPackedRGBA()
+
+    return 0
+
+
+def getStyleColumns(styles, propertyNames):
+    """
+    Takes a list of computed styles and a list of property names, and returns
+    the values of the properties as an MStyleColumns object.
+
+    Elements often share computed styles, so each property is only looked up
+    and converted once for each distinct computed style, and the results are
+    then spread out over the elements by NumPy.
+    """
+    if numpy == None:
+        raise ImportError("NumPy is needed to get style properties as columns.")
+
+    # Work out which distinct computed style each element has.
+    rows = {}
+    uniqueStyles = []
+    indices = numpy.empty(len(styles), dtype=numpy.intp)
+
+    for i, style in enumerate(styles):
+        j = rows.get(id(style))
+
+        if j == None:
+            j = len(uniqueStyles)
+            rows[id(style)] = j
+            uniqueStyles.append(style)
+
+        indices[i] = j
+
+    columns = MStyleColumns()
+
+    for name in propertyNames:
+        values = [s.getPropertyValue(name) for s in uniqueStyles]
+        t = getPropertyType(name)
+
+        if t == "MLength":
+            column = numpy.array([_getLengthInPoints(v) for v in values], dtype=numpy.float64)
+        elif t == "MColour":
+            column = numpy.array([_getPackedColour(v) for v in values], dtype=numpy.uint32)
+        else:
+            categories = {}
+            codes = []
+
+            for v in values:
+                if v == None:
+                    codes.append(-1)
+                else:
+                    codes.append(categories.setdefault(str(v).strip(), len(categories)))
+
+            column = numpy.array(codes, dtype=numpy.int32)
+            columns.categories[name] = list(categories)
+
+        columns.columns[name] = column[indices]
+
+    return columns
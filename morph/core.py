@@ -1,4 +1,7 @@
+import hashlib
 import math
+import sys
+import weakref
 from morph.colour import *
 
 
@@ -25,8 +28,56 @@ class MProperty(object):
 
     def __init__(self, name="", value=""):
 
-        self.name = name
-        self.value = value
+        self._name = name
+        self._value = value
+        self._styleRules = None
+        self._fingerprint = None
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+        self._changed()
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._changed()
+
+    @property
+    def fingerprint(self):
+        """
+        A hash of the text of this style property, as 16 bytes, which is the 
+        same in every process. It is only worked out once, and is worked out 
+        again when the name or value is set, so values shouldn't be changed 
+        in place.
+        """
+        if self._fingerprint == None:
+            self._fingerprint = hashlib.blake2b(str(self).encode("utf-8"), digest_size=16).digest()
+
+        return self._fingerprint
+
+    def _changed(self):
+        self._fingerprint = None
+
+        # Let any style rules that are being watched know, so that document 
+        # indexes and fingerprints can be kept up to date.
+        if self._styleRules:
+            for sr in list(self._styleRules):
+                sr._propertyChanged(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_styleRules"] = None
+
+        return state
 
     def __str__(self):
         return "{0}: {1};".format(self.name.strip(), str(self.value).strip())
@@ -98,6 +149,17 @@ class MLengthUnit(object):
         return self.value.strip()
 
 
+# The number of points in each length unit.
+pointsPerLengthUnit = {
+    "pt": 1.0,
+    "pc": 12.0,
+    "in": 72.0,
+    "mm": 72.0 / 25.4,
+    "cm": 720.0 / 25.4,
+    "dm": 7200.0 / 25.4,
+    "m": 72000.0 / 25.4, }
+
+
 class MLength(object):
     """
     Represents a Morph length. A length consists of a magnitude and a length 
@@ -126,6 +188,12 @@ class MLength(object):
     def __str__(self):
         return "{0}{1}".format(self.number, self.unit)
 
+    def toPoints(self):
+        """
+        Gets the value of this length in points.
+        """
+        return float(self.number.value) * pointsPerLengthUnit[self.unit.value.strip()]
+
 
 class MLengthSet(object):
     """
@@ -233,6 +301,84 @@ class MSubelementSelector(object):
         return " "
 
 
+class MObservedList(list):
+    """
+    A list that tells its owner whenever it changes, by calling the owner's 
+    _listChanged method with the list and, if the change was to add items to 
+    the end of the list, the items added, or otherwise None.
+
+    Parameters
+    ----------
+    owner
+        The object to tell about changes
+    items : list
+        The items to start the list with
+    """
+
+    def __init__(self, owner, items=()):
+        super(MObservedList, self).__init__(items)
+
+        self.owner = owner
+
+    def __reduce__(self):
+        return (self.__class__, (self.owner, list(self)))
+
+    def append(self, item):
+        super(MObservedList, self).append(item)
+        self.owner._listChanged(self, [item])
+
+    def extend(self, items):
+        items = list(items)
+
+        super(MObservedList, self).extend(items)
+        self.owner._listChanged(self, items)
+
+    def __iadd__(self, items):
+        self.extend(items)
+
+        return self
+
+    def insert(self, index, item):
+        super(MObservedList, self).insert(index, item)
+        self.owner._listChanged(self, None)
+
+    def remove(self, item):
+        super(MObservedList, self).remove(item)
+        self.owner._listChanged(self, None)
+
+    def pop(self, index=-1):
+        item = super(MObservedList, self).pop(index)
+        self.owner._listChanged(self, None)
+
+        return item
+
+    def clear(self):
+        super(MObservedList, self).clear()
+        self.owner._listChanged(self, None)
+
+    def sort(self, *args, **kwargs):
+        super(MObservedList, self).sort(*args, **kwargs)
+        self.owner._listChanged(self, None)
+
+    def reverse(self):
+        super(MObservedList, self).reverse()
+        self.owner._listChanged(self, None)
+
+    def __setitem__(self, index, item):
+        super(MObservedList, self).__setitem__(index, item)
+        self.owner._listChanged(self, None)
+
+    def __delitem__(self, index):
+        super(MObservedList, self).__delitem__(index)
+        self.owner._listChanged(self, None)
+
+    def __imul__(self, n):
+        super(MObservedList, self).__imul__(n)
+        self.owner._listChanged(self, None)
+
+        return self
+
+
 class MStyleRule(object):
     """
     Represents a Morph style rule. A style rule consists of a list of 
@@ -248,12 +394,200 @@ class MStyleRule(object):
         A list of Morph selectors
     properties : list<MProperty>
         A list of Morph style properties
+    specificity : tuple<int>
+        The specificity of this style rule
+    selectorText : str
+        The text representation of the selectors of this style rule
+    fingerprint : bytes
+        A hash of the selectors and properties of this style rule
     """
 
     def __init__(self):
 
-        self.selectors = []
-        self.properties = []
+        self._selectors = MObservedList(self)
+        self._specificity = None
+        self._selectorText = None
+        self._properties = MObservedList(self)
+        self._documents = None
+        self._fingerprint = None
+        self._frozen = None
+
+    @property
+    def selectors(self):
+        return self._selectors
+
+    @selectors.setter
+    def selectors(self, value):
+        self._selectors = MObservedList(self, value)
+
+        self._listChanged(self._selectors, None)
+
+    @property
+    def properties(self):
+        return self._properties
+
+    @properties.setter
+    def properties(self, value):
+        self._properties = MObservedList(self, value)
+
+        self._listChanged(self._properties, None)
+
+    def __getstate__(self):
+        # Copies don't know which properties they are watching, so they work 
+        # out their fingerprint again.
+        state = self.__dict__.copy()
+        state["_documents"] = None
+        state["_fingerprint"] = None
+        state["_frozen"] = None
+
+        return state
+
+    def _addDocument(self, document):
+        """
+        Starts telling a document whenever this style rule changes.
+        """
+        if self._documents == None:
+            self._documents = weakref.WeakSet()
+
+        self._documents.add(document)
+        self._watchProperties()
+
+    def _watchProperties(self):
+        # Properties only hold weak references to the style rules watching 
+        # them, so style rules that no longer have a property, or that have 
+        # been thrown away, don't stay alive because of it.
+        for p in self._properties:
+            if p._styleRules == None:
+                p._styleRules = weakref.WeakSet()
+
+            p._styleRules.add(self)
+
+    @property
+    def fingerprint(self):
+        """
+        A hash of the selector text of this style rule and the fingerprints of 
+        its properties, as 16 bytes. It is only worked out once, and is worked 
+        out again when the selectors, the list of properties or any of the 
+        properties change. Working it out again only needs the fingerprints 
+        of the properties that have changed to be worked out again.
+        """
+        if self._fingerprint == None:
+            h = hashlib.blake2b(self.selectorText.encode("utf-8"), digest_size=16)
+
+            for p in self._properties:
+                h.update(p.fingerprint)
+
+            self._fingerprint = h.digest()
+            self._watchProperties()
+
+        return self._fingerprint
+
+    def freeze(self):
+        """
+        Gets an immutable copy of this style rule, as an MFrozenStyleRule - 
+        see morph.frozen. The copy is only made once, and is made again when 
+        the selectors, the list of properties or any of the properties 
+        change, so unchanged style rules are shared between the frozen 
+        copies of a document.
+        """
+        if self._frozen == None:
+            from morph.frozen import freezeStyleRule
+
+            self._frozen = freezeStyleRule(self)
+            self._watchProperties()
+
+        return self._frozen
+
+    def _changed(self):
+        self._fingerprint = None
+        self._frozen = None
+
+        if self._documents:
+            for d in list(self._documents):
+                d._styleRuleChanged(self)
+
+    def _listChanged(self, l, addedItems):
+        if l is self._selectors:
+            self._specificity = None
+            self._selectorText = None
+        elif self._documents or self._fingerprint != None or self._frozen != None:
+            self._watchProperties()
+
+        self._changed()
+
+    def _propertyChanged(self, _property):
+        if any(p is _property for p in self._properties):
+            self._changed()
+
+    @property
+    def specificity(self):
+        """
+        The specificity of this style rule, as a tuple of the number of id 
+        selectors, the number of class selectors and the number of element 
+        name selectors. When two style rules set the same property on an 
+        element, the one with the greater specificity wins.
+
+        The specificity is only calculated once, and is recalculated when the 
+        selectors are set or the list of selectors changes.
+        """
+        if self._specificity == None:
+            a = 0
+            b = 0
+            c = 0
+
+            for s in self._selectors:
+                if isinstance(s, MIdSelector):
+                    a += 1
+                elif isinstance(s, MClassSelector):
+                    b += 1
+                elif isinstance(s, MElementNameSelector):
+                    c += 1
+
+            self._specificity = (a, b, c)
+
+        return self._specificity
+
+    @property
+    def selectorText(self):
+        """
+        The text of the selectors of this style rule, such as 'div p.red'. 
+        Like the specificity, this is only worked out once.
+        """
+        if self._selectorText == None:
+            self._selectorText = "".join([str(s) for s in self._selectors])
+
+        return self._selectorText
+
+
+def getStyleRuleKey(styleRule, propertyTexts=None):
+    """
+    Gets a key for a style rule that is the same for any two style rules with 
+    the same selectors and properties. If a dictionary of the text of each 
+    property by name is given, such as from morph.diffing.getPropertyTexts, 
+    the key is made from that instead, so it doesn't depend on the order of 
+    the properties.
+    """
+    if propertyTexts != None:
+        return (styleRule.selectorText, tuple(sorted(propertyTexts.items())))
+
+    return (styleRule.selectorText, tuple(["{0}".format(p) for p in styleRule.properties]))
+
+
+def copyStyleRule(styleRule, properties=None):
+    """
+    Makes a new style rule with the selectors of a style rule and copies of 
+    its properties, or of the given properties instead, so that the new style 
+    rule can be changed without changing the original.
+    """
+    if properties == None:
+        properties = styleRule.properties
+
+    sr = MStyleRule()
+
+    sr.selectors = list(styleRule.selectors)
+    sr.properties = [MProperty(p.name, p.value) for p in properties]
+
+    return sr
 
 
 class MDocument(object):
@@ -265,23 +599,504 @@ class MDocument(object):
     ----------
     styleRules : list<MStyleRule>
         A list of style rules within the document
+    includes : list<tuple>
+        The files included by the document with include directives, as pairs 
+        of the index of the style rule that each include directive comes 
+        before and the path of the file - see morph.includes
+    fingerprint : bytes
+        A hash of the style rules and includes of this document
+    """
+
+    def __init__(self):
+
+        self._styleRules = MObservedList(self)
+        self._includes = MObservedList(self)
+        self._indexes = None
+        self._fingerprint = None
+        self._hashTree = None
+
+    @property
+    def styleRules(self):
+        return self._styleRules
+
+    @styleRules.setter
+    def styleRules(self, value):
+        self._styleRules = MObservedList(self, value)
+        self._indexes = None
+        self._fingerprint = None
+        self._hashTree = None
+
+    @property
+    def includes(self):
+        return self._includes
+
+    @includes.setter
+    def includes(self, value):
+        self._includes = MObservedList(self, value)
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        """
+        A hash of the style rules and includes of this document, as 16 bytes, 
+        which can be used as a cache key for anything worked out from the 
+        document.
+
+        The fingerprints of the style rules are combined with a hash tree - 
+        see MHashTree - so when a style rule changes, only its fingerprint, 
+        the hashes on the path from it to the root of the tree and the 
+        fingerprint of the document are worked out again. Inserting, 
+        removing or moving style rules anywhere but at the end of the list 
+        means the tree is built again.
+
+        Keeping fingerprints up to date costs memory: every property and 
+        style rule keeps its fingerprint once it has been worked out, each 
+        property keeps weak references to the style rules that contain it, 
+        and the tree keeps about two hashes and a position for each style 
+        rule.
+        """
+        if self._fingerprint == None:
+            if self._hashTree == None:
+                self._hashTree = MHashTree(self._styleRules)
+
+                for sr in self._styleRules:
+                    sr._addDocument(self)
+
+            h = hashlib.blake2b(self._hashTree.getRoot(), digest_size=16)
+
+            for i, path in self._includes:
+                h.update("@include {0} {1};".format(i, path).encode("utf-8"))
+
+            self._fingerprint = h.digest()
+
+        return self._fingerprint
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_indexes"] = None
+        state["_fingerprint"] = None
+        state["_hashTree"] = None
+
+        return state
+
+    def getStyleRulesBySelectorText(self, selectorText):
+        """
+        Gets the style rules with the given selector text, such as 'div p.red', 
+        in document order.
+        """
+        return list(self._getIndexes().bySelectorText.get(selectorText, []))
+
+    def getStyleRulesBySelector(self, selector):
+        """
+        Gets the style rules whose selectors include the given simple selector, 
+        such as '.red', '#big' or 'p', in document order.
+        """
+        return list(self._getIndexes().bySelector.get("{0}".format(selector), []))
+
+    def getStyleRulesByPropertyName(self, name):
+        """
+        Gets the style rules that set the given property, in document order.
+        """
+        return list(self._getIndexes().byPropertyName.get(name, []))
+
+    def _getIndexes(self):
+        """
+        Gets the indexes of the style rules, building them if they haven't been 
+        built since the list of style rules last changed.
+        """
+        if self._indexes == None:
+            indexes = MDocumentIndexes()
+
+            for sr in self._styleRules:
+                indexes.add(sr)
+                sr._addDocument(self)
+
+            self._indexes = indexes
+
+        return self._indexes
+
+    def _listChanged(self, l, addedItems):
+        self._fingerprint = None
+
+        if l is self._includes:
+            return
+
+        if addedItems == None:
+            # Style rules have been inserted, removed or moved, so the indexes 
+            # and the hash tree will be built again the next time they are 
+            # needed.
+            self._indexes = None
+            self._hashTree = None
+            return
+
+        if self._indexes != None or self._hashTree != None:
+            for sr in addedItems:
+                sr._addDocument(self)
+
+        if self._indexes != None:
+            for sr in addedItems:
+                self._indexes.add(sr)
+
+        if self._hashTree != None:
+            self._hashTree.extend(addedItems)
+
+    def _styleRuleChanged(self, styleRule):
+        self._fingerprint = None
+
+        if self._hashTree != None:
+            self._hashTree.update(styleRule)
+
+        if self._indexes != None and not self._indexes.update(styleRule):
+            self._indexes = None
+
+    def freeze(self):
+        """
+        Gets an immutable snapshot of this document, as an MFrozenDocument - 
+        see morph.frozen. Snapshots can be shared between threads without 
+        copying or locking. Each style rule keeps its frozen copy until it 
+        changes, so freezing a document again after changing it only copies 
+        the style rules that have changed.
+        """
+        from morph.frozen import MFrozenDocument
+
+        return MFrozenDocument(tuple([sr.freeze() for sr in self._styleRules]), tuple([tuple(i) for i in self._includes]))
+
+    @staticmethod
+    def merge(*documents, collapse=False):
+        """
+        Merges some Morph documents into a new document, as if their style 
+        rules were concatenated in the order given, so later documents 
+        override earlier ones.
+
+        Style rules that are identical to a later style rule are left out, 
+        which doesn't change the result of the cascade, since the later one 
+        always wins anyway. If collapse is True, properties that are 
+        overridden by the same property in a later style rule with the same 
+        selectors, or later in the same style rule, are left out too, along 
+        with any style rules that are left with no properties.
+
+        The documents aren't changed, and the new document has copies of 
+        their style rules, so it doesn't share anything that can be changed 
+        with them.
+        """
+        styleRules = []
+        keys = set()
+
+        # Go backwards, so that the last of each set of identical style rules 
+        # is the one that is kept.
+        for d in reversed(documents):
+            for sr in reversed(d.styleRules):
+                key = getStyleRuleKey(sr)
+
+                if key not in keys:
+                    keys.add(key)
+                    styleRules.append(copyStyleRule(sr))
+
+        if collapse:
+            collapsedStyleRules = []
+
+            # The names of the properties set by later style rules, by 
+            # selector text.
+            names = {}
+
+            for sr in styleRules:
+                overridden = names.setdefault(sr.selectorText, set())
+                properties = []
+
+                for p in reversed(sr.properties):
+                    if p.name not in overridden:
+                        overridden.add(p.name)
+                        properties.append(p)
+
+                if len(properties) == len(sr.properties):
+                    collapsedStyleRules.append(sr)
+                elif properties:
+                    # The style rule is already a copy, so it can be changed.
+                    sr.properties = list(reversed(properties))
+                    collapsedStyleRules.append(sr)
+
+            styleRules = collapsedStyleRules
+
+        styleRules.reverse()
+
+        d = MDocument()
+
+        d.styleRules = styleRules
+
+        return d
+
+
+def getIndexKeys(styleRule):
+    """
+    Gets the keys that a style rule is indexed by in a document - its selector 
+    text, the text of each of its simple selectors, and the names of the 
+    properties it sets.
+    """
+    texts = [str(s) for s in styleRule.selectors]
+
+    selectors = set(texts)
+    selectors.discard(" ")
+
+    names = set([p.name for p in styleRule.properties])
+
+    return ("".join(texts), selectors, names)
+
+
+class MDocumentIndexes(object):
+    """
+    Indexes of the style rules of a Morph document, which are built when the 
+    document is first queried, and kept up to date as style rules are added 
+    to the end of the document or changed. Each index is a dictionary of 
+    lists of style rules, in document order.
+
+    Attributes
+    ----------
+    bySelectorText : dict
+        The style rules with each selector text
+    bySelector : dict
+        The style rules with each simple selector, by the text of the 
+        simple selector
+    byPropertyName : dict
+        The style rules that set each property, by property name
     """
 
     def __init__(self):
 
-        self.styleRules = []
+        self.bySelectorText = {}
+        self.bySelector = {}
+        self.byPropertyName = {}
+
+        self._positions = {}
+        self._keys = {}
+        self._count = 0
+        self._hasDuplicates = False
+
+    def _getIndexes(self, keys):
+        selectorText, selectors, names = keys
+
+        yield (self.bySelectorText, selectorText)
+
+        for s in selectors:
+            yield (self.bySelector, s)
+
+        for name in names:
+            yield (self.byPropertyName, name)
+
+    def add(self, styleRule):
+        """
+        Adds a style rule to the end of the indexes.
+        """
+        if id(styleRule) in self._positions:
+            self._hasDuplicates = True
+
+        self._positions[id(styleRule)] = self._count
+        self._count += 1
+
+        keys = getIndexKeys(styleRule)
+        self._keys[id(styleRule)] = keys
+
+        selectorText, selectors, names = keys
+
+        self.bySelectorText.setdefault(selectorText, []).append(styleRule)
+
+        bySelector = self.bySelector
+
+        for s in selectors:
+            bySelector.setdefault(s, []).append(styleRule)
+
+        byPropertyName = self.byPropertyName
+
+        for name in names:
+            byPropertyName.setdefault(name, []).append(styleRule)
+
+    def update(self, styleRule):
+        """
+        Moves a style rule that has changed to the right places in the 
+        indexes. Returns False if the indexes can't be updated, because the 
+        style rule is in the document more than once, and need building 
+        again.
+        """
+        oldKeys = self._keys.get(id(styleRule))
+
+        if oldKeys == None:
+            return True
+
+        if self._hasDuplicates:
+            return False
+
+        newKeys = getIndexKeys(styleRule)
+        self._keys[id(styleRule)] = newKeys
+
+        position = self._positions[id(styleRule)]
+
+        for index, key in self._getIndexes(oldKeys):
+            index[key].remove(styleRule)
+
+            if not index[key]:
+                del index[key]
+
+        for index, key in self._getIndexes(newKeys):
+            styleRules = index.setdefault(key, [])
+            i = len(styleRules)
+
+            while i > 0 and self._positions[id(styleRules[i - 1])] > position:
+                i -= 1
+
+            styleRules.insert(i, styleRule)
+
+        return True
+
+
+class MHashTree(object):
+    """
+    A hash tree of the fingerprints of a list of style rules, which can be 
+    kept up to date as style rules change or are added to the end of the 
+    list, only hashing again what has changed.
+
+    The fingerprints of the style rules are the leaves of the tree, each 
+    node above them is a hash of a pair of neighbouring nodes, or of the 
+    last node of a level on its own if there is an odd number of them, and 
+    the root is the single node at the top. When a style rule changes, only 
+    the nodes on the path from its leaf to the root are hashed again, which 
+    is about log2(n) hashes for n style rules.
+
+    Parameters
+    ----------
+    styleRules : list<MStyleRule>
+        The style rules to start the tree with
+
+    Attributes
+    ----------
+    levels : list<list<bytes>>
+        The nodes of each level of the tree, starting with the fingerprints 
+        of the style rules
+    """
+
+    def __init__(self, styleRules=()):
+
+        self.levels = [[]]
+
+        self._styleRules = []
+        self._positions = {}
+        self._dirty = set()
+
+        self.extend(styleRules)
+
+    def extend(self, styleRules):
+        """
+        Adds style rules to the end of the tree.
+        """
+        for sr in styleRules:
+            i = len(self._styleRules)
+
+            self._styleRules.append(sr)
+            self._positions.setdefault(id(sr), []).append(i)
+            self.levels[0].append(None)
+            self._dirty.add(i)
+
+    def update(self, styleRule):
+        """
+        Marks the leaves of a style rule that has changed, so that they are 
+        hashed again the next time the root is needed.
+        """
+        self._dirty.update(self._positions.get(id(styleRule), []))
+
+    def getRoot(self):
+        """
+        Gets the root of the tree, hashing again the nodes above any style 
+        rules that have changed or been added since it was last worked out. 
+        The root of an empty tree is an empty string of bytes.
+        """
+        leaves = self.levels[0]
+
+        if not leaves:
+            return b""
+
+        dirty = self._dirty
+
+        for i in dirty:
+            leaves[i] = self._styleRules[i].fingerprint
+
+        level = 0
+
+        while len(self.levels[level]) > 1:
+            nodes = self.levels[level]
+            n = (len(nodes) + 1) // 2
+
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+
+            parents = self.levels[level + 1]
+            parents.extend([None] * (n - len(parents)))
+
+            dirty = set([i // 2 for i in dirty])
+
+            for i in dirty:
+                h = hashlib.blake2b(nodes[2 * i], digest_size=16)
+
+                if 2 * i + 1 < len(nodes):
+                    h.update(nodes[2 * i + 1])
+
+                parents[i] = h.digest()
+
+            level += 1
+
+        self._dirty = set()
+
+        return self.levels[level][0]
 
 
 class MExporter(object):
     """
     Handles converting Morph objects into their text representation.
+
+    Parameters
+    ----------
+    groupSelectors : bool
+        Whether to export consecutive style rules with the same properties as
+        one style rule with comma-separated selectors
     """
 
+    def __init__(self, groupSelectors=False):
+
+        self.groupSelectors = groupSelectors
+
     def exportDocument(self, document):
-        return "".join([self.exportStyleRule(sr) for sr in document.styleRules])
+        includes = {}
+
+        for i, path in document.includes:
+            includes.setdefault(i, []).append(path)
+
+        texts = []
+        styleRules = document.styleRules
+        i = 0
+
+        while i <= len(styleRules):
+            for path in includes.get(i, []):
+                texts.append(self.exportInclude(path))
+
+            if i == len(styleRules):
+                break
+
+            # Take in the following style rules with the same properties, up
+            # to the next include directive.
+            pp = self.exportProperties(styleRules[i].properties)
+            selectorTexts = [styleRules[i].selectorText]
+            i += 1
+
+            while self.groupSelectors and i < len(styleRules) and i not in includes and self.exportProperties(styleRules[i].properties) == pp:
+                selectorTexts.append(styleRules[i].selectorText)
+                i += 1
+
+            texts.append(", ".join(selectorTexts) + " {\n" + pp + "}\n\n")
+
+        return "".join(texts)
+
+    def exportInclude(self, path):
+        return "@include \"{0}\";\n\n".format(path)
 
     def exportStyleRule(self, styleRule):
-        ss = "".join(["{0}".format(s) for s in styleRule.selectors])
+        ss = styleRule.selectorText
         pp = self.exportProperties(styleRule.properties)
         t = ss + " {\n" + pp + "}\n\n"
         return t
@@ -293,12 +1108,12 @@ class MExporter(object):
             return "".join(["\t{0}\n".format(p) for p in properties])
 
 
-def exportMorphDocument(document):
+def exportMorphDocument(document, groupSelectors=False):
     """
     A helper function that takes a Morph document and returns its text 
     representation.
     """
-    exporter = MExporter()
+    exporter = MExporter(groupSelectors)
 
     return exporter.exportDocument(document)
 
@@ -363,7 +1178,7 @@ class MorphSyntaxError(Exception):
     """
 
     def __init__(self, message):
-        super(MorpheSyntaxError, self).__init__(message)
+        super(MorphSyntaxError, self).__init__(message)
 
 
 def isAlphanumeric(c):
@@ -385,15 +1200,56 @@ def isHexadecimalDigit(c):
 
 
 class MImporter(object):
-    _lengthUnits = ["mm", "cm", "dm", "m", "pt", "in", "pc"]
+    """
+    Imports Morph documents from strings.
+
+    Parameters
+    ----------
+    validator : MValidator
+        If given, each property is checked against the validator's schema as 
+        soon as it is imported, and a MorphValidationError is raised for the 
+        first invalid property, so that a document doesn't need validating 
+        separately afterwards
+    canonicaliseNames : bool
+        Whether to replace the names of properties with their canonical names, 
+        such as 'font-colour' for 'font-color', as they are imported - see 
+        morph.validation.canonicalPropertyNames
+    """
+
+    # A tuple rather than a list, since it is shared by every importer on 
+    # every thread.
+    _lengthUnits = ("mm", "cm", "dm", "m", "pt", "in", "pc")
+
+    def __init__(self, validator=None, canonicaliseNames=False):
+
+        self.validator = validator
+        self.canonicaliseNames = canonicaliseNames
+
+        self._canonicalNames = None
+
+        if canonicaliseNames:
+            # Imported here, since morph.validation imports this module.
+            from morph.validation import canonicalPropertyNames
+
+            self._canonicalNames = canonicalPropertyNames
 
     def importDocument(self, inputText):
         marker = MMarker()
 
         styleRules = []
+        includes = []
 
         while True:
-            sr = self._getStyleRules(inputText, marker)
+            path = self._getInclude(inputText, marker)
+
+            if path != None:
+                includes.append((len(styleRules), path))
+                continue
+
+            # The index of the style rule is passed down rather than kept 
+            # by the importer, so that importers don't change while importing 
+            # and can be shared between threads.
+            sr = self._getStyleRules(inputText, marker, len(styleRules))
 
             if sr != None:
                 styleRules += sr
@@ -403,19 +1259,63 @@ class MImporter(object):
         d = MDocument()
 
         d.styleRules = styleRules
+        d.includes = includes
 
         return d
 
-    def _getStyleRules(self, inputText, marker):
+    def _getInclude(self, inputText, marker):
+        """
+        Gets an include directive, such as @include "base.morph";, at the 
+        current position and returns the path of the included file.
+        """
+        m = marker.copy()
+
+        self._getWhiteSpace(inputText, m)
+
+        if cut(inputText, m.p, 8) != "@include":
+            return None
+
+        m.p += 8
+
+        self._getWhiteSpace(inputText, m)
+
+        # The path must be in single or double quotes.
+        q = cut(inputText, m.p)
+
+        if q not in "\"'" or q == "":
+            raise MorphSyntaxError("An include directive must have a path in quotes.")
+
+        end = inputText.find(q, m.p + 1)
+
+        if end < 0:
+            raise MorphSyntaxError("The path of an include directive must end with a quote.")
+
+        path = inputText[m.p + 1:end]
+
+        m.p = end + 1
+
+        self._getWhiteSpace(inputText, m)
+
+        if cut(inputText, m.p) != ";":
+            raise MorphSyntaxError("An include directive must end with a semi-colon.")
+
+        m.p += 1
+
+        marker.p = m.p
+
+        return path
+
+    def _getStyleRules(self, inputText, marker, styleRuleIndex=None):
         """
-        Gets a style rule at the current position and returns it.
+        Gets a style rule at the current position and returns it. The index 
+        of the style rule in the document is given to any validation error.
         """
         m = marker.copy()
 
         # First there should be some sets of selectors.
         selectorSets = self._getSelectorSets(inputText, m)
         # Then get a set of properties.
-        properties = self._getProperties(inputText, m)
+        properties = self._getProperties(inputText, m, styleRuleIndex)
 
         # If either the selectors or the properties are none, then there isn't
         # a complete style rule at the current position, so return nothing.
@@ -611,7 +1511,7 @@ class MImporter(object):
 
         return s
 
-    def _getProperties(self, inputText, marker):
+    def _getProperties(self, inputText, marker, styleRuleIndex=None):
         """
         Gets a set of properties at the current position and returns it.
         """
@@ -635,6 +1535,9 @@ class MImporter(object):
             p = self._getProperty(inputText, m)
 
             if p != None:
+                if self.validator != None:
+                    self._validateProperty(p, styleRuleIndex, len(properties))
+
                 properties.append(p)
             else:
                 break
@@ -666,6 +1569,9 @@ class MImporter(object):
             p = self._getProperty(inputText, m)
 
             if p != None:
+                if self.validator != None:
+                    self._validateProperty(p, None, len(properties))
+
                 properties.append(p)
             else:
                 break
@@ -718,10 +1624,31 @@ class MImporter(object):
 
         marker.p = m.p
 
-        p = MProperty(name.strip(), value)
+        name = name.strip()
+
+        if self._canonicalNames != None:
+            # Names that aren't in the schema are interned too, so that all 
+            # property names can be looked up equally quickly.
+            c = self._canonicalNames.get(name)
+            name = c if c != None else sys.intern(name)
+
+        p = MProperty(name, value)
 
         return p
 
+    def _validateProperty(self, _property, styleRuleIndex, propertyIndex):
+        """
+        Checks a property with the validator, and raises a validation error 
+        if it is invalid.
+        """
+        message = self.validator.validateProperty(_property)
+
+        if message != None:
+            # Imported here, since morph.validation imports this module.
+            from morph.validation import MorphValidationError
+
+            raise MorphValidationError(message, styleRuleIndex, propertyIndex)
+
     def _getPropertyName(self, inputText, marker):
         """
         Gets a property name at the current position and returns it.
@@ -796,7 +1723,7 @@ class MImporter(object):
         t = t.strip()
 
         if t in namedColours:
-            return namedColours[t]
+            return getNamedColour(t)
 
         return t
 
@@ -814,7 +1741,7 @@ class MImporter(object):
                 return None
 
             if len(ns) != 4:
-                raise MorpheSyntaxError("A HSLA colour must have four values.")
+                raise MorphSyntaxError("A HSLA colour must have four values.")
 
             h = ns[0]
             s = ns[1]
@@ -834,7 +1761,7 @@ class MImporter(object):
                 return None
 
             if len(ns) != 3:
-                raise MorpheSyntaxError("A HSL colour must have three values.")
+                raise MorphSyntaxError("A HSL colour must have three values.")
 
             h = ns[0]
             s = ns[1]
@@ -852,7 +1779,7 @@ class MImporter(object):
         if hn != None:
 
             if len(hn) != 6 and len(hn) != 8:
-                raise MorpheSyntaxError("'#{0}' is not a valid hexadecimal colour code.".format(hn))
+                raise MorphSyntaxError("'#{0}' is not a valid hexadecimal colour code.".format(hn))
 
             r = int(hn[0:2], 16)
             g = int(hn[2:4], 16)
@@ -880,7 +1807,7 @@ class MImporter(object):
                 return None
 
             if len(s) != 4:
-                raise MorpheSyntaxError("An RGBA colour must have four values.")
+                raise MorphSyntaxError("An RGBA colour must have four values.")
 
             r = s[0]
             g = s[1]
@@ -905,7 +1832,7 @@ class MImporter(object):
                 return None
 
             if len(s) != 3:
-                raise MorpheSyntaxError("An RGB colour must have three values.")
+                raise MorphSyntaxError("An RGB colour must have three values.")
 
             r = s[0]
             g = s[1]
@@ -925,12 +1852,12 @@ class MImporter(object):
             v = int(value.value)
 
             if v < 0 or v > 255:
-                raise MorpheSyntaxError("RGBA colour values must be between 0 and 255.")
+                raise MorphSyntaxError("RGBA colour values must be between 0 and 255.")
         elif isinstance(value, MPercentage):
             v = value.value * 100
 
             if v < 0 or v > 100:
-                raise MorpheSyntaxError("RGBA colour values must be between 0%% and 100%%.")
+                raise MorphSyntaxError("RGBA colour values must be between 0%% and 100%%.")
 
     def _getHexadecimalNumber(self, inputText, marker):
         m = marker.copy()
@@ -997,7 +1924,7 @@ class MImporter(object):
                 m.p += 1
                 break
             else:
-                raise MorpheSyntaxError("Expected a comma or a closing bracket.")
+                raise MorphSyntaxError("Expected a comma or a closing bracket.")
 
         return numbers
 
@@ -1134,7 +2061,7 @@ class MImporter(object):
             # If all that was found was a single decimal point, or if there
             # was more than one decimal point, then the number is not a valid
             # number, so raise a Morphe syntax error.
-            raise MorpheSyntaxError("'{0}' is not a valid number.".format(t))
+            raise MorphSyntaxError("'{0}' is not a valid number.".format(t))
 
         # Otherwise return the number.
         number = MNumber(t)
@@ -1197,31 +2124,57 @@ class MImporter(object):
         return t
 
 
-def importMorphDocument(document):
+def getDefaultValidator(validate=True):
+    """
+    A helper function that gets the validator for the default schema if 
+    validate is True, or None otherwise, to give to an MImporter.
+    """
+    if not validate:
+        return None
+
+    # Imported here, since morph.validation imports this module.
+    from morph.validation import defaultValidator
+
+    return defaultValidator
+
+
+def importMorphDocument(document, validate=False, canonicaliseNames=False):
     """
     A helper function that takes a Morph document as a string and returns a 
-    Morph document object.
+    Morph document object. If validate is True, the properties are checked 
+    against the default schema as they are imported. If canonicaliseNames is 
+    True, synonyms of property names are replaced with their canonical names.
     """
-    importer = MImporter()
+    importer = MImporter(getDefaultValidator(validate), canonicaliseNames)
 
     return importer.importDocument(document)
 
 
-def importMorphDocumentFromFile(filePath):
+def importMorphDocumentFromFile(filePath, validate=False, canonicaliseNames=False):
     """
     A helper function that imports a Morph document from a file.
     """
     with open(filePath, "r") as fo:
         data = fo.read()
 
-        return importMorphDocument(data)
+        return importMorphDocument(data, validate, canonicaliseNames)
 
 
-def importMorphProperties(properties):
+def importMorphProperties(properties, validate=False, canonicaliseNames=False):
     """
     A helper function that gets a list of style properties from a string. 
     Useful for importing inline style properties.
     """
-    importer = MImporter()
+    importer = MImporter(getDefaultValidator(validate), canonicaliseNames)
 
     return importer._getInlineProperties(properties, MMarker())
+
+
+def importMorphValue(value):
+    """
+    A helper function that gets a property value, such as a length or a 
+    colour, from a string, in the same way as the value of a property is 
+    imported. Text that isn't a length, a number or a colour is returned as 
+    a string.
+    """
+    return MImporter()._getPropertyValue(value, MMarker())
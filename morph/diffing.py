@@ -0,0 +1,221 @@
+import bisect
+from morph.core import *
+from morph.validation import canonicalPropertyNames
+
+
+def getPropertyTexts(styleRule):
+    """
+    Gets the canonical text of each property a style rule sets, by canonical
+    property name. Synonyms are replaced with their canonical names, and if a
+    property is set more than once, the last value wins, as in the cascade.
+    """
+    getCanonicalName = canonicalPropertyNames.get
+    texts = {}
+
+    for p in styleRule.properties:
+        name = p.name.strip()
+        value = p.value
+
+        texts[getCanonicalName(name, name)] = value.strip() if isinstance(value, str) else str(value).strip()
+
+    return texts
+
+
+def getStyleRuleDiffKey(styleRule):
+    """
+    Gets a key for a style rule that is the same for any two style rules with
+    the same selector text that set the same properties to the same values,
+    whatever order they set them in.
+    """
+    return getStyleRuleKey(styleRule, getPropertyTexts(styleRule))
+
+
+class MStyleRuleChange(object):
+    """
+    A style rule that has kept its selectors but had some of its properties
+    changed between two versions of a document.
+
+    Parameters
+    ----------
+    oldStyleRule : MStyleRule
+        The style rule in the old version of the document
+    newStyleRule : MStyleRule
+        The style rule in the new version of the document
+    oldProperties : dict
+        The canonical text of each property of the old style rule, by name
+    newProperties : dict
+        The canonical text of each property of the new style rule, by name
+
+    Attributes
+    ----------
+    oldStyleRule : MStyleRule
+        The style rule in the old version of the document
+    newStyleRule : MStyleRule
+        The style rule in the new version of the document
+    addedProperties : list<str>
+        The names of the properties that have been added
+    removedProperties : list<str>
+        The names of the properties that have been removed
+    changedProperties : list<str>
+        The names of the properties whose values have changed
+    """
+
+    def __init__(self, oldStyleRule, newStyleRule, oldProperties, newProperties):
+
+        self.oldStyleRule = oldStyleRule
+        self.newStyleRule = newStyleRule
+        self.addedProperties = [n for n in newProperties if n not in oldProperties]
+        self.removedProperties = [n for n in oldProperties if n not in newProperties]
+        self.changedProperties = [n for n in newProperties if n in oldProperties and newProperties[n] != oldProperties[n]]
+
+
+class MDocumentDiff(object):
+    """
+    The differences between two versions of a Morph document - see
+    diffMorphDocuments.
+
+    Attributes
+    ----------
+    addedStyleRules : list<MStyleRule>
+        The style rules of the new version that aren't in the old version,
+        in document order
+    removedStyleRules : list<MStyleRule>
+        The style rules of the old version that aren't in the new version,
+        in document order
+    modifiedStyleRules : list<MStyleRuleChange>
+        The style rules whose properties have changed, in the order of the
+        new version
+    movedStyleRules : list<tuple>
+        The style rules that are in both versions but in a different order
+        relative to the others, as pairs of the old and new style rule, in
+        the order of the new version
+    unchangedCount : int
+        The number of style rules with the same selectors and properties in 
+        both versions, including any that have moved
+    """
+
+    def __init__(self):
+
+        self.addedStyleRules = []
+        self.removedStyleRules = []
+        self.modifiedStyleRules = []
+        self.movedStyleRules = []
+        self.unchangedCount = 0
+
+    @property
+    def hasChanges(self):
+        return bool(self.addedStyleRules or self.removedStyleRules or self.modifiedStyleRules or self.movedStyleRules)
+
+
+def _getMovedIndices(oldIndices):
+    """
+    Takes the old index of each style rule that is in both versions, in the
+    order of the new version, and returns the positions in the list of the
+    style rules that have moved. The longest run of style rules that are
+    still in the same order is taken not to have moved, and is found in
+    O(n log n) time.
+    """
+    # tails[k] is the position of the smallest old index that ends an
+    # increasing run of length k + 1, and previous links each position to the
+    # one before it in its run.
+    tails = []
+    tailValues = []
+    previous = [-1] * len(oldIndices)
+
+    for i, v in enumerate(oldIndices):
+        k = bisect.bisect_left(tailValues, v)
+
+        if k > 0:
+            previous[i] = tails[k - 1]
+
+        if k == len(tails):
+            tails.append(i)
+            tailValues.append(v)
+        else:
+            tails[k] = i
+            tailValues[k] = v
+
+    inOrder = set()
+    i = tails[-1] if tails else -1
+
+    while i >= 0:
+        inOrder.add(i)
+        i = previous[i]
+
+    return [i for i in range(len(oldIndices)) if i not in inOrder]
+
+
+def diffMorphDocuments(oldDocument, newDocument):
+    """
+    Compares two versions of a Morph document, and returns the style rules
+    that have been added, removed, moved and modified as an MDocumentDiff.
+
+    Style rules are matched by hashing their selector text and the canonical
+    text of their properties, so matching takes linear time. Style rules
+    that are identical in both versions are matched first, and then any
+    remaining style rules with the same selector text are matched in order
+    and counted as modified.
+    """
+    diff = MDocumentDiff()
+
+    oldRules = oldDocument.styleRules
+    newRules = newDocument.styleRules
+
+    oldKeys = [getStyleRuleDiffKey(sr) for sr in oldRules]
+
+    # The old style rules with each key, in reverse order, so that they can
+    # be matched from the front by popping from the end.
+    unmatchedByKey = {}
+
+    for i in range(len(oldRules) - 1, -1, -1):
+        unmatchedByKey.setdefault(oldKeys[i], []).append(i)
+
+    # The old index each new style rule is matched to, if any.
+    matches = [None] * len(newRules)
+    modified = [False] * len(newRules)
+    matchedOldRules = [False] * len(oldRules)
+
+    unmatchedNewRules = []
+
+    for j, sr in enumerate(newRules):
+        indices = unmatchedByKey.get(getStyleRuleDiffKey(sr))
+
+        if indices:
+            i = indices.pop()
+            matches[j] = i
+            matchedOldRules[i] = True
+        else:
+            unmatchedNewRules.append(j)
+
+    # Match the style rules that are left over by selector text.
+    unmatchedBySelectorText = {}
+
+    for i in range(len(oldRules) - 1, -1, -1):
+        if not matchedOldRules[i]:
+            unmatchedBySelectorText.setdefault(oldRules[i].selectorText, []).append(i)
+
+    for j in unmatchedNewRules:
+        indices = unmatchedBySelectorText.get(newRules[j].selectorText)
+
+        if indices:
+            i = indices.pop()
+            matches[j] = i
+            modified[j] = True
+            matchedOldRules[i] = True
+
+            diff.modifiedStyleRules.append(MStyleRuleChange(oldRules[i], newRules[j], getPropertyTexts(oldRules[i]), getPropertyTexts(newRules[j])))
+        else:
+            diff.addedStyleRules.append(newRules[j])
+
+    diff.removedStyleRules = [oldRules[i] for i in range(len(oldRules)) if not matchedOldRules[i]]
+
+    matchedNewRules = [j for j in range(len(newRules)) if matches[j] != None]
+
+    for k in _getMovedIndices([matches[j] for j in matchedNewRules]):
+        j = matchedNewRules[k]
+
+        diff.movedStyleRules.append((oldRules[matches[j]], newRules[j]))
+
+    diff.unchangedCount = len(matchedNewRules) - sum(modified)
+
+    return diff
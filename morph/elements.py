@@ -0,0 +1,75 @@
+
+
+class MElement(object):
+    """
+    Represents an element of a Graphe document, as far as Morph is concerned.
+
+    Morph only needs to know a few things about an element in order to style
+    it: its element name, its id, its class names, its parent element and its
+    subelements. Any object that has these attributes can be styled, so this
+    class is just a minimal implementation of that protocol.
+
+    Parameters
+    ----------
+    elementName : str
+        The name of this element
+    _id : str
+        The id of this element
+    classes : list<str>
+        The class names of this element
+
+    Attributes
+    ----------
+    elementName : str
+        The name of this element
+    id : str
+        The id of this element, or an empty string if it doesn't have one
+    classes : list<str>
+        The class names of this element
+    parent : MElement
+        The element that contains this element, or None if this is the root
+    subelements : list<MElement>
+        The elements contained by this element, in document order
+    """
+
+    def __init__(self, elementName="", _id="", classes=None):
+
+        self.elementName = elementName
+        self.id = _id
+        self.classes = classes if classes != None else []
+        self.parent = None
+        self.subelements = []
+
+    def addSubelement(self, element):
+        """
+        Adds an element to the end of this element's subelements and returns
+        it.
+        """
+        element.parent = self
+        self.subelements.append(element)
+
+        return element
+
+    def __repr__(self):
+        t = self.elementName
+
+        if self.id:
+            t += "#" + self.id
+
+        t += "".join(["." + c for c in self.classes])
+
+        return "<{0}>".format(t)
+
+
+def iterateElements(root):
+    """
+    Iterates over an element and all of its descendants in document order.
+    """
+    stack = [root]
+
+    while stack:
+        element = stack.pop()
+
+        yield element
+
+        stack.extend(reversed(element.subelements))
@@ -0,0 +1,336 @@
+from collections import namedtuple
+from morph.core import *
+
+
+class MFrozenLength(namedtuple("MFrozenLength", ["number", "unit"])):
+    """
+    An immutable Morph length - see MLength.
+
+    Attributes
+    ----------
+    number : str
+        The string representation of the magnitude of this length
+    unit : str
+        The string representation of the unit of this length
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return "{0}{1}".format(self.number, self.unit)
+
+    def toPoints(self):
+        """
+        Gets the value of this length in points.
+        """
+        return float(self.number) * pointsPerLengthUnit[self.unit]
+
+    def thaw(self):
+        return MLength(self.number, self.unit)
+
+
+class MFrozenLengthSet(namedtuple("MFrozenLengthSet", ["lengths"])):
+    """
+    An immutable Morph length set - see MLengthSet.
+
+    Attributes
+    ----------
+    lengths : tuple<MFrozenLength>
+        The lengths in this set
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return " ".join([str(l) for l in self.lengths])
+
+    def thaw(self):
+        lengthSet = MLengthSet()
+
+        lengthSet.lengths = [l.thaw() for l in self.lengths]
+
+        return lengthSet
+
+
+class MFrozenColour(namedtuple("MFrozenColour", ["text", "rgba"])):
+    """
+    An immutable Morph colour - see MColour.
+
+    Attributes
+    ----------
+    text : str
+        The text representation of this colour
+    rgba : tuple<int>
+        The red, green, blue and alpha components of this colour, as integers
+        between 0 and 255
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return self.text
+
+    def toRGBA(self):
+        return self.rgba
+
+    def toPackedRGBA(self):
+        r, g, b, a = self.rgba
+
+        return (r << 24) | (g << 16) | (b << 8) | a
+
+    def thaw(self):
+        return importMorphValue(self.text)
+
+
+class MFrozenElementNameSelector(namedtuple("MFrozenElementNameSelector", ["elementName"])):
+    __slots__ = ()
+
+    def __str__(self):
+        return self.elementName
+
+    def thaw(self):
+        return MElementNameSelector(self.elementName)
+
+
+class MFrozenClassSelector(namedtuple("MFrozenClassSelector", ["className"])):
+    __slots__ = ()
+
+    def __str__(self):
+        return ".{0}".format(self.className)
+
+    def thaw(self):
+        return MClassSelector(self.className)
+
+
+class MFrozenIdSelector(namedtuple("MFrozenIdSelector", ["id"])):
+    __slots__ = ()
+
+    def __str__(self):
+        return "#{0}".format(self.id)
+
+    def thaw(self):
+        return MIdSelector(self.id)
+
+
+class MFrozenSubelementSelector(namedtuple("MFrozenSubelementSelector", [])):
+    __slots__ = ()
+
+    def __str__(self):
+        return " "
+
+    def thaw(self):
+        return MSubelementSelector()
+
+
+_frozenTypes = (str, int, float, MFrozenLength, MFrozenLengthSet, MFrozenColour)
+
+
+def freezeValue(value):
+    """
+    Gets an immutable version of a property value. Values that don't have an
+    immutable version are replaced with their text.
+    """
+    if isinstance(value, _frozenTypes):
+        return value
+    elif isinstance(value, MLengthSet):
+        return MFrozenLengthSet(tuple([freezeValue(l) for l in value.lengths]))
+    elif isinstance(value, MLength):
+        return MFrozenLength(str(value.number), str(value.unit))
+    elif isinstance(value, MColour):
+        try:
+            return MFrozenColour(str(value), value.toRGBA())
+        except (KeyError, ValueError):
+            pass
+
+    return str(value)
+
+
+_selectorTypes = {
+    MElementNameSelector: lambda s: MFrozenElementNameSelector(s.elementName),
+    MClassSelector: lambda s: MFrozenClassSelector(s.className),
+    MIdSelector: lambda s: MFrozenIdSelector(s.id),
+    MSubelementSelector: lambda s: MFrozenSubelementSelector(),
+}
+
+_frozenSelectorTypes = (MFrozenElementNameSelector, MFrozenClassSelector, MFrozenIdSelector, MFrozenSubelementSelector)
+
+
+def freezeSelector(selector):
+    if isinstance(selector, _frozenSelectorTypes):
+        return selector
+
+    # Look through the base classes too, so that subclasses of the selector 
+    # classes can be frozen.
+    for t in type(selector).__mro__:
+        freeze = _selectorTypes.get(t)
+
+        if freeze != None:
+            return freeze(selector)
+
+    raise TypeError("Selectors of type {0} can't be frozen.".format(type(selector).__name__))
+
+
+class MFrozenProperty(namedtuple("MFrozenProperty", ["name", "value"])):
+    """
+    An immutable Morph style property - see MProperty.
+
+    Attributes
+    ----------
+    name : str
+        The name of this style property
+    value
+        The value of this style property, which is immutable
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return "{0}: {1};".format(self.name.strip(), str(self.value).strip())
+
+    def thaw(self):
+        value = self.value.thaw() if hasattr(self.value, "thaw") else self.value
+
+        return MProperty(self.name, value)
+
+
+def freezeProperty(_property):
+    if isinstance(_property, MFrozenProperty):
+        return _property
+
+    return MFrozenProperty(_property.name, freezeValue(_property.value))
+
+
+def _getSpecificity(selectors):
+    a = 0
+    b = 0
+    c = 0
+
+    for s in selectors:
+        if isinstance(s, MFrozenIdSelector):
+            a += 1
+        elif isinstance(s, MFrozenClassSelector):
+            b += 1
+        elif isinstance(s, MFrozenElementNameSelector):
+            c += 1
+
+    return (a, b, c)
+
+
+class MFrozenStyleRule(namedtuple("MFrozenStyleRule", ["selectors", "properties", "selectorText", "specificity"])):
+    """
+    An immutable Morph style rule - see MStyleRule. Frozen style rules are
+    made with freezeStyleRule or MStyleRule.freeze, which work out the
+    selector text and specificity.
+
+    Attributes
+    ----------
+    selectors : tuple
+        The selectors of this style rule, which are frozen selectors
+    properties : tuple<MFrozenProperty>
+        The style properties of this style rule
+    selectorText : str
+        The text representation of the selectors of this style rule
+    specificity : tuple<int>
+        The specificity of this style rule
+    """
+
+    __slots__ = ()
+
+    def freeze(self):
+        return self
+
+    def evolve(self, selectors=None, properties=None):
+        """
+        Makes a copy of this style rule with new selectors or properties,
+        which can be mutable or frozen. Whatever isn't changed is shared with
+        this style rule.
+        """
+        properties = self.properties if properties == None else tuple([freezeProperty(p) for p in properties])
+
+        if selectors == None:
+            return MFrozenStyleRule(self.selectors, properties, self.selectorText, self.specificity)
+
+        return makeFrozenStyleRule(selectors, properties)
+
+    def thaw(self):
+        """
+        Makes a mutable copy of this style rule.
+        """
+        sr = MStyleRule()
+
+        sr.selectors = [s.thaw() for s in self.selectors]
+        sr.properties = [p.thaw() for p in self.properties]
+
+        return sr
+
+
+def makeFrozenStyleRule(selectors, properties):
+    """
+    Makes a frozen style rule from a list of selectors and a list of
+    properties, which can be mutable or frozen.
+    """
+    selectors = tuple([freezeSelector(s) for s in selectors])
+    properties = tuple([freezeProperty(p) for p in properties])
+
+    return MFrozenStyleRule(selectors, properties, "".join([str(s) for s in selectors]), _getSpecificity(selectors))
+
+
+def freezeStyleRule(styleRule):
+    """
+    Makes a frozen copy of a style rule. Use MStyleRule.freeze instead to
+    reuse the copy until the style rule changes.
+    """
+    if isinstance(styleRule, MFrozenStyleRule):
+        return styleRule
+
+    return makeFrozenStyleRule(styleRule.selectors, styleRule.properties)
+
+
+class MFrozenDocument(namedtuple("MFrozenDocument", ["styleRules", "includes"])):
+    """
+    An immutable snapshot of a Morph document, made with MDocument.freeze.
+
+    Frozen documents are built from tuples all the way down, so they are
+    hashable, compare equal when their contents are equal, and can be read
+    by any number of threads at once without copying or locking. Instead of
+    being changed, they are evolved into new documents that share every
+    style rule that hasn't changed.
+
+    Attributes
+    ----------
+    styleRules : tuple<MFrozenStyleRule>
+        The style rules of the document
+    includes : tuple<tuple>
+        The files included by the document with include directives, as pairs
+        of the index of the style rule that each include directive comes
+        before and the path of the file
+    """
+
+    __slots__ = ()
+
+    def freeze(self):
+        return self
+
+    def evolve(self, styleRules=None, includes=None):
+        """
+        Makes a copy of this document with new style rules or includes. The
+        style rules can be mutable or frozen, and frozen ones are shared with
+        this document rather than copied, so replacing one style rule only
+        copies the tuple of references to the style rules.
+        """
+        styleRules = self.styleRules if styleRules == None else tuple([sr.freeze() for sr in styleRules])
+        includes = self.includes if includes == None else tuple([tuple(i) for i in includes])
+
+        return MFrozenDocument(styleRules, includes)
+
+    def thaw(self):
+        """
+        Makes a mutable copy of this document, such as to give to an
+        MStyleResolver.
+        """
+        d = MDocument()
+
+        d.styleRules = [sr.thaw() for sr in self.styleRules]
+        d.includes = list(self.includes)
+
+        return d
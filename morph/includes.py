@@ -0,0 +1,243 @@
+import os
+import threading
+from morph.core import *
+
+
+class MorphIncludeError(Exception):
+    """
+    Nice to have a more specific error type for when the files included by a
+    Morph document can't be resolved, such as when a file includes itself.
+
+    Parameters
+    ----------
+    message : str
+        A message describing what is wrong
+    """
+
+    def __init__(self, message):
+        super(MorphIncludeError, self).__init__(message)
+
+
+def getFileSignature(filePath):
+    """
+    Gets the modification time and size of a file, which change whenever the
+    file does.
+    """
+    s = os.stat(filePath)
+
+    return (s.st_mtime_ns, s.st_size)
+
+
+class MIncludeResolver(object):
+    """
+    Imports Morph documents from files, replacing include directives with the
+    style rules of the files they include.
+
+    Each file is only parsed once, and is only parsed again when it changes
+    on disk, so importing a tree of files again after one of them has changed
+    only parses that file. The style rules of each file, with its includes
+    resolved, are cached too, along with the signatures of all the files they
+    depend on, so that a file whose dependencies haven't changed doesn't need
+    resolving again.
+
+    Paths in include directives are relative to the directory of the file
+    they are in.
+
+    The documents it imports have copies of the cached style rules, so they 
+    can be changed without changing the cache.
+
+    A resolver can be shared between threads. Its caches are locked only 
+    while they are read or updated, so threads read and parse files at the 
+    same time, and two threads importing the same changed file at once may 
+    both parse it.
+
+    Parameters
+    ----------
+    importer : MImporter
+        The importer to parse files with
+
+    Attributes
+    ----------
+    importer : MImporter
+        The importer to parse files with
+    dependencies : dict
+        The absolute paths of the files each file includes directly, by
+        absolute path
+    parseCount : int
+        The number of times a file has been parsed
+    """
+
+    def __init__(self, importer=None):
+
+        self.importer = importer if importer != None else MImporter()
+        self.dependencies = {}
+        self.parseCount = 0
+
+        self._parsedFiles = {}
+        self._resolvedFiles = {}
+        self._lock = threading.Lock()
+
+    def importFile(self, filePath):
+        """
+        Imports a Morph document from a file, with its include directives
+        resolved.
+        """
+        filePath = os.path.abspath(filePath)
+
+        styleRules, signatures = self._resolveFile(filePath, [], {})
+
+        d = MDocument()
+
+        d.styleRules = [copyStyleRule(sr) for sr in styleRules]
+
+        return d
+
+    def getDependencies(self, filePath):
+        """
+        Gets the absolute paths of the files that a file includes, directly or
+        indirectly, as of the last time it was imported.
+        """
+        filePath = os.path.abspath(filePath)
+
+        dependencies = set()
+        stack = [filePath]
+
+        with self._lock:
+            while stack:
+                p = stack.pop()
+
+                for f in self.dependencies.get(p, []):
+                    if f not in dependencies:
+                        dependencies.add(f)
+                        stack.append(f)
+
+        return dependencies
+
+    def getDependents(self, filePath):
+        """
+        Gets the absolute paths of the files that include a file, directly or
+        indirectly, as far as is known from the files imported so far.
+        """
+        filePath = os.path.abspath(filePath)
+
+        dependents = set()
+        stack = [filePath]
+
+        with self._lock:
+            while stack:
+                p = stack.pop()
+
+                for f, includedFiles in self.dependencies.items():
+                    if p in includedFiles and f not in dependents:
+                        dependents.add(f)
+                        stack.append(f)
+
+        return dependents
+
+    def clear(self):
+        """
+        Forgets all of the files parsed so far.
+        """
+        with self._lock:
+            self.dependencies.clear()
+            self._parsedFiles.clear()
+            self._resolvedFiles.clear()
+
+    def _getSignature(self, filePath, signatures):
+        """
+        Gets the signature of a file, only looking at each file once per
+        import.
+        """
+        if filePath not in signatures:
+            try:
+                signatures[filePath] = getFileSignature(filePath)
+            except OSError:
+                signatures[filePath] = None
+
+        return signatures[filePath]
+
+    def _parseFile(self, filePath, signature):
+        """
+        Gets the document in a file, without resolving its includes, parsing
+        it only if it has changed since it was last parsed.
+        """
+        with self._lock:
+            parsedFile = self._parsedFiles.get(filePath)
+
+        if parsedFile != None and parsedFile[0] == signature:
+            return parsedFile[1]
+
+        with open(filePath, "r") as fo:
+            document = self.importer.importDocument(fo.read())
+
+        with self._lock:
+            self.parseCount += 1
+            self._parsedFiles[filePath] = (signature, document)
+
+        return document
+
+    def _resolveFile(self, filePath, stack, signatures):
+        """
+        Gets the style rules of a file with its includes resolved, and the
+        signatures of the files they came from, by path.
+        """
+        if filePath in stack:
+            cycle = stack[stack.index(filePath):] + [filePath]
+
+            raise MorphIncludeError("Files include each other in a cycle: {0}".format(" -> ".join(cycle)))
+
+        signature = self._getSignature(filePath, signatures)
+
+        if signature == None:
+            if stack:
+                raise MorphIncludeError("'{0}' includes '{1}', which doesn't exist.".format(stack[-1], filePath))
+            else:
+                raise MorphIncludeError("'{0}' doesn't exist.".format(filePath))
+
+        with self._lock:
+            resolvedFile = self._resolvedFiles.get(filePath)
+
+        if resolvedFile != None and all(self._getSignature(f, signatures) == s for f, s in resolvedFile[1].items()):
+            return resolvedFile
+
+        document = self._parseFile(filePath, signature)
+
+        styleRules = []
+        dependencySignatures = {filePath: signature}
+        includedFiles = []
+        directory = os.path.dirname(filePath)
+        i = 0
+
+        for j, path in document.includes:
+            styleRules += document.styleRules[i:j]
+            i = j
+
+            includedFile = os.path.normpath(os.path.join(directory, path))
+            includedFiles.append(includedFile)
+
+            rules, s = self._resolveFile(includedFile, stack + [filePath], signatures)
+
+            styleRules += rules
+            dependencySignatures.update(s)
+
+        styleRules += document.styleRules[i:]
+
+        resolvedFile = (styleRules, dependencySignatures)
+
+        with self._lock:
+            self.dependencies[filePath] = includedFiles
+            self._resolvedFiles[filePath] = resolvedFile
+
+        return resolvedFile
+
+
+_defaultResolver = MIncludeResolver()
+
+
+def importMorphDocumentWithIncludes(filePath):
+    """
+    A helper function that imports a Morph document from a file, with its
+    include directives resolved. Files are cached for the lifetime of the
+    process, and parsed again only when they change.
+    """
+    return _defaultResolver.importFile(filePath)
@@ -0,0 +1,343 @@
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+from morph.selectors import *
+
+
+class MInvalidationSets(object):
+    """
+    Works out which elements might need restyling when an element's id,
+    class names or element name change, from the selectors of the style rules
+    in a cascade.
+
+    A change to a feature of an element (see getSelectorFeature) can only
+    change the style rules that apply to the element itself if the feature
+    appears in the rightmost compound selector of some style rule, and can
+    only change the style rules that apply to its descendants if the feature
+    appears in one of the other compound selectors of some style rule.
+
+    Parameters
+    ----------
+    cascade : MCascade
+        The style rules to work out the invalidation sets from
+
+    Attributes
+    ----------
+    selfFeatures : set<str>
+        The features that affect the elements that have them
+    descendantRules : dict
+        The style rules whose ancestor compound selectors use each feature,
+        by feature
+    """
+
+    def __init__(self, cascade):
+
+        self.selfFeatures = set()
+        self.descendantRules = {}
+
+        for isr in cascade.rankedRules:
+            for s in isr.compounds[-1]:
+                f = getSelectorFeature(s)
+
+                if f != None:
+                    self.selfFeatures.add(f)
+
+            for f in isr.ancestorFeatures:
+                self.descendantRules.setdefault(f, []).append(isr)
+
+    def affectsElement(self, changedFeatures):
+        """
+        Checks whether a change to the given features of an element might
+        change the style rules that apply to the element itself.
+        """
+        return not self.selfFeatures.isdisjoint(changedFeatures)
+
+    def getDescendantMatchers(self, changedFeatures):
+        """
+        Gets the compiled rightmost compound selectors of the style rules that
+        might start or stop applying to the descendants of an element when
+        the given features of the element change. Only descendants that match
+        one of these need restyling.
+        """
+        matchers = {}
+
+        for f in changedFeatures:
+            for isr in self.descendantRules.get(f, []):
+                compound = isr.compounds[-1]
+                key = "".join(["{0}".format(s) for s in compound])
+
+                if key not in matchers:
+                    matchers[key] = compileSelectors(compound)
+
+        return list(matchers.values())
+
+
+def getChangedStyleRules(oldDocument, newDocument):
+    """
+    Compares two versions of a Morph document and returns the style rules of 
+    either that have been added, removed or changed, or that have moved 
+    relative to the style rules that haven't changed. An element's computed 
+    style can only be different between the two versions if one of these 
+    style rules applies to it.
+    """
+    newKeys = {}
+
+    for sr in newDocument.styleRules:
+        newKeys.setdefault(getStyleRuleKey(sr), []).append(sr)
+
+    oldRules = []
+    changedRules = []
+
+    for sr in oldDocument.styleRules:
+        key = getStyleRuleKey(sr)
+        rules = newKeys.get(key)
+
+        if rules:
+            oldRules.append(key)
+            rules.pop(0)
+        else:
+            changedRules.append(sr)
+
+    # Whatever is left over in the new version has been added.
+    addedRules = set([id(sr) for rules in newKeys.values() for sr in rules])
+    newRules = []
+
+    for sr in newDocument.styleRules:
+        if id(sr) in addedRules:
+            changedRules.append(sr)
+        else:
+            newRules.append((getStyleRuleKey(sr), sr))
+
+    # The style rules that are in both versions must be in the same order, 
+    # otherwise they may take precedence over each other differently.
+    for oldKey, (newKey, sr) in zip(oldRules, newRules):
+        if oldKey != newKey:
+            changedRules.append(sr)
+
+    return changedRules
+
+
+class MStyledTree(object):
+    """
+    An element tree together with the computed styles of its elements, which
+    are kept up to date as the elements change.
+
+    When the id, class names or element name of an element are changed
+    through this class, only the elements that the style rules might now
+    apply to differently are restyled - the element itself if the change
+    affects the style rules that apply to it, and any descendants that the
+    change might affect through subelement selectors.
+
+    The document can also be replaced with a new version of itself, in which 
+    case only the elements that are matched by style rules that have changed 
+    between the two versions are restyled.
+
+    Computed styles point to the computed style of their parent element, so
+    the subelements of any element whose computed style changes are given
+    new computed styles too, but these keep the properties set on them by
+    style rules and don't need to be matched against the style rules again.
+
+    Parameters
+    ----------
+    document : MDocument
+        The Morph document to style the elements with
+    root : MElement
+        The root element of the tree
+    cacheSize : int
+        The maximum number of computed styles to keep in the style cache
+
+    Attributes
+    ----------
+    resolver : MStyleResolver
+        The style resolver for the document
+    invalidationSets : MInvalidationSets
+        The invalidation sets for the document
+    root : MElement
+        The root element of the tree
+    styles : dict
+        The computed styles of the elements, by element
+    cacheSize : int
+        The maximum number of computed styles to keep in the style cache
+    lastRestyleCount : int
+        The number of elements that were restyled by the last change
+    restyleCount : int
+        The total number of elements that have been restyled by changes
+    lastUpdateCount : int
+        The number of elements that were given new computed styles by the 
+        last change, including those that were restyled
+    """
+
+    def __init__(self, document, root, cacheSize=10000):
+
+        self.cacheSize = cacheSize
+        self.resolver = MStyleResolver(document, cacheSize)
+        self.invalidationSets = MInvalidationSets(self.resolver.cascade)
+        self.root = root
+        self.styles = self.resolver.resolveTree(root)
+        self._snapshot = document.freeze()
+        self.lastRestyleCount = 0
+        self.restyleCount = 0
+        self.lastUpdateCount = 0
+
+    def getStyle(self, element):
+        """
+        Gets the computed style of an element.
+        """
+        return self.styles[element]
+
+    def getStyleColumns(self, elements, propertyNames):
+        """
+        Gets the values of some properties for a list of elements, as NumPy 
+        arrays - see morph.columns.getStyleColumns.
+        """
+        from morph.columns import getStyleColumns
+
+        return getStyleColumns([self.styles[e] for e in elements], propertyNames)
+
+    def setClasses(self, element, classes):
+        """
+        Sets the class names of an element and restyles the elements affected.
+        """
+        oldFeatures = getElementFeatures(element)
+        element.classes = classes
+
+        return self._elementChanged(element, oldFeatures)
+
+    def setId(self, element, _id):
+        """
+        Sets the id of an element and restyles the elements affected.
+        """
+        oldFeatures = getElementFeatures(element)
+        element.id = _id
+
+        return self._elementChanged(element, oldFeatures)
+
+    def setElementName(self, element, elementName):
+        """
+        Sets the element name of an element and restyles the elements
+        affected.
+        """
+        oldFeatures = getElementFeatures(element)
+        element.elementName = elementName
+
+        return self._elementChanged(element, oldFeatures)
+
+    def setDocument(self, document):
+        """
+        Replaces the Morph document with a new version of it, restyles the 
+        elements affected, and returns the number of elements restyled. The 
+        new version can be the same document object, changed in place.
+        """
+        # The new version is compared with a frozen snapshot of the last one, 
+        # as the last document object may be the one that has been changed. 
+        # Freezing reuses the frozen copy of each style rule that hasn't 
+        # changed since.
+        snapshot = document.freeze()
+        changedRules = getChangedStyleRules(self._snapshot, snapshot)
+
+        self._snapshot = snapshot
+
+        self.resolver = MStyleResolver(document, self.cacheSize)
+        self.invalidationSets = MInvalidationSets(self.resolver.cascade)
+
+        if not changedRules:
+            return self._restyle([])
+
+        matchers = {}
+
+        for sr in changedRules:
+            if sr.selectorText not in matchers:
+                matchers[sr.selectorText] = compileSelectors([s.thaw() for s in sr.selectors])
+
+        matchers = list(matchers.values())
+
+        dirtyElements = [e for e in self.styles if any(m(e) for m in matchers)]
+
+        return self._restyle(dirtyElements)
+
+    def _elementChanged(self, element, oldFeatures):
+        """
+        Restyles the elements that might be affected by a change to an
+        element, and returns the number of elements restyled.
+        """
+        changedFeatures = set(oldFeatures).symmetric_difference(getElementFeatures(element))
+
+        dirtyElements = []
+        matchers = self.invalidationSets.getDescendantMatchers(changedFeatures)
+
+        if matchers:
+            for e in iterateElements(element):
+                if e != element and any(m(e) for m in matchers):
+                    dirtyElements.append(e)
+
+        if self.invalidationSets.affectsElement(changedFeatures):
+            dirtyElements.append(element)
+            movedElements = []
+        elif matchers:
+            # Computed styles are shared between elements by signature, with 
+            # the computed style of the parent element standing in for the 
+            # ancestors. The element's descendants see a different set of 
+            # ancestors now, so the element must get a new computed style, 
+            # even though the style rules that apply to it are the same.
+            movedElements = [element]
+        else:
+            movedElements = []
+
+        return self._restyle(dirtyElements, movedElements)
+
+    def _getDepth(self, element):
+        depth = 0
+
+        while element != self.root:
+            element = element.parent
+            depth += 1
+
+        return depth
+
+    def _restyle(self, dirtyElements, movedElements=None):
+        """
+        Restyles a list of elements, gives new computed styles to a list of 
+        elements that don't need restyling, and to the subelements of any 
+        element whose computed style changes, and returns the number of 
+        elements restyled.
+        """
+        dirtyElements = set(dirtyElements)
+        movedElements = [] if movedElements == None else movedElements
+        restyleCount = 0
+        updateCount = 0
+        updatedElements = set()
+
+        # Update ancestors before descendants, so that nothing is updated 
+        # twice.
+        elements = sorted(dirtyElements.union(movedElements), key=self._getDepth)
+
+        for e in elements:
+            if e in updatedElements:
+                continue
+
+            stack = [e]
+
+            while stack:
+                element = stack.pop()
+
+                parentStyle = self.styles[element.parent] if element != self.root else None
+                oldStyle = self.styles[element]
+
+                if element in dirtyElements:
+                    newStyle = self.resolver.resolveStyle(element, parentStyle)
+                    restyleCount += 1
+                else:
+                    newStyle = self.resolver.resolveStyle(element, parentStyle, cascadedProperties=oldStyle.getCascadedPropertiesDict())
+
+                self.styles[element] = newStyle
+                updatedElements.add(element)
+                updateCount += 1
+
+                if newStyle is not oldStyle:
+                    stack.extend(element.subelements)
+
+        self.lastRestyleCount = restyleCount
+        self.restyleCount += restyleCount
+        self.lastUpdateCount = updateCount
+
+        return restyleCount
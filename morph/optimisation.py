@@ -0,0 +1,196 @@
+from morph.core import *
+
+
+class MOptimisationResult(object):
+    """
+    The result of optimising a Morph document - see optimiseDocument.
+
+    Attributes
+    ----------
+    document : MDocument
+        The optimised document
+    removedStyleRuleCount : int
+        The number of style rules removed, including those merged into other
+        style rules
+    removedPropertyCount : int
+        The number of properties removed
+    groupedStyleRuleCount : int
+        The number of style rules that were moved next to another style rule
+        with the same properties, so that they can share a block when the
+        document is exported with groupSelectors=True
+    """
+
+    def __init__(self):
+
+        self.document = None
+        self.removedStyleRuleCount = 0
+        self.removedPropertyCount = 0
+        self.groupedStyleRuleCount = 0
+
+
+def _removeOverriddenProperties(styleRules):
+    """
+    Removes the properties that are overridden by the same property later in
+    the same style rule, or in a later style rule with the same selectors,
+    and the style rules left with no properties. These properties can never
+    win, since the later one always has the same specificity and comes
+    later. Returns a list with None in place of each style rule removed.
+    """
+    result = [None] * len(styleRules)
+    names = {}
+
+    for i in range(len(styleRules) - 1, -1, -1):
+        sr = styleRules[i]
+        overridden = names.setdefault(sr.selectorText, set())
+        properties = []
+
+        for p in reversed(sr.properties):
+            if p.name not in overridden:
+                overridden.add(p.name)
+                properties.append(p)
+
+        if len(properties) == len(sr.properties):
+            result[i] = copyStyleRule(sr) if properties else None
+        elif properties:
+            result[i] = copyStyleRule(sr, list(reversed(properties)))
+
+    return result
+
+
+def _hasConflict(lastSet, specificity, properties, position):
+    """
+    Checks whether any style rule after the given position, with the given
+    specificity, sets any of the given properties, in which case moving the
+    properties past it would change which one wins.
+    """
+    for p in properties:
+        if lastSet.get((specificity, p.name), -1) > position:
+            return True
+
+    return False
+
+
+def _setPositions(lastSet, specificity, properties, position):
+    for p in properties:
+        key = (specificity, p.name)
+
+        if lastSet.get(key, -1) < position:
+            lastSet[key] = position
+
+
+def _mergeStyleRules(styleRules, includePositions):
+    """
+    Merges each style rule into the next style rule with the same selectors,
+    where this doesn't change which properties win. Moving a style rule's
+    properties later only matters for style rules in between with the same
+    specificity that set the same properties. Style rules aren't merged
+    across include directives, since the included style rules aren't known.
+    Returns a list with None in place of each style rule merged away.
+    """
+    styleRules = list(styleRules)
+
+    # The position of the latest style rule with each selector text, and
+    # the position of the latest style rule to set each property at each
+    # specificity.
+    latest = {}
+    lastSet = {}
+
+    for j, sr in enumerate(styleRules):
+        if j in includePositions:
+            latest.clear()
+
+        if sr == None:
+            continue
+
+        specificity = sr.specificity
+        i = latest.get(sr.selectorText)
+
+        if i != None and not _hasConflict(lastSet, specificity, styleRules[i].properties, i):
+            sr = copyStyleRule(sr, list(styleRules[i].properties) + list(sr.properties))
+
+            styleRules[i] = None
+            styleRules[j] = sr
+
+        _setPositions(lastSet, specificity, sr.properties, j)
+        latest[sr.selectorText] = j
+
+    return styleRules
+
+
+def _groupStyleRules(styleRules, includePositions):
+    """
+    Moves each style rule back to just after the latest style rule with the
+    same properties, where this doesn't change which properties win, so
+    that they can share a block when exported. Returns the groups of style
+    rules, and the number of groups before each include directive.
+    """
+    groups = []
+    groupsByProperties = {}
+    lastSet = {}
+    groupCounts = {}
+    barrier = 0
+    movedCount = 0
+
+    for j, sr in enumerate(styleRules):
+        if j in includePositions:
+            groupCounts[j] = len(groups)
+            barrier = len(groups)
+
+        if sr == None:
+            continue
+
+        specificity = sr.specificity
+        key = tuple([str(p) for p in sr.properties])
+        g = groupsByProperties.get(key)
+
+        if g != None and g >= barrier and not _hasConflict(lastSet, specificity, sr.properties, g):
+            groups[g].append(sr)
+
+            if g != len(groups) - 1:
+                movedCount += 1
+        else:
+            g = len(groups)
+            groups.append([sr])
+            groupsByProperties[key] = g
+
+        _setPositions(lastSet, specificity, sr.properties, g)
+
+    for j in includePositions:
+        if j not in groupCounts:
+            groupCounts[j] = len(groups)
+
+    return groups, groupCounts, movedCount
+
+
+def optimiseDocument(document):
+    """
+    Makes a smaller version of a Morph document that gives every element the
+    same computed style, and returns it as an MOptimisationResult. The
+    document itself isn't changed, and shares no style rules, selector lists
+    or properties with the optimised document.
+
+    Overridden properties and empty style rules are removed, style rules with
+    the same selectors are merged, and style rules with the same properties
+    are moved next to each other, so that they can be exported as one block
+    with comma-separated selectors. Style rules and properties are only ever
+    moved past style rules with a different specificity or that set
+    different properties, so the cascade always gives the same results.
+    """
+    result = MOptimisationResult()
+
+    includePositions = set([i for i, path in document.includes])
+
+    styleRules = _removeOverriddenProperties(document.styleRules)
+    styleRules = _mergeStyleRules(styleRules, includePositions)
+    groups, groupCounts, result.groupedStyleRuleCount = _groupStyleRules(styleRules, includePositions)
+
+    d = MDocument()
+
+    d.styleRules = [sr for group in groups for sr in group]
+    d.includes = [(sum([len(g) for g in groups[:groupCounts[i]]]), path) for i, path in document.includes]
+
+    result.document = d
+    result.removedStyleRuleCount = len(document.styleRules) - len(d.styleRules)
+    result.removedPropertyCount = sum([len(sr.properties) for sr in document.styleRules]) - sum([len(sr.properties) for sr in d.styleRules])
+
+    return result
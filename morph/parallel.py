@@ -0,0 +1,245 @@
+import heapq
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+
+
+# The style resolver of a worker process, set by _initialiseWorker.
+_workerResolver = None
+
+
+def _initialiseWorker(document, cacheSize):
+    """
+    Sets up a worker process. This is called once per process, so the
+    document is only sent to each process once.
+    """
+    global _workerResolver
+
+    _workerResolver = MStyleResolver(document, cacheSize)
+
+
+def _packElement(element):
+    """
+    Converts an element and its descendants into a flat list, so that they 
+    can be sent to another process without their ancestors. Each element is 
+    a tuple of its element name, id, class names and the position of its 
+    parent element in the list, in document order. The list is flat rather 
+    than nested so that neither packing nor pickling it recurses once per 
+    level of the tree.
+    """
+    packedElements = []
+    positions = {}
+
+    for e in iterateElements(element):
+        positions[id(e)] = len(packedElements)
+        parentPosition = positions[id(e.parent)] if e is not element else -1
+
+        packedElements.append((e.elementName, e.id, list(e.classes), parentPosition))
+
+    return packedElements
+
+
+def _packAncestors(element):
+    """
+    Gets the element names, ids and class names of all of the ancestors of an 
+    element, up to and including the root of its tree, outermost first.
+    """
+    ancestors = []
+
+    while element.parent != None:
+        element = element.parent
+        ancestors.append((element.elementName, element.id, list(element.classes)))
+
+    ancestors.reverse()
+
+    return ancestors
+
+
+def _unpackElement(packedElements):
+    elements = []
+
+    for elementName, _id, classes, parentPosition in packedElements:
+        element = MElement(elementName, _id, classes)
+
+        if parentPosition >= 0:
+            elements[parentPosition].addSubelement(element)
+
+        elements.append(element)
+
+    return elements[0]
+
+
+def _resolveSubtree(task):
+    """
+    Resolves the computed styles of a subtree in a worker process, and returns
+    the properties set on each element by style rules in document order.
+    """
+    packedAncestors, packedElement = task
+
+    # Rebuild the ancestors of the subtree, so that subelement selectors and
+    # inherited properties work as they would in the whole tree.
+    parent = None
+    parentStyle = None
+
+    for elementName, _id, classes in packedAncestors:
+        ancestor = MElement(elementName, _id, classes)
+
+        if parent != None:
+            parent.addSubelement(ancestor)
+
+        parentStyle = _workerResolver.resolveStyle(ancestor, parentStyle)
+        parent = ancestor
+
+    element = _unpackElement(packedElement)
+
+    if parent != None:
+        parent.addSubelement(element)
+
+    styles = _workerResolver.resolveTree(element, parentStyle)
+
+    # Computed styles point to the computed styles of the rebuilt ancestors, 
+    # so just send back what is needed to make them again. Elements that share 
+    # a computed style share the dictionary, which is only pickled once.
+    return [s.getCascadedPropertiesDict() for s in styles.values()]
+
+
+def splitTree(root, numberOfSubtrees):
+    """
+    Splits an element tree into at least the given number of subtrees, if it
+    has enough elements, by repeatedly splitting the largest subtree into its
+    subelements.
+
+    Returns the elements that were split, which aren't part of any subtree,
+    and the root elements of the subtrees.
+    """
+    sizes = {}
+
+    for element in reversed(list(iterateElements(root))):
+        sizes[element] = 1 + sum([sizes[e] for e in element.subelements])
+
+    splitElements = set()
+
+    # The heap is ordered by size, largest first, and then by document order.
+    order = 0
+    subtrees = [(-sizes[root], order, root)]
+
+    while len(subtrees) < numberOfSubtrees:
+        subtree = heapq.heappop(subtrees)
+        element = subtree[2]
+
+        if not element.subelements:
+            # The largest subtree is a single element, so none of the 
+            # subtrees can be split any further.
+            heapq.heappush(subtrees, subtree)
+            break
+
+        splitElements.add(element)
+
+        for e in element.subelements:
+            order += 1
+            heapq.heappush(subtrees, (-sizes[e], order, e))
+
+    return splitElements, set([e for _, _, e in subtrees])
+
+
+def resolveTreeInParallel(document, root, workers=None, cacheSize=10000, subtreesPerWorker=4, parentStyle=None):
+    """
+    Gets the computed style of an element and all of its descendants, like
+    MStyleResolver.resolveTree, but splits the tree into subtrees and resolves
+    them in a pool of worker processes.
+
+    The document is sent to each worker process once, when it starts, and
+    each subtree is sent with just the element names, ids and class names of
+    its ancestors. The computed styles are returned as a dictionary of
+    elements to computed styles, in document order. As with resolveTree, the 
+    element doesn't need to be the root of its tree, and the computed style 
+    of its parent element should be given so that inherited properties are 
+    inherited.
+    """
+    if workers == None:
+        workers = os.cpu_count() or 1
+
+    splitElements, subtreeRoots = splitTree(root, workers * subtreesPerWorker)
+
+    # The subtrees are sent in document order, so that the results can be 
+    # merged back in document order.
+    subtreeRoots = [e for e in iterateElements(root) if e in subtreeRoots]
+    tasks = [(_packAncestors(e), _packElement(e)) for e in subtreeRoots]
+
+    with ProcessPoolExecutor(workers, initializer=_initialiseWorker, initargs=(document, cacheSize)) as executor:
+        results = executor.map(_resolveSubtree, tasks)
+
+        subtreeStyles = dict(zip(subtreeRoots, results))
+
+    resolver = MStyleResolver(document, cacheSize)
+
+    styles = {}
+    stack = [(root, parentStyle)]
+
+    while stack:
+        element, parentStyle = stack.pop()
+
+        if element in splitElements:
+            style = resolver.resolveStyle(element, parentStyle)
+            styles[element] = style
+
+            for e in reversed(element.subelements):
+                stack.append((e, style))
+        else:
+            # Elements come before their subelements in document order, so 
+            # the computed style of each parent element is already known.
+            for e, cascadedProperties in zip(iterateElements(element), subtreeStyles[element]):
+                p = styles[e.parent] if e != element else parentStyle
+
+                styles[e] = resolver.resolveStyle(e, p, cascadedProperties=cascadedProperties)
+
+    return styles
+
+
+def isGILEnabled():
+    """
+    Checks whether the global interpreter lock is enabled. It can be disabled 
+    in the free-threaded builds of CPython 3.13 and later, in which case 
+    threads run Python code in parallel.
+    """
+    f = getattr(sys, "_is_gil_enabled", None)
+
+    return f() if f != None else True
+
+
+def importMorphDocumentsInParallel(documents, workers=None, validate=False, canonicaliseNames=False):
+    """
+    Imports a list of Morph documents from strings in a pool of threads, and 
+    returns the Morph document objects in the same order. The threads share 
+    one importer, and nothing needs pickling, unlike with a pool of 
+    processes. The documents are only imported at the same time on a 
+    free-threaded build of CPython - see isGILEnabled.
+    """
+    if workers == None:
+        workers = os.cpu_count() or 1
+
+    importer = MImporter(getDefaultValidator(validate), canonicaliseNames)
+
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(importer.importDocument, documents))
+
+
+def importMorphDocumentsFromFilesInParallel(filePaths, workers=None, validate=False, canonicaliseNames=False):
+    """
+    Imports a list of Morph documents from files in a pool of threads, like 
+    importMorphDocumentsInParallel.
+    """
+    if workers == None:
+        workers = os.cpu_count() or 1
+
+    importer = MImporter(getDefaultValidator(validate), canonicaliseNames)
+
+    def importFile(filePath):
+        with open(filePath, "r") as fo:
+            return importer.importDocument(fo.read())
+
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(importFile, filePaths))
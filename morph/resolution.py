@@ -0,0 +1,523 @@
+import heapq
+from collections import OrderedDict
+from types import MappingProxyType
+from morph.core import *
+from morph.selectors import *
+from morph.validation import inheritedProperties
+
+
+class MIndexedStyleRule(object):
+    """
+    A style rule that has been prepared for matching by a style resolver.
+
+    Parameters
+    ----------
+    sourceIndex : int
+        The position of the style rule in its document
+    styleRule : MStyleRule
+        The style rule
+
+    Attributes
+    ----------
+    sourceIndex : int
+        The position of the style rule in its document
+    styleRule : MStyleRule
+        The style rule
+    compounds : list
+        The selectors of the style rule split into compound selectors
+    matches : function
+        The compiled selectors of the style rule, which take an element and 
+        return whether the style rule applies to it
+    declarations : dict
+        The values of the properties set by the style rule, by property name
+    rank : int
+        The position of the style rule in the cascade order, set by MCascade
+    ancestorFeatures : list<str>
+        The features that the ancestors of a matching element must have
+    ancestorHashes : list
+        The ancestor filter hashes of the ancestor features, set by 
+        MStyleResolver, or None if there aren't any ancestor features
+    """
+
+    def __init__(self, sourceIndex, styleRule):
+
+        self.sourceIndex = sourceIndex
+        self.styleRule = styleRule
+        self.compounds = splitSelectors(styleRule.selectors)
+        self.matches = compileSelectors(styleRule.selectors)
+        self.declarations = {p.name: p.value for p in styleRule.properties}
+        self.rank = sourceIndex
+        self.ancestorFeatures = getAncestorFeatures(self.compounds)
+        self.ancestorHashes = None
+
+
+def getRank(indexedStyleRule):
+    return indexedStyleRule.rank
+
+
+class MCascade(object):
+    """
+    Puts the style rules of a Morph document into cascade order.
+
+    A style rule takes precedence over another if it has a greater
+    specificity, or if it has the same specificity and comes later in the
+    document. The style rules are sorted into this order once, and each is
+    given a rank, so any list of them that is kept in rank order can be merged
+    with other such lists rather than sorted again.
+
+    Parameters
+    ----------
+    document : MDocument
+        The Morph document to put in cascade order
+
+    Attributes
+    ----------
+    rankedRules : list<MIndexedStyleRule>
+        The style rules of the document in cascade order, lowest precedence 
+        first
+    """
+
+    def __init__(self, document):
+
+        self.rankedRules = [MIndexedStyleRule(i, sr) for i, sr in enumerate(document.styleRules)]
+        self.rankedRules.sort(key=lambda isr: (isr.styleRule.specificity, isr.sourceIndex))
+
+        for i, isr in enumerate(self.rankedRules):
+            isr.rank = i
+
+    def getCascadedProperties(self, indexedStyleRules):
+        """
+        Takes a list of matching style rules in cascade order and returns the 
+        winning value of each property, by property name.
+        """
+        properties = {}
+
+        for isr in indexedStyleRules:
+            properties.update(isr.declarations)
+
+        return properties
+
+
+_inheritedProperties = frozenset(inheritedProperties)
+
+
+class MComputedStyle(object):
+    """
+    Represents the computed style of an element - the values of all of the 
+    properties that apply to it, whether set by a style rule or inherited 
+    from its parent element.
+
+    Computed styles are immutable, and only store the properties set on the 
+    element by style rules, along with the computed style of the parent 
+    element. Inherited properties are looked up through the parent, and the 
+    table of inherited values is shared with the parent unless the element 
+    sets an inherited property itself, so the memory used grows with the 
+    number of distinct sets of properties rather than with the number of 
+    elements.
+
+    Parameters
+    ----------
+    cascadedProperties : dict
+        The values of the properties set on the element by style rules, by 
+        property name
+    parent : MComputedStyle
+        The computed style of the parent element
+
+    Attributes
+    ----------
+    cascadedProperties : dict
+        The values of the properties set on the element by style rules, by 
+        property name, which can't be changed
+    parent : MComputedStyle
+        The computed style of the parent element, or None for the root element
+    properties : dict
+        The values of all of the properties of the element, by property name, 
+        as a new dictionary
+    """
+
+    __slots__ = ["_cascadedProperties", "_parent", "_inheritedValues"]
+
+    def __init__(self, cascadedProperties=None, parent=None):
+
+        self._cascadedProperties = cascadedProperties if cascadedProperties != None else {}
+        self._parent = parent
+        self._inheritedValues = None
+
+    @property
+    def cascadedProperties(self):
+        return MappingProxyType(self._cascadedProperties)
+
+    def getCascadedPropertiesDict(self):
+        """
+        Gets the dictionary of the properties set on the element by style 
+        rules itself, rather than a read-only view of it, such as to pickle 
+        it or to give it to another computed style. The dictionary is shared 
+        between computed styles, so it mustn't be changed.
+        """
+        return self._cascadedProperties
+
+    @property
+    def parent(self):
+        return self._parent
+
+    def _getInheritedValues(self):
+        """
+        Gets the values of the inherited properties of this computed style, 
+        which are the values that the subelements of the element inherit.
+        """
+        if self._inheritedValues == None:
+            values = self._parent._getInheritedValues() if self._parent != None else {}
+
+            overrides = [n for n in self._cascadedProperties if n in _inheritedProperties]
+
+            if overrides:
+                values = dict(values)
+
+                for n in overrides:
+                    values[n] = self._cascadedProperties[n]
+
+            self._inheritedValues = values
+
+        return self._inheritedValues
+
+    @property
+    def properties(self):
+        properties = dict(self._parent._getInheritedValues()) if self._parent != None else {}
+        properties.update(self._cascadedProperties)
+
+        return properties
+
+    def getPropertyValue(self, name, default=None):
+        """
+        Gets the value of a property, or the default value if the property 
+        doesn't apply to the element.
+        """
+        if name in self._cascadedProperties:
+            return self._cascadedProperties[name]
+
+        if name in _inheritedProperties and self._parent != None:
+            return self._parent._getInheritedValues().get(name, default)
+
+        return default
+
+
+class MStyleCache(object):
+    """
+    A least-recently-used cache of computed styles, keyed by element 
+    signature.
+
+    Parameters
+    ----------
+    maximumSize : int
+        The maximum number of computed styles to keep
+
+    Attributes
+    ----------
+    maximumSize : int
+        The maximum number of computed styles to keep
+    hits : int
+        The number of times a computed style was found in the cache
+    misses : int
+        The number of times a computed style wasn't found in the cache
+    """
+
+    def __init__(self, maximumSize=10000):
+
+        self.maximumSize = maximumSize
+        self.hits = 0
+        self.misses = 0
+
+        self._styles = OrderedDict()
+
+    def __len__(self):
+        return len(self._styles)
+
+    @property
+    def hitRate(self):
+        """
+        The fraction of lookups that found a computed style in the cache.
+        """
+        n = self.hits + self.misses
+
+        return self.hits / n if n > 0 else 0.0
+
+    def get(self, key):
+        """
+        Gets the computed style for a signature, or None if it isn't in the 
+        cache.
+        """
+        style = self._styles.get(key)
+
+        if style == None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._styles.move_to_end(key)
+
+        return style
+
+    def put(self, key, style):
+        """
+        Adds a computed style to the cache, removing the least recently used 
+        one if the cache is full.
+        """
+        if self.maximumSize <= 0:
+            return
+
+        self._styles[key] = style
+        self._styles.move_to_end(key)
+
+        if len(self._styles) > self.maximumSize:
+            self._styles.popitem(last=False)
+
+    def clear(self):
+        self._styles.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def getSignature(element, parentStyle):
+    """
+    Gets the signature of an element - everything about it that affects its 
+    computed style. Elements with the same signature have the same computed 
+    style.
+
+    The parent style is part of the signature by identity, and since a 
+    computed style is only ever created for one signature, this stands in 
+    for the whole chain of ancestors.
+    """
+    return (element.elementName, tuple(sorted(set(element.classes))), element.id, parentStyle)
+
+
+class MStyleResolver(object):
+    """
+    Finds the style rules of a Morph document that apply to the elements of a
+    Graphe document.
+
+    Rather than trying every style rule against every element, the style
+    rules are put into buckets by the rightmost simple selector of their
+    rightmost compound selector - the id if there is one, otherwise a class
+    name, otherwise an element name. An element then only has to be tried
+    against the buckets for its own id, class names and element name.
+
+    Each bucket is kept in cascade order, so the matching style rules for an
+    element are found by merging the buckets rather than by sorting.
+
+    Computed styles are shared between elements with the same signature, so
+    for documents where many elements look alike, most elements don't need
+    to be matched at all.
+
+    When a whole tree is resolved, an ancestor filter is kept of the 
+    features of the elements on the current path, so that most style rules 
+    with subelement selectors that don't apply can be rejected without 
+    walking up the tree.
+
+    Elements can be any objects with the attributes 'elementName', 'id',
+    'classes', 'parent' and 'subelements', such as MElement.
+
+    Parameters
+    ----------
+    document : MDocument
+        The Morph document to resolve styles from
+    cacheSize : int
+        The maximum number of computed styles to keep
+    useAncestorFilter : bool
+        Whether to use an ancestor filter when resolving a whole tree
+
+    Attributes
+    ----------
+    document : MDocument
+        The Morph document to resolve styles from
+    cascade : MCascade
+        The style rules of the document in cascade order
+    styleCache : MStyleCache
+        The computed styles that have already been resolved
+    useAncestorFilter : bool
+        Whether to use an ancestor filter when resolving a whole tree
+    """
+
+    def __init__(self, document, cacheSize=10000, useAncestorFilter=True):
+
+        self.document = document
+        self.cascade = MCascade(document)
+        self.styleCache = MStyleCache(cacheSize)
+        self.useAncestorFilter = useAncestorFilter
+
+        # This filter is only used to work out the counter positions of 
+        # features, which are the same for any filter of the same size.
+        self._ancestorFilterHashes = MAncestorFilter()
+
+        self._idRules = {}
+        self._classRules = {}
+        self._elementNameRules = {}
+        self._universalRules = []
+
+        for isr in self.cascade.rankedRules:
+            self._addStyleRule(isr)
+
+    def _addStyleRule(self, indexedStyleRule):
+        if indexedStyleRule.ancestorFeatures:
+            indexedStyleRule.ancestorHashes = [self._ancestorFilterHashes.getHashes(f) for f in indexedStyleRule.ancestorFeatures]
+
+        s = getKeySelector(indexedStyleRule.compounds[-1])
+
+        if isinstance(s, MIdSelector):
+            self._idRules.setdefault(s.id, []).append(indexedStyleRule)
+        elif isinstance(s, MClassSelector):
+            self._classRules.setdefault(s.className, []).append(indexedStyleRule)
+        elif isinstance(s, MElementNameSelector):
+            self._elementNameRules.setdefault(s.elementName, []).append(indexedStyleRule)
+        else:
+            self._universalRules.append(indexedStyleRule)
+
+    def _getCandidateRules(self, element):
+        """
+        Gets the lists of style rules that could apply to an element.
+        """
+        candidates = []
+
+        if element.id and element.id in self._idRules:
+            candidates.append(self._idRules[element.id])
+
+        for c in set(element.classes):
+            if c in self._classRules:
+                candidates.append(self._classRules[c])
+
+        if element.elementName in self._elementNameRules:
+            candidates.append(self._elementNameRules[element.elementName])
+
+        if self._universalRules:
+            candidates.append(self._universalRules)
+
+        return candidates
+
+    def _getMatchingIndexedRules(self, element, ancestorFilter=None):
+        """
+        Gets the indexed style rules that apply to an element, in cascade 
+        order. If an ancestor filter is given, it must contain the ancestors 
+        of the element.
+        """
+        candidates = self._getCandidateRules(element)
+
+        if len(candidates) == 1:
+            rules = candidates[0]
+        else:
+            rules = heapq.merge(*candidates, key=getRank)
+
+        if ancestorFilter == None:
+            return [isr for isr in rules if isr.matches(element)]
+
+        matches = []
+
+        for isr in rules:
+            if isr.ancestorHashes != None and not ancestorFilter.mightContainAll(isr.ancestorHashes):
+                continue
+
+            if isr.matches(element):
+                matches.append(isr)
+
+        return matches
+
+    def getMatchingRules(self, element):
+        """
+        Gets the style rules that apply to an element, in cascade order, so 
+        the last style rule takes precedence.
+        """
+        return [isr.styleRule for isr in self._getMatchingIndexedRules(element)]
+
+    def getCascadedProperties(self, element, ancestorFilter=None):
+        """
+        Gets the values of the properties set on an element by the style 
+        rules that apply to it, by property name.
+        """
+        return self.cascade.getCascadedProperties(self._getMatchingIndexedRules(element, ancestorFilter))
+
+    def getPropertyValue(self, element, name, default=None):
+        """
+        Gets the winning value of a single property for an element, or the 
+        default value if no style rule that applies to the element sets it.
+        """
+        candidates = [reversed(c) for c in self._getCandidateRules(element)]
+
+        for isr in heapq.merge(*candidates, key=getRank, reverse=True):
+            if name in isr.declarations and isr.matches(element):
+                return isr.declarations[name]
+
+        return default
+
+    def matches(self, element, styleRule):
+        """
+        Checks whether a style rule applies to an element.
+        """
+        return matchesSelectors(element, styleRule.selectors)
+
+    def resolveStyle(self, element, parentStyle=None, ancestorFilter=None, cascadedProperties=None):
+        """
+        Gets the computed style of an element, given the computed style of its 
+        parent element, which must have been resolved by this resolver.
+
+        If the properties set on the element by style rules are already known, 
+        they can be given, and the element won't be matched against the style 
+        rules again.
+        """
+        key = getSignature(element, parentStyle)
+        style = self.styleCache.get(key)
+
+        if style != None:
+            return style
+
+        if cascadedProperties == None:
+            cascadedProperties = self.getCascadedProperties(element, ancestorFilter)
+
+        style = MComputedStyle(cascadedProperties, parentStyle)
+
+        self.styleCache.put(key, style)
+
+        return style
+
+    def resolveTree(self, root, parentStyle=None):
+        """
+        Gets the computed style of an element and all of its descendants, and 
+        returns them as a dictionary of elements to computed styles, in 
+        document order. The element doesn't need to be the root of its tree - 
+        its ancestors are added to the ancestor filter first, so subelement 
+        selectors still match, and the computed style of its parent element 
+        should be given so that inherited properties are inherited.
+        """
+        styles = {}
+        ancestorFilter = None
+
+        if self.useAncestorFilter:
+            ancestorFilter = MAncestorFilter()
+            ancestor = root.parent
+
+            while ancestor != None:
+                ancestorFilter.push(ancestor)
+                ancestor = ancestor.parent
+
+        # Each item on the stack is an element to style and the computed style 
+        # of its parent element, or an element whose subelements have all 
+        # been styled and a computed style of None.
+        stack = [(root, parentStyle)]
+
+        while stack:
+            element, parentStyle = stack.pop()
+
+            if element == None:
+                ancestorFilter.pop(parentStyle)
+                continue
+
+            style = self.resolveStyle(element, parentStyle, ancestorFilter)
+            styles[element] = style
+
+            if not element.subelements:
+                continue
+
+            if ancestorFilter != None:
+                ancestorFilter.push(element)
+                stack.append((None, element))
+
+            for e in reversed(element.subelements):
+                stack.append((e, style))
+
+        return styles
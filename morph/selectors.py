@@ -0,0 +1,309 @@
+import functools
+from morph.core import *
+
+
+def splitSelectors(selectors):
+    """
+    Splits a list of Morph selectors into compound selectors.
+
+    The selectors of a style rule are a flat list in which subelement selectors
+    separate groups of simple selectors. For example, 'div.main p.red' is
+    [div, .main, ' ', p, .red]. This function returns each group as a separate
+    list, [[div, .main], [p, .red]], with the rightmost group last.
+    """
+    compounds = []
+    compound = []
+
+    for s in selectors:
+        if isinstance(s, MSubelementSelector):
+            if compound:
+                compounds.append(compound)
+                compound = []
+        else:
+            compound.append(s)
+
+    if compound or not compounds:
+        compounds.append(compound)
+
+    return compounds
+
+
+def getKeySelector(compound):
+    """
+    Gets the simple selector of a compound selector that is the most useful
+    for finding candidate elements - an id selector if there is one,
+    otherwise a class selector, otherwise an element name selector. Returns
+    None if the compound selector is empty.
+    """
+    for t in [MIdSelector, MClassSelector, MElementNameSelector]:
+        for s in compound:
+            if isinstance(s, t):
+                return s
+
+    return None
+
+
+def matchesSimpleSelector(element, selector):
+    """
+    Checks whether an element matches a single simple selector.
+    """
+    if isinstance(selector, MIdSelector):
+        return element.id == selector.id
+    if isinstance(selector, MClassSelector):
+        return selector.className in element.classes
+    if isinstance(selector, MElementNameSelector):
+        return element.elementName == selector.elementName
+
+    return False
+
+
+def matchesCompoundSelector(element, compound):
+    """
+    Checks whether an element matches every simple selector in a compound
+    selector.
+    """
+    for s in compound:
+        if not matchesSimpleSelector(element, s):
+            return False
+
+    return True
+
+
+def matchesCompoundSelectors(element, compounds):
+    """
+    Checks whether an element matches a list of compound selectors, as
+    returned by splitSelectors.
+
+    The rightmost compound selector must match the element itself, and each
+    compound selector to the left of it must match an ancestor of the element
+    matched by the compound selector to its right. Since subelement selectors
+    are the only combinators, always taking the nearest matching ancestor is
+    enough.
+    """
+    if not matchesCompoundSelector(element, compounds[-1]):
+        return False
+
+    ancestor = element.parent
+
+    for compound in reversed(compounds[:-1]):
+        while ancestor != None and not matchesCompoundSelector(ancestor, compound):
+            ancestor = ancestor.parent
+
+        if ancestor == None:
+            return False
+
+        ancestor = ancestor.parent
+
+    return True
+
+
+def matchesSelectors(element, selectors):
+    """
+    Checks whether an element matches the selectors of a style rule.
+    """
+    return matchesCompoundSelectors(element, splitSelectors(selectors))
+
+
+def getSelectorFeature(selector):
+    """
+    Gets a string that identifies what a simple selector looks for - '#id', 
+    '.class' or 'elementName'. Elements have a feature for their id, for each 
+    of their class names and for their element name.
+    """
+    if isinstance(selector, MIdSelector):
+        return "#" + selector.id
+    if isinstance(selector, MClassSelector):
+        return "." + selector.className
+    if isinstance(selector, MElementNameSelector):
+        return selector.elementName
+
+    return None
+
+
+def getElementFeatures(element):
+    """
+    Gets the features of an element - see getSelectorFeature.
+    """
+    features = ["." + c for c in element.classes]
+    features.append(element.elementName)
+
+    if element.id:
+        features.append("#" + element.id)
+
+    return features
+
+
+def getAncestorFeatures(compounds):
+    """
+    Gets the features that the ancestors of an element must have between 
+    them for the element to match a list of compound selectors.
+    """
+    features = set()
+
+    for compound in compounds[:-1]:
+        for s in compound:
+            f = getSelectorFeature(s)
+
+            if f != None:
+                features.add(f)
+
+    return sorted(features)
+
+
+class MAncestorFilter(object):
+    """
+    A counting Bloom filter of the features of the ancestors of the element 
+    currently being styled.
+
+    As an element tree is walked, each element's features are pushed onto the 
+    filter before its subelements are styled and popped off afterwards. A 
+    style rule with subelement selectors can then be rejected straight away 
+    if any of the features its ancestors need is definitely not on the 
+    current path, without walking up the tree.
+
+    The filter can give false positives - saying that a feature might be 
+    present when it isn't - but never false negatives.
+
+    Parameters
+    ----------
+    size : int
+        The number of counters in the filter, which must be a power of 2
+    """
+
+    def __init__(self, size=4096):
+
+        self._counters = [0] * size
+        self._mask = size - 1
+        self._shift = size.bit_length()
+
+    def getHashes(self, feature):
+        """
+        Gets the positions of the two counters for a feature.
+        """
+        h = hash(feature)
+
+        return (h & self._mask, (h >> self._shift) & self._mask)
+
+    def push(self, element):
+        """
+        Adds the features of an element to the filter.
+        """
+        counters = self._counters
+
+        for f in getElementFeatures(element):
+            a, b = self.getHashes(f)
+            counters[a] += 1
+            counters[b] += 1
+
+    def pop(self, element):
+        """
+        Removes the features of an element from the filter. The element must 
+        have been pushed onto the filter, and not changed since.
+        """
+        counters = self._counters
+
+        for f in getElementFeatures(element):
+            a, b = self.getHashes(f)
+            counters[a] -= 1
+            counters[b] -= 1
+
+    def mightContainAll(self, hashes):
+        """
+        Checks whether all of the features with the given hashes might be on 
+        the current path. Returns False if any of them definitely isn't.
+        """
+        counters = self._counters
+
+        for a, b in hashes:
+            if counters[a] == 0 or counters[b] == 0:
+                return False
+
+        return True
+
+
+def _getCompoundSelectorCondition(compound, e):
+    """
+    Gets a Python expression that checks whether the element in the variable 
+    e matches a compound selector. The tests are ordered from cheapest to 
+    most expensive - the id and element name are single comparisons, whereas 
+    each class name is a search of the element's class names.
+    """
+    conditions = []
+
+    for s in compound:
+        if isinstance(s, MIdSelector):
+            conditions.append("{0}.id == {1!r}".format(e, s.id))
+
+    for s in compound:
+        if isinstance(s, MElementNameSelector):
+            conditions.append("{0}.elementName == {1!r}".format(e, s.elementName))
+
+    if any(isinstance(s, MClassSelector) for s in compound):
+        conditions.append("{0}.classes".format(e))
+
+        for s in compound:
+            if isinstance(s, MClassSelector):
+                conditions.append("{0!r} in {1}.classes".format(s.className, e))
+
+    if not conditions:
+        return "True"
+
+    return " and ".join(conditions)
+
+
+def _getSelectorsSource(compounds):
+    """
+    Gets the source code of a function that checks whether an element matches 
+    a list of compound selectors.
+    """
+    lines = []
+
+    lines.append("def match(e):")
+    lines.append("    if not ({0}):".format(_getCompoundSelectorCondition(compounds[-1], "e")))
+    lines.append("        return False")
+
+    if len(compounds) > 1:
+        lines.append("    a = e")
+
+        # Find the nearest ancestor that matches each compound selector in 
+        # turn, from right to left.
+        for compound in reversed(compounds[:-1]):
+            lines.append("    a = a.parent")
+            lines.append("    while a is not None:")
+            lines.append("        if {0}:".format(_getCompoundSelectorCondition(compound, "a")))
+            lines.append("            break")
+            lines.append("        a = a.parent")
+            lines.append("    else:")
+            lines.append("        return False")
+
+    lines.append("    return True")
+
+    return "\n".join(lines)
+
+
+# The maximum number of compiled functions to keep, so that a long-running 
+# process that sees many different style sheets doesn't keep every function it 
+# has ever compiled.
+compiledSelectorsCacheSize = 4096
+
+
+@functools.lru_cache(maxsize=compiledSelectorsCacheSize)
+def _compileSource(source):
+    namespace = {}
+
+    exec(source, namespace)
+
+    return namespace["match"]
+
+
+def compileSelectors(selectors):
+    """
+    Compiles the selectors of a style rule into a function that takes an 
+    element and returns whether the element matches them. This is much faster 
+    than interpreting the selectors with matchesSelectors.
+
+    Compiled functions are cached by their source code, so style rules with 
+    the same selectors share one function. Only the most recently used 
+    functions are kept - see compiledSelectorsCacheSize.
+    """
+    return _compileSource(_getSelectorsSource(splitSelectors(selectors)))
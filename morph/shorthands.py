@@ -0,0 +1,154 @@
+import sys
+from morph.core import *
+
+
+# The longhand properties each shorthand property sets, in the order their
+# values are given - top, right, bottom, left.
+shorthandProperties = {
+    "margin": ("margin-top", "margin-right", "margin-bottom", "margin-left"),
+    "padding": ("padding-top", "padding-right", "padding-bottom", "padding-left"),
+    "page-margin": ("page-margin-top", "page-margin-right", "page-margin-bottom", "page-margin-left"),
+}
+
+for _name, _longhandNames in list(shorthandProperties.items()):
+    shorthandProperties[_name] = tuple([sys.intern(n) for n in _longhandNames])
+
+
+class MResolvedLength(MLength):
+    """
+    Represents a Morph length that has already been converted to points, so
+    that getting its value is just reading an attribute. It is exported as a
+    length in points.
+
+    Parameters
+    ----------
+    points : float
+        The value of this length in points
+
+    Attributes
+    ----------
+    points : float
+        The value of this length in points
+    """
+
+    def __init__(self, points):
+        super(MResolvedLength, self).__init__("{0:.12g}".format(points), "pt")
+
+        self.points = points
+
+    def toPoints(self):
+        return self.points
+
+
+def getSideValues(values):
+    """
+    Takes the one to four values of a shorthand property, and returns the
+    values of the top, right, bottom and left sides. One value applies to
+    every side, two values are the vertical and horizontal values, and three
+    values are the top, horizontal and bottom values.
+    """
+    n = len(values)
+
+    if n == 1:
+        return (values[0], values[0], values[0], values[0])
+    elif n == 2:
+        return (values[0], values[1], values[0], values[1])
+    elif n == 3:
+        return (values[0], values[1], values[2], values[1])
+    elif n == 4:
+        return tuple(values)
+
+    return None
+
+
+def _getPoints(value):
+    """
+    Gets the values of the lengths in a property value in points, or None if
+    the value isn't made up of lengths.
+    """
+    if isinstance(value, MLengthSet):
+        lengths = value.lengths
+    elif isinstance(value, MLength):
+        lengths = [value]
+    else:
+        return None
+
+    try:
+        return [l.toPoints() for l in lengths]
+    except (KeyError, ValueError):
+        return None
+
+
+def expandProperty(_property):
+    """
+    Expands a shorthand property into its longhand properties, with their
+    lengths converted to points, and converts the length of any other
+    property with a single length to points. Returns a list of properties,
+    which only contains the original property if there is nothing to do.
+    """
+    points = _getPoints(_property.value)
+
+    if points == None:
+        return [_property]
+
+    name = _property.name.strip()
+    longhandNames = shorthandProperties.get(name)
+
+    if longhandNames == None:
+        if len(points) == 1 and not isinstance(_property.value, MResolvedLength):
+            return [MProperty(name, MResolvedLength(points[0]))]
+
+        return [_property]
+
+    sideValues = getSideValues(points)
+
+    if sideValues == None:
+        return [_property]
+
+    return [MProperty(n, MResolvedLength(v)) for n, v in zip(longhandNames, sideValues)]
+
+
+def expandShorthands(document):
+    """
+    Makes a copy of a Morph document with every shorthand property expanded
+    into its longhand properties, and every length converted to points, so
+    that this is done once for each style rule rather than by every consumer
+    for every element. The longhand properties take the place of the
+    shorthand property, so they cascade as if they had been written out in
+    full. The original document isn't changed, and shares no style rules,
+    selector lists or properties with the copy.
+    """
+    d = MDocument()
+
+    # Style rules made from a comma-separated selector list share their
+    # properties, so each property is only expanded once.
+    expandedProperties = {}
+    styleRules = []
+
+    for sr in document.styleRules:
+        properties = []
+
+        for p in sr.properties:
+            expanded = expandedProperties.get(id(p))
+
+            if expanded == None:
+                expanded = expandProperty(p)
+
+                if len(expanded) == 1 and expanded[0] is p:
+                    expanded = [MProperty(p.name, p.value)]
+
+                expandedProperties[id(p)] = expanded
+
+            properties += expanded
+
+        newStyleRule = MStyleRule()
+
+        newStyleRule.selectors = list(sr.selectors)
+        newStyleRule.properties = properties
+
+        styleRules.append(newStyleRule)
+
+    d.styleRules = styleRules
+    d.includes = list(document.includes)
+
+    return d
@@ -0,0 +1,116 @@
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+from morph.selectors import *
+
+
+class MStreamingStyler(object):
+    """
+    Styles a stream of start-element and end-element events, such as from a
+    SAX parser, without building an element tree.
+
+    Only the elements that are currently open - the element being styled and
+    its ancestors - are kept, as a stack of MElement objects. Each of these
+    points to its parent element, but not to its subelements, so an element
+    is forgotten as soon as it ends. This means the memory used depends on
+    how deeply the elements are nested, and on the size of the style cache,
+    but not on the number of elements.
+
+    Parameters
+    ----------
+    document : MDocument
+        The Morph document to style the elements with
+    cacheSize : int
+        The maximum number of computed styles to keep in the style cache
+
+    Attributes
+    ----------
+    resolver : MStyleResolver
+        The style resolver for the document
+    maximumDepth : int
+        The greatest number of elements that have been open at once
+    """
+
+    def __init__(self, document, cacheSize=10000):
+
+        self.resolver = MStyleResolver(document, cacheSize)
+        self.maximumDepth = 0
+
+        self._stack = []
+        self._ancestorFilter = MAncestorFilter() if self.resolver.useAncestorFilter else None
+
+    @property
+    def depth(self):
+        """
+        The number of elements that are currently open.
+        """
+        return len(self._stack)
+
+    def startElement(self, elementName, _id="", classes=None):
+        """
+        Starts an element inside the element that is currently open, if any,
+        and returns the element and its computed style.
+        """
+        element = MElement(elementName, _id, classes)
+        parentStyle = None
+
+        if self._stack:
+            element.parent, parentStyle = self._stack[-1]
+
+        style = self.resolver.resolveStyle(element, parentStyle, self._ancestorFilter)
+
+        if self._ancestorFilter != None:
+            self._ancestorFilter.push(element)
+
+        self._stack.append((element, style))
+        self.maximumDepth = max(self.maximumDepth, len(self._stack))
+
+        return element, style
+
+    def endElement(self):
+        """
+        Ends the element that is currently open.
+        """
+        if not self._stack:
+            raise ValueError("There is no open element to end.")
+
+        element, style = self._stack.pop()
+
+        if self._ancestorFilter != None:
+            self._ancestorFilter.pop(element)
+
+    def styleEvents(self, events):
+        """
+        Takes an iterable of events and yields each element and its computed
+        style as soon as the element starts.
+
+        Each event is a tuple. ('start', elementName, id, classes) starts an
+        element, where the id and class names can be left out, and ('end',)
+        ends the element that is currently open.
+        """
+        for event in events:
+            if event[0] == "start":
+                yield self.startElement(*event[1:])
+            elif event[0] == "end":
+                self.endElement()
+            else:
+                raise ValueError("'{0}' is not a valid event type.".format(event[0]))
+
+
+def getElementEvents(root):
+    """
+    Gets the start-element and end-element events for an element and all of
+    its descendants, in document order.
+    """
+    stack = [(root, True)]
+
+    while stack:
+        element, isStart = stack.pop()
+
+        if isStart:
+            yield ("start", element.elementName, element.id, list(element.classes))
+
+            stack.append((element, False))
+            stack.extend([(e, True) for e in reversed(element.subelements)])
+        else:
+            yield ("end",)
@@ -1,3 +1,4 @@
+import sys
 from morph.core import *
 
 
@@ -28,32 +29,226 @@ allowedProperties = [
     ["page-width", "MLength"],
     ["page-height", "MLength"], ]
 
+# The properties that an element takes from its parent element when it 
+# doesn't set them itself.
+inheritedProperties = [
+    "font-name",
+    "font-height",
+    "font-weight",
+    "font-slant",
+    "font-variant",
+    "font-colour",
+    "line-height",
+    "text-alignment",
+    "text-indentation",
+    "text-capitalisation",
+    "text-underline",
+    "text-strikethrough", ]
+
 apd = {}
 
 for p in allowedProperties:
     apd[p[0]] = p
 
+# The canonical name of each property name in the schema, including synonyms. 
+# The names are interned, so that the canonical names of all imported 
+# properties are the same string objects, and looking them up in 
+# dictionaries is as fast as possible.
+canonicalPropertyNames = {}
+
+for p in allowedProperties:
+    canonicalPropertyNames[p[0]] = sys.intern(p[0])
+
+for synonym, name in propertySynonyms.items():
+    canonicalPropertyNames[synonym] = sys.intern(name)
+
 
 class MorphValidationError(Exception):
-    def __init__(self, message):
+    """
+    Nice to have a more specific error type for when a Morph document is
+    syntactically correct but uses properties wrongly.
+
+    Parameters
+    ----------
+    message : str
+        A message describing what is wrong
+    styleRuleIndex : int
+        The index of the style rule the error is in, if known
+    propertyIndex : int
+        The index of the property the error is in, within its style rule, if 
+        known
+
+    Attributes
+    ----------
+    styleRuleIndex : int
+        The index of the style rule the error is in, or None
+    propertyIndex : int
+        The index of the property the error is in, or None
+    """
+
+    def __init__(self, message, styleRuleIndex=None, propertyIndex=None):
         super(MorphValidationError, self).__init__(message)
 
+        self.styleRuleIndex = styleRuleIndex
+        self.propertyIndex = propertyIndex
 
-def validateDocument(document):
 
-    for sr in document.styleRules:
-        for p in sr.properties:
+fontWeights = ("normal", "bold", "lighter", "bolder")
+
+
+def isLength(value):
+    """
+    Checks whether a property value is a single length.
+    """
+    if isinstance(value, MLengthSet):
+        return len(value.lengths) == 1
+
+    return isinstance(value, MLength)
+
 
-            name = p.name
+def getColourFromText(text):
+    """
+    Gets the colour written in a property value that was imported as text, 
+    or None if it isn't a colour. Colours written with white space before 
+    them are imported as text, so the text is imported again without it.
+    """
+    try:
+        value = importMorphValue(text.strip())
+    except MorphSyntaxError:
+        return None
 
-            if name in propertySynonyms:
-                name = propertySynonyms[name]
+    if isinstance(value, MColour):
+        return value
 
-            if name not in apd:
-                raise MorpheValidationError("'{0}' is not a valid Morph property name.".format(p.name))
+    return None
 
-            ap = apd[name]
 
-            if ap[1] == "MLength":
-                if not isinstance(p.value, MLength):
-                    raise MorpheValidationError("'{0}' must be a length.".format(p.name))
+def isColour(value):
+    """
+    Checks whether a property value is a colour.
+    """
+    if isinstance(value, str):
+        return getColourFromText(value) != None
+
+    return isinstance(value, MColour)
+
+
+def isFontWeight(value):
+    """
+    Checks whether a property value is a font weight - one of the font weight 
+    keywords, or a multiple of 100 from 100 to 900.
+    """
+    if not isinstance(value, str):
+        return False
+
+    value = value.strip()
+
+    if value in fontWeights:
+        return True
+
+    return value.isdigit() and len(value) == 3 and value[0] != "0" and value[1:] == "00"
+
+
+def isText(value):
+    """
+    Checks whether a property value is text. Words that happen to be colour 
+    names count as text.
+    """
+    return isinstance(value, (str, MNamedColour))
+
+
+valueChecks = {
+    "MLength": (isLength, "a length"),
+    "MColour": (isColour, "a colour"),
+    "MFontWeight": (isFontWeight, "a font weight"),
+    "str": (isText, "text"),
+}
+
+
+class MValidator(object):
+    """
+    Checks the properties of Morph documents against a schema.
+
+    The schema is compiled when the validator is made into a table with an 
+    entry for every property name it allows, including synonyms, so checking 
+    a property is a single dictionary lookup and a call to the check function 
+    for its type.
+
+    Parameters
+    ----------
+    schema : list
+        The allowed properties, as pairs of property name and type name, 
+        where the type names are the keys of valueChecks
+    synonyms : dict
+        The property names to treat as other property names
+    """
+
+    def __init__(self, schema=allowedProperties, synonyms=propertySynonyms):
+
+        self._checks = {}
+
+        for name, t in schema:
+            check, description = valueChecks[t]
+
+            self._checks[name] = (check, "'{{0}}' must be {0}.".format(description))
+
+        for synonym, name in synonyms.items():
+            if name in self._checks:
+                self._checks[synonym] = self._checks[name]
+
+    def validateProperty(self, _property):
+        """
+        Checks a property, and returns a message describing what is wrong 
+        with it, or None if it is valid.
+        """
+        c = self._checks.get(_property.name)
+
+        if c == None:
+            return "'{0}' is not a valid Morph property name.".format(_property.name)
+
+        if not c[0](_property.value):
+            return c[1].format(_property.name)
+
+        return None
+
+    def validateDocument(self, document):
+        """
+        Checks every property of a Morph document, and returns a list of 
+        MorphValidationError objects, one for each invalid property, in 
+        document order.
+        """
+        errors = []
+        checks = self._checks
+
+        for i, sr in enumerate(document.styleRules):
+            for j, p in enumerate(sr.properties):
+                c = checks.get(p.name)
+
+                if c == None:
+                    errors.append(MorphValidationError("'{0}' is not a valid Morph property name.".format(p.name), i, j))
+                elif not c[0](p.value):
+                    errors.append(MorphValidationError(c[1].format(p.name), i, j))
+
+        return errors
+
+
+defaultValidator = MValidator()
+
+
+def getValidationErrors(document):
+    """
+    Checks every property of a Morph document against the default schema, 
+    and returns a list of MorphValidationError objects for the invalid ones.
+    """
+    return defaultValidator.validateDocument(document)
+
+
+def validateDocument(document):
+    """
+    Checks every property of a Morph document against the default schema, 
+    and raises the first error found, if there is one.
+    """
+    errors = getValidationErrors(document)
+
+    if errors:
+        raise errors[0]
@@ -0,0 +1,407 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from morph.core import *
+from morph.includes import *
+from morph.validation import MorphValidationError
+
+
+class MSheetUpdate(object):
+    """
+    A new version of a watched Morph document, published by MSheetWatcher.
+
+    Parameters
+    ----------
+    filePath : str
+        The absolute path of the watched file
+    document : MDocument
+        The new version of the document, or None if it couldn't be imported
+    error : Exception
+        The error raised when importing the document, if any
+
+    Attributes
+    ----------
+    filePath : str
+        The absolute path of the watched file
+    document : MDocument
+        The new version of the document, or None if it couldn't be imported
+    error : Exception
+        The error raised when importing the document, or None
+    """
+
+    def __init__(self, filePath, document, error=None):
+
+        self.filePath = filePath
+        self.document = document
+        self.error = error
+
+
+def _reportError(e):
+    """
+    Reports an exception that can't be raised to anyone, such as one raised 
+    by a callback on the watcher's thread.
+    """
+    sys.excepthook(type(e), e, e.__traceback__)
+
+
+class MPollingBackend(object):
+    """
+    Waits for files to change by looking at their modification times and
+    sizes every so often. Only the files being watched are looked at, not
+    the whole of their directories.
+
+    Parameters
+    ----------
+    interval : float
+        The number of seconds between looking at the files
+    """
+
+    def __init__(self, interval=0.5):
+
+        self.interval = interval
+
+        self._signatures = {}
+
+    def setFiles(self, filePaths):
+        """
+        Sets the files to watch.
+        """
+        signatures = {}
+
+        for f in filePaths:
+            signatures[f] = self._signatures[f] if f in self._signatures else self._getSignature(f)
+
+        self._signatures = signatures
+
+    def _getSignature(self, filePath):
+        try:
+            return getFileSignature(filePath)
+        except OSError:
+            return None
+
+    def wait(self, timeout):
+        """
+        Waits for up to the given number of seconds, and returns the set of
+        watched files that have changed.
+        """
+        end = time.monotonic() + timeout
+
+        while True:
+            changedFiles = set()
+
+            for f, signature in self._signatures.items():
+                newSignature = self._getSignature(f)
+
+                if newSignature != signature:
+                    self._signatures[f] = newSignature
+                    changedFiles.add(f)
+
+            remaining = end - time.monotonic()
+
+            if changedFiles or remaining <= 0:
+                return changedFiles
+
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+# The inotify event types that mean a file has been written, replaced or
+# deleted - IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE.
+_inotifyMask = 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+
+_inotifyEventHeader = struct.Struct("iIII")
+
+
+class MInotifyBackend(object):
+    """
+    Waits for files to change using inotify, which is only available on
+    Linux. The directories of the watched files are watched rather than the
+    files themselves, so that files replaced by editors that save by renaming
+    are still noticed.
+    """
+
+    def __init__(self):
+
+        path = ctypes.util.find_library("c")
+
+        self._libc = ctypes.CDLL(path, use_errno=True)
+
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify isn't available.")
+
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify isn't available.")
+
+        self._files = set()
+        self._directories = {}
+
+    def setFiles(self, filePaths):
+        """
+        Sets the files to watch.
+        """
+        self._files = set(filePaths)
+
+        for d in set([os.path.dirname(f) for f in self._files]):
+            if d not in self._directories.values():
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(d), _inotifyMask)
+
+                if wd >= 0:
+                    self._directories[wd] = d
+
+    def wait(self, timeout):
+        """
+        Waits for up to the given number of seconds, and returns the set of
+        watched files that have changed.
+        """
+        changedFiles = set()
+        end = time.monotonic() + timeout
+
+        while not changedFiles:
+            remaining = end - time.monotonic()
+
+            if remaining <= 0:
+                break
+
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+
+            if not readable:
+                break
+
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                continue
+
+            i = 0
+
+            while i < len(data):
+                wd, mask, cookie, length = _inotifyEventHeader.unpack_from(data, i)
+                i += _inotifyEventHeader.size
+
+                name = os.fsdecode(data[i:i + length].rstrip(b"\0"))
+                i += length
+
+                f = os.path.join(self._directories.get(wd, ""), name)
+
+                if f in self._files:
+                    changedFiles.add(f)
+
+        return changedFiles
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def getBackend(pollInterval=0.5):
+    """
+    Gets an inotify backend if inotify is available, otherwise a polling
+    backend.
+    """
+    try:
+        return MInotifyBackend()
+    except (OSError, AttributeError, TypeError):
+        return MPollingBackend(pollInterval)
+
+
+class MSheetWatcher(object):
+    """
+    Watches some Morph documents on disk, along with the files they include,
+    and publishes the new version of a document whenever it or any of the
+    files it includes change.
+
+    Files are imported with an MIncludeResolver, so only the files that have
+    changed are parsed again. Editors often write a file several times in
+    quick succession when saving, so changes are only acted on once no more
+    have been seen for the debounce time.
+
+    New versions of documents are published as MSheetUpdate objects, to
+    callbacks added with subscribe, and to asyncio queues made with
+    getQueue. Callbacks are called on the watcher's thread. Exceptions 
+    raised by callbacks, or by anything else on the watcher's thread, are 
+    passed to sys.excepthook rather than stopping the thread.
+
+    Parameters
+    ----------
+    filePaths : list<str>
+        The paths of the Morph documents to watch
+    backend
+        How to wait for files to change - an MInotifyBackend or an
+        MPollingBackend. By default inotify is used if it is available.
+    debounceTime : float
+        The number of seconds to wait for changes to stop before acting on
+        them
+    resolver : MIncludeResolver
+        The include resolver to import files with
+
+    Attributes
+    ----------
+    filePaths : list<str>
+        The absolute paths of the Morph documents being watched
+    resolver : MIncludeResolver
+        The include resolver files are imported with
+    documents : dict
+        The latest version of each watched document, by absolute path
+    """
+
+    def __init__(self, filePaths, backend=None, debounceTime=0.1, resolver=None):
+
+        self.filePaths = [os.path.abspath(f) for f in filePaths]
+        self.resolver = resolver if resolver != None else MIncludeResolver()
+        self.documents = {}
+        self.debounceTime = debounceTime
+
+        self._backend = backend if backend != None else getBackend()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+        for f in self.filePaths:
+            self._importFile(f)
+
+        self._updateWatchedFiles()
+
+    def subscribe(self, callback):
+        """
+        Adds a function to call with an MSheetUpdate whenever a watched
+        document changes.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def getQueue(self):
+        """
+        Makes an asyncio queue that MSheetUpdate objects are put on whenever a
+        watched document changes. This must be called from a coroutine
+        running in the event loop that will read from the queue.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        self.subscribe(lambda update: loop.call_soon_threadsafe(queue.put_nowait, update))
+
+        return queue
+
+    def start(self):
+        """
+        Starts watching for changes on a background thread.
+        """
+        if self._thread != None:
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="MSheetWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops watching for changes.
+        """
+        if self._thread != None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+        self._backend.close()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self._waitForChanges()
+            except Exception as e:
+                _reportError(e)
+
+                # Don't spin if the error happens every time.
+                self._stopping.wait(0.5)
+
+    def _waitForChanges(self):
+        changedFiles = self._backend.wait(0.5)
+
+        if not changedFiles:
+            return
+
+        # Keep collecting changes until there haven't been any for the
+        # debounce time.
+        while not self._stopping.is_set():
+            moreChangedFiles = self._backend.wait(self.debounceTime)
+
+            if not moreChangedFiles:
+                break
+
+            changedFiles.update(moreChangedFiles)
+
+        self.filesChanged(changedFiles)
+
+    def filesChanged(self, changedFiles):
+        """
+        Imports and publishes the watched documents that are affected by
+        changes to the given files, and returns the updates published. This
+        is called by the watcher's thread, but can also be called directly.
+        """
+        affectedFiles = set()
+
+        for f in changedFiles:
+            f = os.path.abspath(f)
+
+            if f in self.filePaths:
+                affectedFiles.add(f)
+
+            affectedFiles.update(self.resolver.getDependents(f).intersection(self.filePaths))
+
+        updates = [self._importFile(f) for f in self.filePaths if f in affectedFiles]
+
+        self._updateWatchedFiles()
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for update in updates:
+            for callback in subscribers:
+                # One subscriber failing mustn't stop the others, or the 
+                # watcher's thread, from getting updates.
+                try:
+                    callback(update)
+                except Exception as e:
+                    _reportError(e)
+
+        return updates
+
+    def _importFile(self, filePath):
+        try:
+            document = self.resolver.importFile(filePath)
+            update = MSheetUpdate(filePath, document)
+        except (OSError, MorphSyntaxError, MorphIncludeError, MorphValidationError) as e:
+            document = None
+            update = MSheetUpdate(filePath, None, e)
+
+        self.documents[filePath] = document
+
+        return update
+
+    def _updateWatchedFiles(self):
+        """
+        Watches the watched documents and every file they include, which may
+        have changed since the documents were last imported.
+        """
+        files = set(self.filePaths)
+
+        for f in self.filePaths:
+            files.update(self.resolver.getDependencies(f))
+
+        self._backend.setFiles(files)
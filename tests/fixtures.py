@@ -0,0 +1,84 @@
+import random
+
+from morph.elements import *
+
+# A style sheet for trees made by makeElements, with subelement selectors
+# that only match some of the elements.
+example1 = """
+
+div p { font-name: A; }
+.a .b span { font-name: B; }
+#x .c { font-colour: red; }
+section.a p.b { page-size: a4; }
+span { font-weight: bold; }
+.a { font-height: 12pt; }
+
+"""
+
+
+def makeElements(n, ids=True, seed=0):
+    """
+    Makes a random tree of n elements below a body element, with the element
+    names div, p, span and section, up to two of the class names a, b and c,
+    and, if ids is True, the id x on about one element in twenty. The same
+    seed always gives the same tree.
+    """
+    random.seed(seed)
+
+    root = MElement("body")
+    elements = [root]
+
+    for i in range(n):
+        classes = random.sample(["a", "b", "c"], random.randint(0, 2))
+        _id = "x" if ids and random.random() < 0.05 else ""
+        element = MElement(random.choice(["div", "p", "span", "section"]), _id, classes)
+
+        random.choice(elements).addSubelement(element)
+        elements.append(element)
+
+    return root
+
+
+def makeWideElements(n, elementNames, classNames, ids=None):
+    """
+    Makes a random tree of n elements for benchmarks, in which the first 1000
+    elements are the parents of all of the others, with up to three of the
+    given class names each and, if a list of ids is given, an id from it on
+    about one element in twenty. Uses the global random number generator, so
+    seed it first.
+    """
+    root = MElement("div")
+    parents = [root]
+
+    for i in range(n - 1):
+        classes = random.sample(classNames, random.randint(0, 3))
+        _id = random.choice(ids) if ids and random.random() < 0.05 else ""
+
+        element = random.choice(parents).addSubelement(MElement(random.choice(elementNames), _id, classes))
+
+        if len(parents) < 1000:
+            parents.append(element)
+
+    return root
+
+
+def makePagedElements(n, elementNames, classNames):
+    """
+    Makes a random tree of about n elements for benchmarks that is something
+    like a long document - a root element with many pages, each with 50
+    paragraphs that have one span each. Uses the global random number
+    generator, so seed it first.
+    """
+    root = MElement("div")
+    count = 1
+
+    while count < n:
+        page = root.addSubelement(MElement("section", "", random.sample(classNames, 2)))
+        count += 1
+
+        for i in range(50):
+            p = page.addSubelement(MElement(random.choice(elementNames), "", random.sample(classNames, random.randint(0, 3))))
+            p.addSubelement(MElement("span", "", random.sample(classNames, 1)))
+            count += 2
+
+    return root
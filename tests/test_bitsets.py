@@ -0,0 +1,104 @@
+import random
+import unittest
+
+from morph.bitsets import *
+from morph.core import *
+from morph.elements import *
+from morph.selectors import *
+
+example1 = """
+
+p { font-colour: black; }
+.red { font-colour: red; }
+p.blue.main#big, div.red.main, ul.green { font-height: 12pt; }
+div p { font-name: A; }
+.a .b span { font-name: B; }
+#x .c { font-name: C; }
+section.a div p.b { font-name: D; }
+
+"""
+
+
+@unittest.skipIf(numpy == None, "NumPy isn't installed.")
+class TestBitsets(unittest.TestCase):
+
+    def test_vocabulary(self):
+
+        matcher = MBitsetMatcher(importMorphDocument("p.red, #big .red { x: 1; }"))
+
+        self.assertEqual(sorted(matcher.vocabulary), ["#big", ".red", "p"])
+
+    def test_encode_elements(self):
+
+        matcher = MBitsetMatcher(importMorphDocument("p.red, #big .red { x: 1; }"))
+
+        bits = matcher.encodeElements([MElement("p", "big", ["red", "blue"]), MElement("div"), MElement("p")])
+
+        v = matcher.vocabulary
+
+        self.assertEqual(bits.shape, (3, 1))
+        self.assertEqual(int(bits[v["p"], 0]), 0b101)
+        self.assertEqual(int(bits[v[".red"], 0]), 0b001)
+        self.assertEqual(int(bits[v["#big"], 0]), 0b001)
+
+    def test_packed_matches(self):
+
+        matcher = MBitsetMatcher(importMorphDocument("p { x: 1; } .red { x: 2; }"))
+
+        elements = [MElement("p", "", ["red"] if i % 3 == 0 else []) for i in range(20)]
+
+        packed = matcher.matchElements(elements, True)
+        unpacked = matcher.matchElements(elements)
+
+        self.assertEqual(packed.shape, (2, 3))
+        self.assertEqual(unpacked.shape, (2, 20))
+        self.assertEqual(list(numpy.unpackbits(packed[1], count=20, bitorder="little").astype(bool)), list(unpacked[1]))
+        self.assertEqual(unpacked[1].sum(), 7)
+
+    def test_many_features(self):
+
+        text = " ".join([".c{0} {{ x: 1; }}".format(i) for i in range(200)])
+        matcher = MBitsetMatcher(importMorphDocument(text))
+
+        elements = [MElement("p", "", ["c{0}".format(i), "c{0}".format(199 - i)]) for i in range(200)]
+
+        result = matcher.matchElements(elements)
+
+        self.assertEqual(result.shape, (200, 200))
+        self.assertEqual(result.sum(), 400)
+        self.assertTrue(result[150, 150])
+        self.assertTrue(result[150, 49])
+
+    def test_match_elements(self):
+
+        random.seed(0)
+
+        document = importMorphDocument(example1)
+
+        root = MElement("body")
+        elements = [root]
+
+        for i in range(500):
+            classes = random.sample(["a", "b", "c", "red", "blue", "main", "green"], random.randint(0, 3))
+            _id = random.choice(["x", "big"]) if random.random() < 0.1 else ""
+            element = MElement(random.choice(["div", "p", "span", "section", "ul"]), _id, classes)
+
+            random.choice(elements).addSubelement(element)
+            elements.append(element)
+
+        elements = list(iterateElements(root))
+
+        result = MBitsetMatcher(document).matchElements(elements)
+
+        self.assertEqual(result.shape, (len(document.styleRules), len(elements)))
+
+        for i, sr in enumerate(document.styleRules):
+            expected = [matchesSelectors(e, sr.selectors) for e in elements]
+
+            self.assertEqual(list(result[i]), expected)
+
+        self.assertGreater(result.sum(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from parameterized import parameterized
+
+from morph.columns import *
+from morph.columns import _getPackedColour, _getPackedColourFromText
+from morph.core import *
+from morph.elements import *
+from morph.invalidation import *
+
+example1 = """
+
+body { font-height: 12pt; font-colour: black; font-name: Arial; }
+.big { font-height: 1in; }
+.red { font-colour: #ff000080; }
+.serif { font-name: Times; }
+p { margin: 2pt 4pt; }
+
+"""
+
+
+@unittest.skipIf(numpy == None, "NumPy isn't installed.")
+class TestColumns(unittest.TestCase):
+
+    @parameterized.expand([
+        ["#ff000080", 0xff000080],
+        ["#00ff00", 0x00ff00ff],
+        ["rgb(0, 0, 255)", 0x0000ffff],
+        ["rgba(10, 20, 30, 50%)", 0x0a141e80],
+        ["hsl(120, 100%, 50%)", 0x00ff00ff],
+        ["white", 0xffffffff],
+    ])
+    def test_packed_rgba(self, text, packed):
+
+        c = MImporter()._getPropertyValue(text, MMarker())
+
+        self.assertEqual(c.toPackedRGBA(), packed)
+
+    @parameterized.expand([
+        ["12pt", 12],
+        ["1in", 72],
+        ["1pc", 12],
+        ["25.4mm", 72],
+        ["2.54cm", 72],
+    ])
+    def test_length_in_points(self, text, points):
+
+        length = MImporter()._getLength(text, MMarker())
+
+        self.assertAlmostEqual(length.toPoints(), points)
+
+    def test_get_style_columns(self):
+
+        root = MElement("body")
+        p1 = root.addSubelement(MElement("p", "", ["big", "red"]))
+        p2 = root.addSubelement(MElement("p", "", ["serif"]))
+        p3 = root.addSubelement(MElement("p", "", ["big", "red"]))
+
+        tree = MStyledTree(importMorphDocument(example1), root)
+
+        columns = tree.getStyleColumns([root, p1, p2, p3], ["font-height", "font-colour", "font-name", "margin", "line-height"])
+
+        self.assertEqual(columns["font-height"].dtype, numpy.float64)
+        self.assertEqual(list(columns["font-height"]), [12, 72, 12, 72])
+
+        self.assertEqual(columns["font-colour"].dtype, numpy.uint32)
+        self.assertEqual(list(columns["font-colour"]), [0x000000ff, 0xff000080, 0x000000ff, 0xff000080])
+
+        self.assertEqual(columns["font-name"].dtype, numpy.int32)
+        self.assertEqual([columns.categories["font-name"][c] for c in columns["font-name"]], ["Arial", "Arial", "Times", "Arial"])
+
+        self.assertEqual([c for c in columns["margin"]], [-1, 0, 0, 0])
+        self.assertEqual(columns.categories["margin"], ["2pt 4pt"])
+
+        self.assertTrue(numpy.isnan(columns["line-height"]).all())
+
+    def test_packed_colours_from_text_are_cached(self):
+
+        _getPackedColourFromText.cache_clear()
+
+        for i in range(10):
+            self.assertEqual(_getPackedColour(" #ff000080"), 0xff000080)
+
+        self.assertEqual(_getPackedColourFromText.cache_info().misses, 1)
+        self.assertEqual(_getPackedColour(" not a colour"), 0)
+        self.assertEqual(_getPackedColour(" rgb(255, 0)"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+from morph.core import *
+from morph.diffing import *
+
+example1 = """
+
+p { font-name: A; font-height: 12pt; }
+h1 { font-height: 20pt; }
+.red { font-colour: red; }
+.blue { font-colour: blue; }
+#big { font-height: 30pt; }
+
+"""
+
+
+class TestDiffing(unittest.TestCase):
+
+    def test_no_changes(self):
+
+        diff = diffMorphDocuments(importMorphDocument(example1), importMorphDocument(example1))
+
+        self.assertFalse(diff.hasChanges)
+        self.assertEqual(diff.unchangedCount, 5)
+
+    def test_synonyms_and_white_space_are_ignored(self):
+
+        diff = diffMorphDocuments(importMorphDocument(".red { font-colour: red; }"), importMorphDocument(".red {\n    font-color:   red ;\n}"))
+
+        self.assertFalse(diff.hasChanges)
+
+    def test_selectors_changed_in_place(self):
+
+        oldDocument = importMorphDocument(example1)
+        newDocument = importMorphDocument(example1)
+
+        self.assertFalse(diffMorphDocuments(oldDocument, newDocument).hasChanges)
+
+        newDocument.styleRules[0].selectors += [MSubelementSelector(), MClassSelector("red")]
+
+        diff = diffMorphDocuments(oldDocument, newDocument)
+
+        self.assertEqual(diff.addedStyleRules, [newDocument.styleRules[0]])
+        self.assertEqual(diff.removedStyleRules, [oldDocument.styleRules[0]])
+
+    def test_added_and_removed(self):
+
+        oldDocument = importMorphDocument(example1)
+        newDocument = importMorphDocument(example1.replace("h1 { font-height: 20pt; }", "h2 { font-height: 16pt; }"))
+
+        diff = diffMorphDocuments(oldDocument, newDocument)
+
+        self.assertEqual(diff.addedStyleRules, [newDocument.styleRules[1]])
+        self.assertEqual(diff.removedStyleRules, [oldDocument.styleRules[1]])
+        self.assertEqual(diff.modifiedStyleRules, [])
+        self.assertEqual(diff.movedStyleRules, [])
+        self.assertEqual(diff.unchangedCount, 4)
+
+    def test_modified(self):
+
+        oldDocument = importMorphDocument(example1)
+        newDocument = importMorphDocument(example1.replace("p { font-name: A; font-height: 12pt; }", "p { font-name: B; font-weight: bold; }"))
+
+        diff = diffMorphDocuments(oldDocument, newDocument)
+
+        self.assertEqual(len(diff.modifiedStyleRules), 1)
+
+        change = diff.modifiedStyleRules[0]
+
+        self.assertIs(change.oldStyleRule, oldDocument.styleRules[0])
+        self.assertIs(change.newStyleRule, newDocument.styleRules[0])
+        self.assertEqual(change.addedProperties, ["font-weight"])
+        self.assertEqual(change.removedProperties, ["font-height"])
+        self.assertEqual(change.changedProperties, ["font-name"])
+        self.assertEqual(diff.addedStyleRules, [])
+        self.assertEqual(diff.removedStyleRules, [])
+
+    def test_moved(self):
+
+        oldDocument = importMorphDocument(example1)
+        newDocument = MDocument()
+        newDocument.styleRules = [oldDocument.styleRules[i] for i in [3, 0, 1, 2, 4]]
+
+        diff = diffMorphDocuments(oldDocument, newDocument)
+
+        self.assertEqual(diff.movedStyleRules, [(oldDocument.styleRules[3], oldDocument.styleRules[3])])
+        self.assertEqual(diff.unchangedCount, 5)
+
+    def test_duplicates(self):
+
+        oldDocument = importMorphDocument("p { font-name: A; } p { font-name: A; } p { font-name: B; }")
+        newDocument = importMorphDocument("p { font-name: A; } p { font-name: C; }")
+
+        diff = diffMorphDocuments(oldDocument, newDocument)
+
+        self.assertEqual(diff.unchangedCount, 1)
+        self.assertEqual([(c.oldStyleRule, c.newStyleRule) for c in diff.modifiedStyleRules], [(oldDocument.styleRules[1], newDocument.styleRules[1])])
+        self.assertEqual(diff.removedStyleRules, [oldDocument.styleRules[2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,364 @@
+import copy
+import gc
+import pickle
+import random
+import unittest
+import weakref
+from parameterized import parameterized
+
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+
+base = """
+
+p { font-height: 12pt; font-name: A; }
+h1 { font-height: 20pt; }
+.red { font-colour: red; }
+
+"""
+
+house = """
+
+p { font-height: 12pt; font-name: A; }
+p { font-name: B; }
+.red { font-colour: blue; font-colour: green; }
+
+"""
+
+overrides = """
+
+p { font-height: 11pt; }
+h1 { font-height: 20pt; }
+
+"""
+
+
+class TestDocuments(unittest.TestCase):
+
+    def setUp(self):
+
+        self.documents = [importMorphDocument(t) for t in [base, house, overrides]]
+
+    def test_merge_removes_duplicates(self):
+
+        merged = MDocument.merge(*self.documents)
+
+        keys = [getStyleRuleKey(sr) for sr in merged.styleRules]
+
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(len(merged.styleRules), 6)
+
+        # The last of each set of identical style rules is kept.
+        self.assertEqual(getStyleRuleKey(merged.styleRules[-1]), getStyleRuleKey(self.documents[2].styleRules[1]))
+        self.assertEqual(getStyleRuleKey(merged.styleRules[0]), getStyleRuleKey(self.documents[0].styleRules[2]))
+
+    @parameterized.expand([[False], [True]])
+    def test_merge_copies_style_rules(self, collapse):
+
+        merged = MDocument.merge(*self.documents, collapse=collapse)
+
+        styleRules = set([id(sr) for d in self.documents for sr in d.styleRules])
+        properties = set([id(p) for d in self.documents for sr in d.styleRules for p in sr.properties])
+
+        for sr in merged.styleRules:
+            self.assertNotIn(id(sr), styleRules)
+
+            for p in sr.properties:
+                self.assertNotIn(id(p), properties)
+
+        keys = [[getStyleRuleKey(sr) for sr in d.styleRules] for d in self.documents]
+
+        for sr in merged.styleRules:
+            sr.properties[0].name = "page-size"
+            sr.selectors.append(MElementNameSelector("p"))
+
+        self.assertEqual([[getStyleRuleKey(sr) for sr in d.styleRules] for d in self.documents], keys)
+
+    def test_merge_collapses_overridden_properties(self):
+
+        merged = MDocument.merge(*self.documents, collapse=True)
+
+        rules = [(sr.selectorText, [(p.name, str(p.value).strip()) for p in sr.properties]) for sr in merged.styleRules]
+
+        self.assertEqual(rules, [
+            ("p", [("font-name", "B")]),
+            (".red", [("font-colour", "green")]),
+            ("p", [("font-height", "11pt")]),
+            ("h1", [("font-height", "20pt")]),
+        ])
+
+        # The documents being merged aren't changed.
+        self.assertEqual(len(self.documents[1].styleRules[2].properties), 2)
+
+    def test_merge_keeps_cascade(self):
+
+        random.seed(0)
+
+        texts = []
+
+        for i in range(20):
+            rules = []
+
+            for j in range(10):
+                selector = random.choice(["p", "div", ".a", "p.a", "div p", "#x", ".a .b"])
+                properties = " ".join(["{0}: {1};".format(random.choice(["font-name", "font-weight", "page-size"]), random.choice("ABC")) for k in range(2)])
+
+                rules.append("{0} {{ {1} }}".format(selector, properties))
+
+            texts.append("\n".join(rules))
+
+        documents = [importMorphDocument(t) for t in texts]
+
+        concatenated = MDocument()
+
+        for d in documents:
+            concatenated.styleRules += d.styleRules
+
+        root = MElement("body")
+        elements = [root]
+
+        for i in range(200):
+            element = MElement(random.choice(["div", "p"]), "x" if random.random() < 0.05 else "", random.sample(["a", "b"], random.randint(0, 2)))
+            random.choice(elements).addSubelement(element)
+            elements.append(element)
+
+        expectedStyles = MStyleResolver(concatenated).resolveTree(root)
+
+        for collapse in [False, True]:
+            merged = MDocument.merge(*documents, collapse=collapse)
+            styles = MStyleResolver(merged).resolveTree(root)
+
+            for e in elements:
+                self.assertEqual(sorted(styles[e].properties.items()), sorted(expectedStyles[e].properties.items()))
+
+            self.assertLess(len(merged.styleRules), len(concatenated.styleRules))
+
+    def assertIndexesAreUpToDate(self, document):
+
+        for selectorText in set([sr.selectorText for sr in document.styleRules]):
+            self.assertEqual(document.getStyleRulesBySelectorText(selectorText), [sr for sr in document.styleRules if sr.selectorText == selectorText])
+
+        for s in ["p", "h1", ".red", "#big", "div"]:
+            self.assertEqual(document.getStyleRulesBySelector(s), [sr for sr in document.styleRules if s in ["{0}".format(x) for x in sr.selectors]])
+
+        for name in ["font-name", "font-height", "font-colour", "font-weight"]:
+            self.assertEqual(document.getStyleRulesByPropertyName(name), [sr for sr in document.styleRules if name in [p.name for p in sr.properties]])
+
+    def test_indexes(self):
+
+        document = importMorphDocument(base + house + "div p.red#big { font-weight: bold; }")
+
+        self.assertEqual(len(document.getStyleRulesBySelectorText("p")), 3)
+        self.assertEqual(len(document.getStyleRulesBySelector(".red")), 3)
+        self.assertEqual(document.getStyleRulesBySelector("#big"), [document.styleRules[-1]])
+        self.assertEqual(len(document.getStyleRulesByPropertyName("font-colour")), 2)
+        self.assertEqual(document.getStyleRulesByPropertyName("page-size"), [])
+
+        self.assertIndexesAreUpToDate(document)
+
+    def test_indexes_are_kept_up_to_date(self):
+
+        document = importMorphDocument(base + house)
+        self.assertIndexesAreUpToDate(document)
+
+        # Adding style rules to the end
+        document.styleRules += importMorphDocument(overrides).styleRules
+        document.styleRules.append(importMorphDocument("#big { font-weight: bold; }").styleRules[0])
+        self.assertIndexesAreUpToDate(document)
+
+        # Changing selectors and properties
+        document.styleRules[0].selectors = [MClassSelector("red")]
+        document.styleRules[1].properties.append(MProperty("font-weight", "bold"))
+        document.styleRules[2].properties = [MProperty("font-name", "C")]
+        document.styleRules[3].properties[0].name = "font-weight"
+        self.assertIndexesAreUpToDate(document)
+
+        # Inserting, removing and moving style rules
+        sr = document.styleRules.pop(0)
+        document.styleRules.insert(2, sr)
+        self.assertIndexesAreUpToDate(document)
+
+        del document.styleRules[1]
+        document.styleRules.reverse()
+        self.assertIndexesAreUpToDate(document)
+
+        # A style rule that has been removed doesn't affect the indexes.
+        sr = document.styleRules.pop()
+        self.assertIndexesAreUpToDate(document)
+
+        sr.selectors = [MElementNameSelector("div")]
+        self.assertIndexesAreUpToDate(document)
+
+        # A style rule that is in the document twice
+        document.styleRules.append(document.styleRules[0])
+        document.styleRules[0].selectors = [MElementNameSelector("h1")]
+        self.assertIndexesAreUpToDate(document)
+
+        document.styleRules = []
+        self.assertEqual(document.getStyleRulesBySelectorText("p"), [])
+
+    def test_copy_document_with_indexes(self):
+
+        document = importMorphDocument(base)
+        document.getStyleRulesBySelectorText("p")
+
+        for d in [pickle.loads(pickle.dumps(document)), copy.deepcopy(document)]:
+            self.assertEqual(len(d.styleRules), 3)
+
+            d.styleRules[0].selectors = [MElementNameSelector("div")]
+            self.assertIndexesAreUpToDate(d)
+
+            d.styleRules.append(d.styleRules[0])
+            self.assertEqual(len(d.getStyleRulesBySelector("div")), 2)
+
+        self.assertEqual(len(document.getStyleRulesBySelector("div")), 0)
+
+    def test_fingerprints(self):
+
+        document1 = importMorphDocument(base)
+        document2 = importMorphDocument(base.replace("12pt", "  12pt"))
+        document3 = importMorphDocument(house)
+
+        self.assertEqual(document1.fingerprint, document2.fingerprint)
+        self.assertNotEqual(document1.fingerprint, document3.fingerprint)
+        self.assertEqual(len(document1.fingerprint), 16)
+
+        self.assertEqual(document1.styleRules[0].fingerprint, document3.styleRules[0].fingerprint)
+        self.assertNotEqual(document1.styleRules[2].fingerprint, document3.styleRules[2].fingerprint)
+        self.assertEqual(document1.styleRules[0].properties[1].fingerprint, MProperty("font-name", "A").fingerprint)
+
+    def test_fingerprints_are_kept_up_to_date(self):
+
+        document = importMorphDocument(base)
+        fingerprint = document.fingerprint
+
+        changes = [
+            lambda d: setattr(d.styleRules[0].properties[0], "value", "13pt"),
+            lambda d: setattr(d.styleRules[0].properties[1], "name", "font-weight"),
+            lambda d: d.styleRules[1].properties.append(MProperty("font-name", "A")),
+            lambda d: setattr(d.styleRules[2], "selectors", [MClassSelector("blue")]),
+            lambda d: d.styleRules.reverse(),
+            lambda d: d.styleRules.pop(),
+            lambda d: d.includes.append((0, "base.morph")),
+        ]
+
+        for change in changes:
+            d = importMorphDocument(base)
+            d.fingerprint
+
+            change(d)
+
+            self.assertNotEqual(d.fingerprint, fingerprint)
+            self.assertEqual(d.fingerprint, importMorphDocument(exportMorphDocument(d)).fingerprint)
+
+    def test_fingerprints_are_kept_up_to_date_in_the_hash_tree(self):
+
+        text = base + house + overrides
+        document = importMorphDocument(text)
+
+        changes = [
+            lambda d: setattr(d.styleRules[3].properties[0], "value", "13pt"),
+            lambda d: d.styleRules.append(importMorphDocument("h2 { font-height: 16pt; }").styleRules[0]),
+            lambda d: d.styleRules.extend(importMorphDocument(base).styleRules),
+            lambda d: d.styleRules.insert(3, importMorphDocument("h3 { font-height: 14pt; }").styleRules[0]),
+            lambda d: setattr(d.styleRules[-1], "selectors", [MClassSelector("blue")]),
+            lambda d: d.styleRules.append(d.styleRules[0]),
+            lambda d: setattr(d.styleRules[0].properties[0], "value", "14pt"),
+        ]
+
+        for change in changes:
+            document.fingerprint
+
+            change(document)
+
+            d = importMorphDocument(exportMorphDocument(document))
+
+            self.assertEqual(document.fingerprint, d.fingerprint)
+
+    def test_hash_tree(self):
+
+        styleRules = importMorphDocument(base * 33).styleRules
+        tree = MHashTree(styleRules[:50])
+        tree.extend(styleRules[50:])
+
+        root = tree.getRoot()
+
+        self.assertEqual(root, MHashTree(styleRules).getRoot())
+        self.assertEqual([len(l) for l in tree.levels], [99, 50, 25, 13, 7, 4, 2, 1])
+        self.assertEqual(MHashTree().getRoot(), b"")
+
+        # Only the path from the changed style rule to the root is hashed 
+        # again.
+        styleRules[40].properties[0].value = "13pt"
+        tree.update(styleRules[40])
+        levels = [list(l) for l in tree.levels]
+
+        self.assertNotEqual(tree.getRoot(), root)
+        self.assertEqual(tree.getRoot(), MHashTree(styleRules).getRoot())
+        self.assertEqual(sum([a != b for l1, l2 in zip(levels, tree.levels) for a, b in zip(l1, l2)]), 8)
+
+    def test_only_changed_fingerprints_are_worked_out_again(self):
+
+        document = importMorphDocument(base)
+        document.fingerprint
+
+        document.styleRules[1].properties[0].value = "22pt"
+
+        self.assertEqual([sr._fingerprint != None for sr in document.styleRules], [True, False, True])
+        self.assertEqual(document._fingerprint, None)
+
+        document.fingerprint
+
+        self.assertNotEqual(document.styleRules[1]._fingerprint, None)
+
+        # Copies of a document work out their fingerprints again, since they 
+        # don't keep track of changes until they do.
+        d = pickle.loads(pickle.dumps(document))
+
+        self.assertEqual(d.fingerprint, document.fingerprint)
+
+        d.styleRules[0].properties[0].value = "13pt"
+
+        self.assertNotEqual(d.fingerprint, document.fingerprint)
+
+    def test_selectors_changed_in_place(self):
+
+        document = importMorphDocument(base)
+        sr = document.styleRules[0]
+
+        fingerprint = sr.fingerprint
+        document.getStyleRulesBySelectorText("p")
+        sr.freeze()
+
+        sr.selectors += [MSubelementSelector(), MClassSelector("red")]
+
+        self.assertEqual(sr.selectorText, "p .red")
+        self.assertEqual(sr.specificity, (0, 1, 1))
+        self.assertEqual(sr.freeze().selectorText, "p .red")
+        self.assertNotEqual(sr.fingerprint, fingerprint)
+        self.assertEqual(document.getStyleRulesBySelectorText("p .red"), [sr])
+        self.assertEqual(document.getStyleRulesBySelectorText("p"), [])
+
+        sr.selectors[-1] = MIdSelector("big")
+
+        self.assertEqual(sr.selectorText, "p #big")
+        self.assertEqual(sr.specificity, (1, 0, 1))
+
+    def test_removed_style_rules_are_not_kept_alive_by_properties(self):
+
+        document = importMorphDocument(base)
+        document.fingerprint
+
+        p = document.styleRules[0].properties[0]
+        sr = weakref.ref(document.styleRules[0])
+
+        del document.styleRules[0]
+        gc.collect()
+
+        self.assertIsNone(sr())
+        self.assertEqual(len(p._styleRules), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import pickle
+import threading
+import unittest
+
+from morph.core import *
+from morph.frozen import *
+
+example1 = """
+
+p { font-name: A; margin: 12pt 16pt; }
+.a #b { font-colour: rgb(255, 0, 0); }
+div span.c { font-height: 12pt; }
+
+"""
+
+
+class TestFrozen(unittest.TestCase):
+
+    def test_freeze_document(self):
+
+        document = importMorphDocument(example1)
+        document.styleRules[1].properties[0].value = MRGBColour(255, 0, 0)
+
+        f = document.freeze()
+
+        self.assertIsInstance(f.styleRules, tuple)
+        self.assertEqual([sr.selectorText for sr in f.styleRules], ["p", ".a #b", "div span.c"])
+        self.assertEqual([sr.specificity for sr in f.styleRules], [sr.specificity for sr in document.styleRules])
+        self.assertEqual([str(p) for p in f.styleRules[0].properties], ["font-name: A;", "margin: 12pt 16pt;"])
+        self.assertEqual(f.styleRules[0].properties[1].value.lengths[1].toPoints(), 16)
+        self.assertEqual(f.styleRules[1].properties[0].value.toRGBA(), (255, 0, 0, 255))
+        self.assertEqual(f.styleRules[1].properties[0].value.thaw().toRGBA(), (255, 0, 0, 255))
+
+    def test_frozen_documents_are_immutable(self):
+
+        f = importMorphDocument(example1).freeze()
+
+        with self.assertRaises(AttributeError):
+            f.styleRules = ()
+
+        with self.assertRaises(AttributeError):
+            f.styleRules[0].properties[0].name = "font-weight"
+
+        with self.assertRaises(TypeError):
+            f.styleRules[0].properties[0] = None
+
+    def test_frozen_documents_are_hashable(self):
+
+        f1 = importMorphDocument(example1).freeze()
+        f2 = importMorphDocument(example1).freeze()
+
+        self.assertEqual(f1, f2)
+        self.assertEqual(hash(f1), hash(f2))
+        self.assertEqual(len(set([f1, f2])), 1)
+
+    def test_unchanged_style_rules_are_shared(self):
+
+        document = importMorphDocument(example1)
+
+        f1 = document.freeze()
+
+        document.styleRules[2].properties[0].value = "14pt"
+
+        f2 = document.freeze()
+
+        self.assertIs(f2.styleRules[0], f1.styleRules[0])
+        self.assertIs(f2.styleRules[1], f1.styleRules[1])
+        self.assertIsNot(f2.styleRules[2], f1.styleRules[2])
+        self.assertEqual(str(f2.styleRules[2].properties[0]), "font-height: 14pt;")
+        self.assertEqual(str(f1.styleRules[2].properties[0]), "font-height: 12pt;")
+
+    def test_evolve(self):
+
+        f1 = importMorphDocument(example1).freeze()
+
+        sr = f1.styleRules[0].evolve(properties=[MProperty("font-name", "B")])
+        f2 = f1.evolve(styleRules=f1.styleRules[:1] + f1.styleRules[2:] + (sr,))
+
+        self.assertEqual([s.selectorText for s in f2.styleRules], ["p", "div span.c", "p"])
+        self.assertIs(f2.styleRules[1], f1.styleRules[2])
+        self.assertIs(f2.styleRules[2].selectors, f1.styleRules[0].selectors)
+        self.assertEqual(str(f2.styleRules[2].properties[0]), "font-name: B;")
+        self.assertEqual(len(f1.styleRules), 3)
+
+        f3 = f1.evolve(styleRules=importMorphDocument(".x { font-name: C; }").styleRules, includes=[(0, "a.morph")])
+
+        self.assertEqual(f3.styleRules[0].specificity, (0, 1, 0))
+        self.assertEqual(f3.includes, ((0, "a.morph"),))
+
+    def test_thaw(self):
+
+        document = importMorphDocument(example1)
+
+        d = document.freeze().thaw()
+
+        self.assertEqual(exportMorphDocument(d), exportMorphDocument(document))
+        self.assertIsInstance(d.styleRules[0].properties[1].value, MLengthSet)
+
+    def test_freeze_selector_subclass(self):
+
+        class MLoudClassSelector(MClassSelector):
+            pass
+
+        self.assertEqual(freezeSelector(MLoudClassSelector("red")), MFrozenClassSelector("red"))
+
+        with self.assertRaises(TypeError):
+            freezeSelector("p")
+
+    def test_pickle(self):
+
+        f = importMorphDocument(example1).freeze()
+
+        self.assertEqual(pickle.loads(pickle.dumps(f)), f)
+
+    def test_concurrent_reads(self):
+
+        f = importMorphDocument(example1).freeze()
+        texts = []
+
+        def read():
+            texts.append(tuple([str(p) for sr in f.styleRules for p in sr.properties]))
+
+        threads = [threading.Thread(target=read) for i in range(8)]
+
+        for t in threads:
+            t.start()
+
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(set(texts)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
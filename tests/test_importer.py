@@ -213,6 +213,16 @@ class TestImporter(unittest.TestCase):
         self.assertEqual(c.rgbaColour.b, b)
         self.assertEqual(c.rgbaColour.a, a)
 
+    def test_named_colours_are_not_shared(self):
+
+        importer = MImporter()
+
+        c1 = importer._getPropertyValue("red", MMarker())
+        c2 = importer._getPropertyValue("red", MMarker())
+
+        self.assertIsNot(c1, c2)
+        self.assertIsNot(c1.rgbaColour, c2.rgbaColour)
+
     @parameterized.expand([
         ["page-size: a4;", "page-size", "a4"],
         ["page-margin: 2cm 2cm 2cm 2cm;", "page-margin", "2cm 2cm 2cm 2cm"],
@@ -304,6 +314,25 @@ class TestImporter(unittest.TestCase):
         self.assertEqual(2, len(sr3.selectors))
 
 
+    def test_canonicalise_property_names(self):
+
+        document = importMorphDocument("p { font-color: red; font-colour: blue; background-color: green; made-up-name: 1pt; }", canonicaliseNames=True)
+
+        names = [p.name for p in document.styleRules[0].properties]
+
+        self.assertEqual(names, ["font-colour", "font-colour", "background-colour", "made-up-name"])
+        self.assertIs(names[0], names[1])
+
+        document = importMorphDocument("p { font-color: red; }")
+
+        self.assertEqual(document.styleRules[0].properties[0].name, "font-color")
+
+    def test_import_value(self):
+
+        self.assertEqual(importMorphValue("rgb(255, 0, 0)").toRGBA(), (255, 0, 0, 255))
+        self.assertEqual(str(importMorphValue("12pt 14pt")), "12pt 14pt")
+        self.assertEqual(importMorphValue("Arial"), "Arial")
+
 
 if __name__ == "__main__":
     unittest.main()
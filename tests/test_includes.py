@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from morph.core import *
+from morph.includes import *
+
+
+class TestIncludes(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.time = 1000000000
+
+        os.mkdir(os.path.join(self.directory, "house"))
+
+        self.writeFile("base.morph", "p { font-name: A; }")
+        self.writeFile("house/colours.morph", ".red { font-colour: red; }")
+        self.writeFile("house/style.morph", "@include \"colours.morph\";\nh1 { font-height: 20pt; }\n@include '../base.morph';")
+        self.writeFile("main.morph", "@include \"house/style.morph\";\np { font-name: B; }")
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, name, text):
+
+        path = os.path.join(self.directory, name)
+
+        with open(path, "w") as fo:
+            fo.write(text)
+
+        # Give every version of a file a different modification time, however 
+        # quickly they are written.
+        self.time += 1
+        os.utime(path, ns=(self.time, self.time))
+
+    def getSelectors(self, document):
+
+        return [sr.selectorText for sr in document.styleRules]
+
+    def test_import_include(self):
+
+        document = importMorphDocument("@include \"a.morph\";\np { font-name: A; }\n@include 'b.morph' ;")
+
+        self.assertEqual(document.includes, [(0, "a.morph"), (1, "b.morph")])
+        self.assertEqual(len(document.styleRules), 1)
+
+        self.assertEqual(exportMorphDocument(document), "@include \"a.morph\";\n\np {\n\tfont-name: A;\n}\n\n@include \"b.morph\";\n\n")
+
+    def test_import_invalid_include(self):
+
+        with self.assertRaises(MorphSyntaxError):
+            importMorphDocument("@include a.morph;")
+
+        with self.assertRaises(MorphSyntaxError):
+            importMorphDocument("@include \"a.morph\" p { font-name: A; }")
+
+    def test_resolve_includes(self):
+
+        resolver = MIncludeResolver()
+
+        document = resolver.importFile(os.path.join(self.directory, "main.morph"))
+
+        self.assertEqual(self.getSelectors(document), [".red", "h1", "p", "p"])
+        self.assertEqual(resolver.parseCount, 4)
+        self.assertEqual(resolver.getDependents(os.path.join(self.directory, "base.morph")), set([os.path.join(self.directory, "house", "style.morph"), os.path.join(self.directory, "main.morph")]))
+        self.assertEqual(resolver.getDependencies(os.path.join(self.directory, "house", "style.morph")), set([os.path.join(self.directory, "house", "colours.morph"), os.path.join(self.directory, "base.morph")]))
+
+    def test_files_are_parsed_without_the_lock(self):
+
+        resolver = MIncludeResolver()
+        locked = []
+
+        class MCheckingImporter(MImporter):
+
+            def importDocument(self, inputText):
+                locked.append(resolver._lock.locked())
+
+                return super(MCheckingImporter, self).importDocument(inputText)
+
+        resolver.importer = MCheckingImporter()
+        resolver.importFile(os.path.join(self.directory, "main.morph"))
+
+        self.assertEqual(locked, [False] * 4)
+
+    def test_only_changed_files_are_parsed_again(self):
+
+        resolver = MIncludeResolver()
+        path = os.path.join(self.directory, "main.morph")
+
+        resolver.importFile(path)
+        resolver.importFile(path)
+
+        self.assertEqual(resolver.parseCount, 4)
+
+        self.writeFile("house/colours.morph", ".blue { font-colour: blue; }")
+
+        document = resolver.importFile(path)
+
+        self.assertEqual(self.getSelectors(document), [".blue", "h1", "p", "p"])
+        self.assertEqual(resolver.parseCount, 5)
+
+    def test_changing_an_imported_document_doesnt_change_the_cache(self):
+
+        resolver = MIncludeResolver()
+        path = os.path.join(self.directory, "main.morph")
+
+        document = resolver.importFile(path)
+
+        for sr in document.styleRules:
+            sr.properties[0].value = "CHANGED"
+            sr.properties.append(MProperty("page-size", "a4"))
+            sr.selectors.append(MClassSelector("changed"))
+
+        for filePath in [path, os.path.join(self.directory, "base.morph")]:
+            for sr in resolver.importFile(filePath).styleRules:
+                self.assertNotIn("CHANGED", [p.value for p in sr.properties])
+                self.assertEqual(len(sr.properties), 1)
+                self.assertNotIn(".changed", sr.selectorText)
+
+        self.assertEqual(resolver.parseCount, 4)
+
+    def test_include_cycle(self):
+
+        resolver = MIncludeResolver()
+
+        self.writeFile("base.morph", "@include \"main.morph\";")
+
+        with self.assertRaises(MorphIncludeError) as c:
+            resolver.importFile(os.path.join(self.directory, "main.morph"))
+
+        self.assertIn("cycle", str(c.exception))
+
+    def test_missing_include(self):
+
+        resolver = MIncludeResolver()
+
+        self.writeFile("base.morph", "@include \"missing.morph\";")
+
+        with self.assertRaises(MorphIncludeError):
+            resolver.importFile(os.path.join(self.directory, "main.morph"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import pickle
+import random
+import unittest
+
+from morph.core import *
+from morph.elements import *
+from morph.invalidation import *
+from morph.resolution import *
+
+example1 = """
+
+p { font-colour: black; }
+.red { font-colour: red; }
+div.warning p { font-weight: bold; }
+#infobox { font-height: 14pt; }
+
+"""
+
+
+class TestInvalidation(unittest.TestCase):
+
+    def setUp(self):
+
+        self.document = importMorphDocument(example1)
+
+        self.root = MElement("body")
+        self.div = self.root.addSubelement(MElement("div"))
+        self.ps = [self.div.addSubelement(MElement("p")) for i in range(10)]
+        self.spans = [self.div.addSubelement(MElement("span")) for i in range(10)]
+
+    def assertStylesAreUpToDate(self, tree):
+
+        styles = MStyleResolver(self.document).resolveTree(self.root)
+
+        for element in styles:
+            a = {n: str(v) for n, v in tree.getStyle(element).properties.items()}
+            b = {n: str(v) for n, v in styles[element].properties.items()}
+
+            self.assertEqual(a, b)
+
+    def test_invalidation_sets(self):
+
+        sets = MInvalidationSets(MCascade(self.document))
+
+        self.assertEqual(sets.selfFeatures, set(["p", ".red", "#infobox"]))
+        self.assertEqual(sorted(sets.descendantRules), [".warning", "div"])
+        self.assertFalse(sets.affectsElement(set([".warning"])))
+        self.assertTrue(sets.affectsElement(set([".red"])))
+        self.assertEqual(len(sets.getDescendantMatchers(set([".warning", "div"]))), 1)
+
+    def test_changing_an_unused_class_restyles_nothing(self):
+
+        tree = MStyledTree(self.document, self.root)
+
+        self.assertEqual(tree.setClasses(self.ps[0], ["blue"]), 0)
+        self.assertStylesAreUpToDate(tree)
+
+    def test_changing_a_class_restyles_the_element(self):
+
+        tree = MStyledTree(self.document, self.root)
+
+        self.assertEqual(tree.setClasses(self.ps[0], ["red"]), 1)
+        self.assertEqual(str(tree.getStyle(self.ps[0]).getPropertyValue("font-colour")), "red")
+        self.assertStylesAreUpToDate(tree)
+
+    def test_changing_an_ancestor_class_restyles_matching_descendants(self):
+
+        tree = MStyledTree(self.document, self.root)
+
+        self.assertEqual(tree.setClasses(self.div, ["warning"]), 10)
+        self.assertEqual(tree.lastRestyleCount, 10)
+        self.assertEqual(tree.lastUpdateCount, 21)
+        self.assertEqual(tree.getStyle(self.ps[0]).getPropertyValue("font-weight"), "bold")
+        self.assertStylesAreUpToDate(tree)
+
+    def test_changing_an_inherited_property_restyles_descendants(self):
+
+        tree = MStyledTree(self.document, self.root)
+
+        tree.setId(self.div, "infobox")
+
+        self.assertEqual(tree.lastRestyleCount, 1)
+        self.assertEqual(tree.lastUpdateCount, 21)
+        self.assertEqual(str(tree.getStyle(self.spans[0]).getPropertyValue("font-height")), "14pt")
+        self.assertStylesAreUpToDate(tree)
+
+    def test_restyled_styles_can_be_pickled(self):
+
+        tree = MStyledTree(self.document, self.root)
+
+        # The subelements of the div are updated without being restyled, 
+        # which reuses their cascaded properties each time.
+        for i in range(5):
+            tree.setId(self.div, "infobox" if i % 2 == 0 else "")
+            tree.setClasses(self.div, ["warning"] if i % 2 == 0 else [])
+
+        for element in [self.ps[0], self.spans[0]]:
+            properties = pickle.loads(pickle.dumps(tree.getStyle(element).getCascadedPropertiesDict()))
+
+            self.assertEqual(set(properties), set(tree.getStyle(element).cascadedProperties))
+
+        self.assertStylesAreUpToDate(tree)
+
+    def test_random_changes(self):
+
+        random.seed(0)
+
+        elements = list(iterateElements(self.root))
+        tree = MStyledTree(self.document, self.root)
+
+        for i in range(200):
+            element = random.choice(elements)
+            r = random.random()
+
+            if r < 0.6:
+                tree.setClasses(element, random.sample(["red", "warning", "blue"], random.randint(0, 2)))
+            elif r < 0.8:
+                tree.setId(element, random.choice(["", "infobox", "other"]))
+            else:
+                tree.setElementName(element, random.choice(["div", "p", "span"]))
+
+            self.assertStylesAreUpToDate(tree)
+
+    def getChangedRuleIndices(self, text1, text2):
+
+        d1 = importMorphDocument(text1)
+        d2 = importMorphDocument(text2)
+
+        changedRules = getChangedStyleRules(d1, d2)
+
+        return sorted([d1.styleRules.index(sr) for sr in changedRules if sr in d1.styleRules]), sorted([d2.styleRules.index(sr) for sr in changedRules if sr in d2.styleRules])
+
+    def test_get_changed_style_rules(self):
+
+        self.assertEqual(self.getChangedRuleIndices("p { x: 1; } .a { y: 2; }", "p { x: 1; } .a { y: 2; }"), ([], []))
+        self.assertEqual(self.getChangedRuleIndices("p { x: 1; } .a { y: 2; }", "p { x: 1; } .a { y: 3; }"), ([1], [1]))
+        self.assertEqual(self.getChangedRuleIndices("p { x: 1; } .a { y: 2; }", "p { x: 1; } .b { z: 4; } .a { y: 2; }"), ([], [1]))
+        self.assertEqual(self.getChangedRuleIndices("p { x: 1; } .b { z: 4; } .a { y: 2; }", "p { x: 1; } .a { y: 2; }"), ([1], []))
+        self.assertEqual(self.getChangedRuleIndices("p { x: 1; } .a { y: 2; }", ".a { y: 2; } p { x: 1; }"), ([], [0, 1]))
+        self.assertEqual(self.getChangedRuleIndices("p { x: 1; } p { x: 1; }", "p { x: 1; }"), ([1], []))
+
+    def test_set_document(self):
+
+        self.ps[0].classes = ["red"]
+
+        tree = MStyledTree(self.document, self.root)
+
+        self.document = importMorphDocument(example1.replace(".red { font-colour: red; }", ".red { font-colour: blue; }"))
+
+        self.assertEqual(tree.setDocument(self.document), 1)
+        self.assertEqual(str(tree.getStyle(self.ps[0]).getPropertyValue("font-colour")), "blue")
+        self.assertStylesAreUpToDate(tree)
+
+        self.document = importMorphDocument(example1 + " body { font-name: Arial; }")
+
+        self.assertEqual(tree.setDocument(self.document), 2)
+        self.assertEqual(tree.lastUpdateCount, 22)
+        self.assertStylesAreUpToDate(tree)
+
+    def test_set_same_document(self):
+
+        tree = MStyledTree(self.document, self.root)
+
+        self.assertEqual(tree.setDocument(importMorphDocument(example1)), 0)
+        self.assertStylesAreUpToDate(tree)
+
+    def test_set_document_changed_in_place(self):
+
+        tree = MStyledTree(self.document, self.root)
+
+        self.document.styleRules[0].properties[0].value = "green"
+
+        self.assertEqual(tree.setDocument(self.document), 10)
+        self.assertEqual(str(tree.getStyle(self.ps[0]).getPropertyValue("font-colour")), "green")
+        self.assertStylesAreUpToDate(tree)
+
+        self.assertEqual(tree.setDocument(self.document), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
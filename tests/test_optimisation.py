@@ -0,0 +1,156 @@
+import random
+import unittest
+
+from morph.core import *
+from morph.elements import *
+from morph.optimisation import *
+from morph.resolution import *
+from tests.fixtures import makeElements
+
+example1 = """
+
+p { font-name: A; font-colour: red; }
+.a { font-height: 12pt; }
+p { font-colour: blue; }
+div { }
+span { font-weight: bold; }
+section { font-weight: bold; }
+p { font-name: B; font-name: C; }
+
+"""
+
+
+def makeDocument(n):
+    random.seed(1)
+
+    selectorTexts = ["div", "p", "span", "section", ".a", ".b", ".c", "div p", ".a span", "p.b", "section .c"]
+    properties = [("font-name", ["A", "B"]), ("font-weight", ["bold", "normal"]), ("page-size", ["a4", "a5"])]
+
+    styleRules = []
+
+    for i in range(n):
+        styleRule = random.choice(selectorTexts) + " {"
+
+        for j in range(random.randint(0, 2)):
+            name, values = random.choice(properties)
+            styleRule += " {0}: {1};".format(name, random.choice(values))
+
+        styleRules.append(styleRule + " }")
+
+    return importMorphDocument("\n".join(styleRules))
+
+
+def getStyles(document, root):
+    return [(e, e.elementName, str(sorted(s.properties.items()))) for e, s in MStyleResolver(document).resolveTree(root).items()]
+
+
+class TestOptimisation(unittest.TestCase):
+
+    def test_example_1(self):
+
+        document = importMorphDocument(example1)
+
+        result = optimiseDocument(document)
+        d = result.document
+
+        self.assertEqual([sr.selectorText for sr in d.styleRules], [".a", "span", "section", "p"])
+        self.assertEqual([str(p) for p in d.styleRules[3].properties], ["font-colour: blue;", "font-name: C;"])
+
+        self.assertEqual(result.removedStyleRuleCount, 3)
+        self.assertEqual(result.removedPropertyCount, 3)
+        self.assertEqual(result.groupedStyleRuleCount, 0)
+
+        self.assertEqual(len(document.styleRules), 7)
+
+    def test_does_not_merge_past_conflicting_style_rule(self):
+
+        document = importMorphDocument("p { font-name: A; } div { font-name: B; } p { font-weight: bold; }")
+
+        d = optimiseDocument(document).document
+
+        self.assertEqual([sr.selectorText for sr in d.styleRules], ["p", "div", "p"])
+
+    def test_merges_past_style_rule_with_different_specificity(self):
+
+        document = importMorphDocument("p { font-name: A; } .a { font-name: B; } p { font-weight: bold; }")
+
+        d = optimiseDocument(document).document
+
+        self.assertEqual([sr.selectorText for sr in d.styleRules], [".a", "p"])
+        self.assertEqual([str(p) for p in d.styleRules[1].properties], ["font-name: A;", "font-weight: bold;"])
+
+    def test_groups_style_rules_with_same_properties(self):
+
+        document = importMorphDocument("p { font-name: A; } .a { font-weight: bold; } div { font-name: A; }")
+
+        result = optimiseDocument(document)
+        t = exportMorphDocument(result.document, groupSelectors=True)
+
+        self.assertEqual(result.groupedStyleRuleCount, 1)
+        self.assertEqual(t, "p, div {\n\tfont-name: A;\n}\n\n.a {\n\tfont-weight: bold;\n}\n\n")
+
+    def test_does_not_move_style_rules_past_includes(self):
+
+        d = MDocument()
+
+        d.styleRules = list(importMorphDocument("p { font-name: A; } p { font-weight: bold; } div { font-name: A; } div { font-colour: red; }").styleRules)
+        d.includes = [(2, "a.morph")]
+
+        result = optimiseDocument(d)
+
+        self.assertEqual([sr.selectorText for sr in result.document.styleRules], ["p", "div"])
+        self.assertEqual(result.document.includes, [(1, "a.morph")])
+
+    def test_computed_styles_are_unchanged(self):
+
+        document = makeDocument(300)
+        root = makeElements(300, False)
+
+        result = optimiseDocument(document)
+
+        self.assertGreater(result.removedStyleRuleCount, 0)
+        self.assertLess(len(result.document.styleRules), len(document.styleRules))
+
+        expectedStyles = getStyles(document, root)
+
+        self.assertEqual(getStyles(result.document, root), expectedStyles)
+
+        t = exportMorphDocument(result.document, groupSelectors=True)
+
+        self.assertEqual(getStyles(importMorphDocument(t), root), expectedStyles)
+
+    def test_empty_style_rules_are_removed(self):
+
+        result = optimiseDocument(importMorphDocument("p { } div { }"))
+
+        self.assertEqual(result.document.styleRules, [])
+        self.assertEqual(result.removedStyleRuleCount, 2)
+        self.assertEqual(result.removedPropertyCount, 0)
+
+    def test_result_does_not_share_style_rules_with_the_document(self):
+
+        document = importMorphDocument(example1)
+        text = exportMorphDocument(document)
+
+        d = optimiseDocument(document).document
+
+        styleRules = set([id(sr) for sr in document.styleRules])
+        selectors = set([id(sr.selectors) for sr in document.styleRules])
+        properties = set([id(p) for sr in document.styleRules for p in sr.properties])
+
+        for sr in d.styleRules:
+            self.assertNotIn(id(sr), styleRules)
+            self.assertNotIn(id(sr.selectors), selectors)
+
+            for p in sr.properties:
+                self.assertNotIn(id(p), properties)
+
+        for sr in d.styleRules:
+            sr.selectors.append(MClassSelector("x"))
+            sr.properties[0].value = "x"
+
+        self.assertEqual(exportMorphDocument(document), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from morph.core import *
+from morph.elements import *
+from morph.parallel import *
+from morph.resolution import *
+from morph.validation import MorphValidationError, defaultValidator
+from tests.fixtures import example1, makeElements
+
+class TestParallel(unittest.TestCase):
+
+    def test_split_tree(self):
+
+        root = makeElements(200)
+
+        splitElements, subtreeRoots = splitTree(root, 8)
+
+        self.assertGreaterEqual(len(subtreeRoots), 8)
+
+        # Every element should be either split or in exactly one subtree.
+        elements = list(splitElements)
+
+        for e in subtreeRoots:
+            elements += list(iterateElements(e))
+
+        self.assertEqual(sorted(map(id, elements)), sorted(map(id, iterateElements(root))))
+
+    def test_split_tree_with_one_element(self):
+
+        root = MElement("body")
+
+        splitElements, subtreeRoots = splitTree(root, 8)
+
+        self.assertEqual(splitElements, set())
+        self.assertEqual(subtreeRoots, set([root]))
+
+    def test_resolve_tree_in_parallel(self):
+
+        document = importMorphDocument(example1)
+        root = makeElements(300)
+
+        styles1 = MStyleResolver(document).resolveTree(root)
+        styles2 = resolveTreeInParallel(document, root, 2)
+
+        self.assertEqual(list(styles1), list(styles2))
+
+        for element in styles1:
+            self.assertEqual(set(styles1[element].properties), set(styles2[element].properties))
+            self.assertEqual([str(v) for v in styles1[element].properties.values()], [str(v) for v in styles2[element].properties.values()])
+
+            if element.parent != None:
+                self.assertIs(styles2[element].parent, styles2[element.parent])
+
+    def test_resolve_deep_tree_in_parallel(self):
+
+        document = importMorphDocument(example1)
+
+        root = MElement("body")
+
+        for i in range(8):
+            element = root
+
+            for j in range(1500):
+                element = element.addSubelement(MElement("div" if j % 2 else "p", "", ["a"] if j % 3 else ["b"]))
+
+        styles1 = MStyleResolver(document).resolveTree(root)
+        styles2 = resolveTreeInParallel(document, root, 2)
+
+        self.assertEqual(len(styles2), 12001)
+        getTexts = lambda styles: [sorted([(k, str(v)) for k, v in s.properties.items()]) for s in styles.values()]
+
+        # assertEqual would spend minutes diffing the lists if they differed.
+        self.assertTrue(getTexts(styles1) == getTexts(styles2))
+
+    def test_resolve_subtree_in_parallel(self):
+
+        document = importMorphDocument(example1 + ".a .b .c span { font-name: C; }\ndiv p.b span { font-name: D; }")
+        root = makeElements(2000)
+
+        # The largest subtree that is two elements below the root, so that it
+        # has ancestors that subelement selectors can match.
+        subtrees = [e for element in root.subelements for e in element.subelements]
+        sizes = [len(list(iterateElements(e))) for e in subtrees]
+        element = subtrees[sizes.index(max(sizes))]
+
+        parentStyle = MStyleResolver(document).resolveTree(root)[element.parent]
+
+        for p in [None, parentStyle]:
+            styles1 = MStyleResolver(document).resolveTree(element, p)
+            styles2 = resolveTreeInParallel(document, element, 2, parentStyle=p)
+
+            self.assertEqual(list(styles1), list(styles2))
+
+            for e in styles1:
+                self.assertEqual(sorted([(k, str(v)) for k, v in styles1[e].properties.items()]), sorted([(k, str(v)) for k, v in styles2[e].properties.items()]))
+
+    def test_import_documents_in_parallel(self):
+
+        texts = ["p.c{0} {{ font-name: A{0}; }}\n".format(i) * (i % 5 + 1) for i in range(40)]
+
+        documents = importMorphDocumentsInParallel(texts, 4)
+
+        self.assertEqual([exportMorphDocument(d) for d in documents], [exportMorphDocument(importMorphDocument(t)) for t in texts])
+
+    def test_validation_errors_in_parallel(self):
+
+        # Each document has its invalid property in a different style rule, 
+        # so the threads sharing the importer mustn't mix up their positions.
+        texts = ["p { font-name: A; }\n" * i + "div { font-weight: heavy; }" for i in range(20)]
+        importer = MImporter(defaultValidator)
+
+        def getStyleRuleIndex(text):
+            try:
+                importer.importDocument(text)
+            except MorphValidationError as e:
+                return e.styleRuleIndex
+
+        with ThreadPoolExecutor(4) as executor:
+            indices = list(executor.map(getStyleRuleIndex, texts))
+
+        self.assertEqual(indices, list(range(20)))
+
+    def test_import_files_in_parallel(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+            filePaths = []
+
+            for i in range(10):
+                filePath = os.path.join(directory, "{0}.morph".format(i))
+                filePaths.append(filePath)
+
+                with open(filePath, "w") as fo:
+                    fo.write("p {{ font-name: A{0}; }}".format(i))
+
+            documents = importMorphDocumentsFromFilesInParallel(filePaths, 4)
+
+        self.assertEqual([str(d.styleRules[0].properties[0]) for d in documents], ["font-name: A{0};".format(i) for i in range(10)])
+
+    def test_is_gil_enabled(self):
+
+        self.assertIsInstance(isGILEnabled(), bool)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+import unittest
+from parameterized import parameterized
+
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+from tests.fixtures import makeElements
+
+example1 = """
+
+p {
+    font-colour: black;
+}
+
+.red { font-colour: red; }
+
+#infobox { font-height: 14pt; }
+
+div.main p.red { font-weight: bold; }
+
+section p { line-height: 16pt; }
+
+"""
+
+
+class TestResolution(unittest.TestCase):
+
+    def setUp(self):
+
+        self.document = importMorphDocument(example1)
+
+        self.root = MElement("div", "infobox", ["main"])
+        self.p1 = self.root.addSubelement(MElement("p", "", ["red"]))
+        self.p2 = self.root.addSubelement(MElement("p"))
+        self.h1 = self.root.addSubelement(MElement("h1", "", ["red"]))
+
+    def getIndices(self, rules):
+        return [self.document.styleRules.index(sr) for sr in rules]
+
+    def test_get_matching_rules(self):
+
+        resolver = MStyleResolver(self.document)
+
+        self.assertEqual(self.getIndices(resolver.getMatchingRules(self.root)), [2])
+        self.assertEqual(self.getIndices(resolver.getMatchingRules(self.p1)), [0, 1, 3])
+        self.assertEqual(self.getIndices(resolver.getMatchingRules(self.p2)), [0])
+        self.assertEqual(self.getIndices(resolver.getMatchingRules(self.h1)), [1])
+
+    def test_matching_rules_agree_with_naive_matching(self):
+
+        resolver = MStyleResolver(self.document)
+
+        for element in iterateElements(self.root):
+            naive = [sr for sr in self.document.styleRules if resolver.matches(element, sr)]
+            naive.sort(key=lambda sr: (sr.specificity, self.document.styleRules.index(sr)))
+
+            self.assertEqual(resolver.getMatchingRules(element), naive)
+
+    @parameterized.expand([
+        ["p", (0, 0, 1)],
+        [".red", (0, 1, 0)],
+        ["p.red.main#big", (1, 2, 1)],
+        ["div.main p.red", (0, 2, 2)],
+        ["#a #b", (2, 0, 0)],
+    ])
+    def test_specificity(self, text, specificity):
+
+        sr = importMorphDocument(text + " {}").styleRules[0]
+
+        self.assertEqual(sr.specificity, specificity)
+
+    def test_specificity_is_recalculated_when_selectors_are_set(self):
+
+        sr = importMorphDocument("p {}").styleRules[0]
+
+        self.assertEqual(sr.specificity, (0, 0, 1))
+
+        sr.selectors = [MIdSelector("big")]
+
+        self.assertEqual(sr.specificity, (1, 0, 0))
+
+    def test_cascade_order(self):
+
+        document = importMorphDocument("#a { x: 1; } .b { x: 2; } p { x: 3; } .c { x: 4; }")
+        cascade = MCascade(document)
+
+        self.assertEqual([isr.sourceIndex for isr in cascade.rankedRules], [2, 1, 3, 0])
+
+    def test_more_specific_rules_win(self):
+
+        document = importMorphDocument("#infobox p { x: 1; } p.red { x: 2; } p { x: 3; y: 4; }")
+        resolver = MStyleResolver(document)
+
+        self.assertEqual(resolver.getCascadedProperties(self.p1), {"x": "1", "y": "4"})
+        self.assertEqual(resolver.getCascadedProperties(self.p2), {"x": "1", "y": "4"})
+        self.assertEqual(resolver.getCascadedProperties(self.h1), {})
+
+    def test_get_property_value(self):
+
+        resolver = MStyleResolver(self.document)
+
+        for element in iterateElements(self.root):
+            properties = resolver.getCascadedProperties(element)
+
+            for name in ["font-colour", "font-height", "font-weight", "line-height"]:
+                self.assertIs(resolver.getPropertyValue(element, name), properties.get(name))
+
+    def test_resolve_tree(self):
+
+        resolver = MStyleResolver(self.document)
+
+        styles = resolver.resolveTree(self.root)
+
+        self.assertEqual(list(styles), list(iterateElements(self.root)))
+        self.assertEqual(list(styles[self.root].properties), ["font-height"])
+        self.assertEqual(str(styles[self.p1].getPropertyValue("font-colour")), "red")
+        self.assertEqual(styles[self.p1].getPropertyValue("font-weight"), "bold")
+        self.assertEqual(str(styles[self.p1].getPropertyValue("font-height")), "14pt")
+        self.assertEqual(str(styles[self.p2].getPropertyValue("font-colour")), "black")
+        self.assertIs(styles[self.p1].parent, styles[self.root])
+
+    def test_only_inherited_properties_are_inherited(self):
+
+        document = importMorphDocument("div { font-name: Arial; page-size: a4; }")
+        resolver = MStyleResolver(document)
+
+        styles = resolver.resolveTree(self.root)
+
+        self.assertEqual(styles[self.p1].properties, {"font-name": "Arial"})
+
+    def test_computed_styles_are_shared(self):
+
+        root = MElement("div")
+
+        for i in range(100):
+            root.addSubelement(MElement("p", "", ["red"])).addSubelement(MElement("span"))
+
+        resolver = MStyleResolver(self.document)
+
+        styles = resolver.resolveTree(root)
+
+        self.assertEqual(len(set(styles.values())), 3)
+        self.assertEqual(resolver.styleCache.misses, 3)
+        self.assertEqual(resolver.styleCache.hits, 198)
+
+    def test_computed_styles_depend_on_ancestors(self):
+
+        document = importMorphDocument("div.a p { font-name: Arial; }")
+
+        root = MElement("body")
+        p1 = root.addSubelement(MElement("div", "", ["a"])).addSubelement(MElement("p"))
+        p2 = root.addSubelement(MElement("div", "", ["b"])).addSubelement(MElement("p"))
+
+        resolver = MStyleResolver(document)
+
+        styles = resolver.resolveTree(root)
+
+        self.assertEqual(styles[p1].properties, {"font-name": "Arial"})
+        self.assertEqual(styles[p2].properties, {})
+
+    def test_style_cache_evicts_least_recently_used(self):
+
+        cache = MStyleCache(2)
+
+        cache.put("a", MComputedStyle())
+        cache.put("b", MComputedStyle())
+        cache.get("a")
+        cache.put("c", MComputedStyle())
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.hitRate, 2 / 3)
+
+    def test_ancestor_filter_does_not_change_styles(self):
+
+        document = importMorphDocument("""
+            div p { font-name: A; }
+            .a .b span { font-name: B; }
+            #x .c { font-name: C; }
+            section.a p.b { font-name: D; }
+            span { font-weight: bold; }
+        """)
+
+        root = makeElements(500)
+        elements = list(iterateElements(root))
+
+        styles1 = MStyleResolver(document, 0, False).resolveTree(root)
+        styles2 = MStyleResolver(document, 0, True).resolveTree(root)
+
+        for element in elements:
+            self.assertEqual(styles1[element].properties, styles2[element].properties)
+
+    def test_resolve_subtree_with_ancestor_filter(self):
+
+        # p1 only matches div.main p.red because of its parent, which isn't 
+        # part of the subtree being resolved.
+        styles1 = MStyleResolver(self.document, 0, True).resolveTree(self.p1)
+        styles2 = MStyleResolver(self.document, 0, False).resolveTree(self.p1)
+
+        self.assertEqual(styles1[self.p1].getPropertyValue("font-weight"), "bold")
+        self.assertEqual(styles1[self.p1].properties, styles2[self.p1].properties)
+
+    def test_resolve_subtree(self):
+
+        resolver = MStyleResolver(self.document)
+
+        parentStyle = resolver.resolveStyle(self.root)
+        styles = resolver.resolveTree(self.p1, parentStyle)
+
+        self.assertEqual(list(styles), [self.p1])
+        self.assertEqual(styles[self.p1].getPropertyValue("font-weight"), "bold")
+        self.assertEqual(str(styles[self.p1].getPropertyValue("font-height")), "14pt")
+
+    def test_computed_styles_are_immutable(self):
+
+        style = MComputedStyle({"font-name": "Arial"})
+
+        with self.assertRaises(AttributeError):
+            style.parent = MComputedStyle()
+
+        with self.assertRaises(TypeError):
+            style.cascadedProperties["font-name"] = "Times"
+
+    def test_get_cascaded_properties_dict(self):
+
+        properties = {"font-name": "Arial"}
+        style = MComputedStyle(properties)
+
+        self.assertIs(style.getCascadedPropertiesDict(), properties)
+        self.assertIs(MComputedStyle(style.getCascadedPropertiesDict()).getCascadedPropertiesDict(), properties)
+
+    def test_inherited_values_are_shared(self):
+
+        document = importMorphDocument("body { font-name: Arial; page-size: a4; } .big { font-height: 20pt; } .wide { page-width: 30cm; }")
+
+        root = MElement("body")
+        element = root
+
+        for i in range(100):
+            element = element.addSubelement(MElement("div", "", ["wide"] if i % 2 == 0 else []))
+
+        big = element.addSubelement(MElement("p", "", ["big"]))
+        small = big.addSubelement(MElement("span"))
+
+        styles = MStyleResolver(document).resolveTree(root)
+
+        self.assertEqual(element.parent.classes, ["wide"])
+        self.assertEqual(styles[element].getPropertyValue("font-name"), "Arial")
+        self.assertEqual(styles[element].getPropertyValue("page-size"), None)
+        self.assertIsNotNone(styles[element.parent].getPropertyValue("page-width"))
+        self.assertEqual(styles[element].getPropertyValue("page-width"), None)
+        self.assertEqual(set(styles[small].properties), set(["font-name", "font-height"]))
+
+        # Only the root element and the element with the class 'big' set 
+        # inherited properties, so there should only be two tables of 
+        # inherited values.
+        tables = set([id(s._getInheritedValues()) for s in styles.values()])
+
+        self.assertEqual(len(tables), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
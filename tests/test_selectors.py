@@ -0,0 +1,134 @@
+import unittest
+from parameterized import parameterized
+
+from morph.core import *
+from morph.elements import *
+from morph.selectors import *
+from morph.selectors import _compileSource
+
+
+def getSelectors(text):
+    importer = MImporter()
+
+    return importer._getSelectorSets(text, MMarker())[0]
+
+
+class TestSelectors(unittest.TestCase):
+
+    @parameterized.expand([
+        ["p", ["p"]],
+        ["p.red", ["p.red"]],
+        ["div p", ["div", "p"]],
+        ["div.main #infobox p.red.big", ["div.main", "#infobox", "p.red.big"]],
+    ])
+    def test_split_selectors(self, text, compounds):
+
+        cc = splitSelectors(getSelectors(text))
+
+        self.assertEqual(["".join([str(s) for s in c]) for c in cc], compounds)
+
+    @parameterized.expand([
+        ["p", "p"],
+        ["p.red", ".red"],
+        ["p.red#big", "#big"],
+        [".red.main", ".red"],
+    ])
+    def test_get_key_selector(self, text, key):
+
+        self.assertEqual(str(getKeySelector(getSelectors(text))), key)
+
+    matchCases = [
+        ["p", True],
+        ["p.red", True],
+        ["p.red.main", True],
+        ["p.red#big", True],
+        ["p.blue", False],
+        ["h1", False],
+        ["#small", False],
+        ["div p", True],
+        ["div.main p", True],
+        ["div.main section p.red", True],
+        ["section div p", False],
+        ["div.side p", False],
+        ["p p", False],
+        ["div div p", False],
+        ["#big", True],
+        ["p#small", False],
+    ]
+
+    def getElement(self):
+        root = MElement("div", "", ["main"])
+        section = root.addSubelement(MElement("section"))
+        p = section.addSubelement(MElement("p", "big", ["red", "main"]))
+
+        return p
+
+    @parameterized.expand(matchCases)
+    def test_matches_selectors(self, text, result):
+
+        self.assertEqual(matchesSelectors(self.getElement(), getSelectors(text)), result)
+
+    @parameterized.expand(matchCases)
+    def test_compiled_selectors(self, text, result):
+
+        match = compileSelectors(getSelectors(text))
+
+        self.assertEqual(match(self.getElement()), result)
+
+    def test_compiled_selectors_are_cached(self):
+
+        m1 = compileSelectors(getSelectors("div.main p"))
+        m2 = compileSelectors(getSelectors("div.main p"))
+        m3 = compileSelectors(getSelectors("div.main  p"))
+        m4 = compileSelectors(getSelectors("div p"))
+
+        self.assertIs(m1, m2)
+        self.assertIs(m1, m3)
+        self.assertIsNot(m1, m4)
+
+    def test_compiled_selectors_cache_is_bounded(self):
+
+        for i in range(compiledSelectorsCacheSize + 10):
+            compileSelectors(getSelectors("p.c{0}".format(i)))
+
+        self.assertEqual(_compileSource.cache_info().currsize, compiledSelectorsCacheSize)
+
+    def test_ancestor_filter(self):
+
+        f = MAncestorFilter()
+
+        div = MElement("div", "main", ["red"])
+        p = MElement("p")
+
+        hashes = [f.getHashes(t) for t in ["div", ".red", "#main"]]
+
+        self.assertFalse(f.mightContainAll(hashes))
+
+        f.push(div)
+        f.push(p)
+
+        self.assertTrue(f.mightContainAll(hashes))
+        self.assertTrue(f.mightContainAll([f.getHashes("p")]))
+        self.assertFalse(f.mightContainAll([f.getHashes(".blue")]))
+
+        f.pop(p)
+
+        self.assertTrue(f.mightContainAll(hashes))
+        self.assertFalse(f.mightContainAll([f.getHashes("p")]))
+
+        f.pop(div)
+
+        self.assertFalse(f.mightContainAll(hashes[:1]))
+
+    @parameterized.expand([
+        ["p", []],
+        ["div p", ["div"]],
+        ["div.main #infobox p.red.big", ["#infobox", ".main", "div"]],
+    ])
+    def test_get_ancestor_features(self, text, features):
+
+        self.assertEqual(getAncestorFeatures(splitSelectors(getSelectors(text))), features)
+
+
+if __name__ == "__main__":
+    unittest.main()
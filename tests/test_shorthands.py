@@ -0,0 +1,88 @@
+import unittest
+from parameterized import parameterized
+
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+from morph.shorthands import *
+
+
+class TestShorthands(unittest.TestCase):
+
+    @parameterized.expand([
+        ["margin: 12pt;", [12, 12, 12, 12]],
+        ["margin: 12pt 16pt;", [12, 16, 12, 16]],
+        ["margin: 1pt 2pt 3pt;", [1, 2, 3, 2]],
+        ["margin: 1pt 2pt 3pt 4pt;", [1, 2, 3, 4]],
+        ["margin: 1in 0pt;", [72, 0, 72, 0]],
+    ])
+    def test_expand_margin(self, text, points):
+
+        p = importMorphProperties(text)[0]
+
+        properties = expandProperty(p)
+
+        self.assertEqual([q.name for q in properties], ["margin-top", "margin-right", "margin-bottom", "margin-left"])
+        self.assertEqual([q.value.toPoints() for q in properties], points)
+        self.assertTrue(all(isinstance(q.value, MResolvedLength) for q in properties))
+
+    def test_expand_page_margin(self):
+
+        properties = expandProperty(importMorphProperties("page-margin: 2cm 1cm;")[0])
+
+        self.assertEqual([q.name for q in properties], ["page-margin-top", "page-margin-right", "page-margin-bottom", "page-margin-left"])
+        self.assertAlmostEqual(properties[0].value.points, 56.6929133858)
+
+    def test_lengths_are_converted_to_points(self):
+
+        properties = expandProperty(importMorphProperties("font-height: 1pc;")[0])
+
+        self.assertEqual(len(properties), 1)
+        self.assertEqual(properties[0].value.points, 12)
+        self.assertEqual(str(properties[0]), "font-height: 12pt;")
+
+    @parameterized.expand([
+        ["font-name: Arial;"],
+        ["margin: 1pt 2pt 3pt 4pt 5pt;"],
+    ])
+    def test_other_properties_are_unchanged(self, text):
+
+        p = importMorphProperties(text)[0]
+
+        self.assertEqual(expandProperty(p), [p])
+
+    def test_expand_document(self):
+
+        document = importMorphDocument("p, div { margin: 2pt 4pt; font-name: A; } span { font-name: B; } div { margin-left: 1pt; }")
+
+        d = expandShorthands(document)
+
+        self.assertEqual(len(d.styleRules), 4)
+        self.assertIsNot(d.styleRules[2], document.styleRules[2])
+        self.assertIsNot(d.styleRules[2].selectors, document.styleRules[2].selectors)
+        self.assertIsNot(d.styleRules[2].properties[0], document.styleRules[2].properties[0])
+        self.assertEqual(exportMorphProperties(d.styleRules[2].properties), "font-name: B;")
+        self.assertEqual(exportMorphProperties(d.styleRules[0].properties), "margin-top: 2pt; margin-right: 4pt; margin-bottom: 2pt; margin-left: 4pt; font-name: A;")
+        self.assertIs(d.styleRules[0].properties[0], d.styleRules[1].properties[0])
+
+        self.assertEqual(exportMorphProperties(document.styleRules[0].properties), "margin: 2pt 4pt; font-name: A;")
+
+        d.styleRules[2].selectors.append(MClassSelector("x"))
+        d.styleRules[2].properties[0].value = "C"
+
+        self.assertEqual(document.styleRules[2].selectorText, "span")
+        self.assertEqual(exportMorphProperties(document.styleRules[2].properties), "font-name: B;")
+
+    def test_longhand_properties_cascade(self):
+
+        document = expandShorthands(importMorphDocument("div { margin-left: 1pt; } div { margin: 2pt 4pt; } .a { margin-top: 8pt; }"))
+
+        element = MElement("div", "", ["a"])
+        resolver = MStyleResolver(document)
+
+        self.assertEqual(resolver.getPropertyValue(element, "margin-top").toPoints(), 8)
+        self.assertEqual(resolver.getPropertyValue(element, "margin-left").toPoints(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+from morph.streaming import *
+from tests.fixtures import example1, makeElements
+
+class TestStreaming(unittest.TestCase):
+
+    def test_get_element_events(self):
+
+        root = MElement("body")
+        div = root.addSubelement(MElement("div", "x", ["a"]))
+        div.addSubelement(MElement("p"))
+        root.addSubelement(MElement("span"))
+
+        events = list(getElementEvents(root))
+
+        self.assertEqual(events, [("start", "body", "", []), ("start", "div", "x", ["a"]), ("start", "p", "", []), ("end",), ("end",), ("start", "span", "", []), ("end",), ("end",)])
+
+    def test_styles_match_resolve_tree(self):
+
+        document = importMorphDocument(example1)
+        root = makeElements(500)
+
+        expectedStyles = MStyleResolver(document).resolveTree(root)
+        styler = MStreamingStyler(document)
+
+        results = list(styler.styleEvents(getElementEvents(root)))
+
+        self.assertEqual(len(results), len(expectedStyles))
+
+        for (element, style), (e, expectedStyle) in zip(results, expectedStyles.items()):
+            self.assertEqual(element.elementName, e.elementName)
+            self.assertEqual(str(style.properties), str(expectedStyle.properties))
+
+        self.assertEqual(styler.depth, 0)
+
+    def test_only_open_elements_are_kept(self):
+
+        document = importMorphDocument(example1)
+        styler = MStreamingStyler(document)
+
+        body, _ = styler.startElement("body")
+
+        for i in range(1000):
+            element, style = styler.startElement("p", "", ["a"])
+            styler.endElement()
+
+        self.assertEqual(styler.maximumDepth, 2)
+        self.assertEqual(body.subelements, [])
+        self.assertEqual(element.parent, body)
+
+    def test_inherited_properties(self):
+
+        document = importMorphDocument(".a { font-height: 12pt; }")
+        styler = MStreamingStyler(document)
+
+        styler.startElement("div", "", ["a"])
+        element, style = styler.startElement("p")
+
+        self.assertEqual(str(style.getPropertyValue("font-height")).strip(), "12pt")
+
+    def test_end_without_start(self):
+
+        styler = MStreamingStyler(importMorphDocument(example1))
+
+        with self.assertRaises(ValueError):
+            styler.endElement()
+
+        with self.assertRaises(ValueError):
+            list(styler.styleEvents([("middle",)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from parameterized import parameterized
+
+from morph.core import *
+from morph.validation import *
+
+example1 = """
+
+p {
+    font-name: Times New Roman;
+    font-height: 12pt;
+    font-weight: bold;
+    font-color: red;
+}
+
+.a {
+    font-height: 12pt 14pt;
+    font-sise: 12pt;
+    page-size: a4;
+}
+
+h1 {
+    font-weight: 750;
+    font-colour: 12pt;
+}
+
+"""
+
+
+class TestValidation(unittest.TestCase):
+
+    @parameterized.expand([
+        ["font-height: 12pt;", True],
+        ["font-height: 12pt 14pt;", False],
+        ["font-height: large;", False],
+        ["font-colour: red;", True],
+        ["font-colour: #ff0000;", True],
+        ["font-colour: rgb(255, 0, 0);", True],
+        ["font-colour: 12pt;", False],
+        ["font-colour: reddish;", False],
+        ["font-weight: bold;", True],
+        ["font-weight: 700;", True],
+        ["font-weight: 750;", False],
+        ["font-weight: 1000;", False],
+        ["font-name: Arial;", True],
+        ["font-name: 12pt;", False],
+        ["background-color: blue;", False],
+        ["font-color: blue;", True],
+    ])
+    def test_validate_property(self, text, isValid):
+
+        p = importMorphProperties(text)[0]
+
+        self.assertEqual(MValidator().validateProperty(p) == None, isValid)
+
+    @parameterized.expand([
+        [" red", True],
+        [" #ff0000", True],
+        [" rgb(255, 0, 0)", True],
+        [" rgb(255, 0)", False],
+        [" #12", False],
+        [" 12pt", False],
+        ["reddish", False],
+    ])
+    def test_is_colour(self, text, result):
+
+        self.assertEqual(isColour(text), result)
+        self.assertEqual(getColourFromText(text) != None, result)
+
+    def test_get_all_errors(self):
+
+        errors = getValidationErrors(importMorphDocument(example1))
+
+        self.assertEqual([(e.styleRuleIndex, e.propertyIndex) for e in errors], [(1, 0), (1, 1), (2, 0), (2, 1)])
+        self.assertEqual(str(errors[1]), "'font-sise' is not a valid Morph property name.")
+        self.assertEqual(str(errors[3]), "'font-colour' must be a colour.")
+
+    def test_validate_document_raises_first_error(self):
+
+        with self.assertRaises(MorphValidationError) as c:
+            validateDocument(importMorphDocument(example1))
+
+        self.assertEqual(str(c.exception), "'font-height' must be a length.")
+
+        validateDocument(importMorphDocument("p { font-height: 12pt; }"))
+
+    def test_custom_schema(self):
+
+        validator = MValidator([["width", "MLength"]], {"breadth": "width"})
+
+        errors = validator.validateDocument(importMorphDocument("p { breadth: 1pt; width: blue; font-name: A; }"))
+
+        self.assertEqual([e.propertyIndex for e in errors], [1, 2])
+
+    def test_validate_while_importing(self):
+
+        with self.assertRaises(MorphValidationError) as c:
+            importMorphDocument(example1, True)
+
+        self.assertEqual((c.exception.styleRuleIndex, c.exception.propertyIndex), (1, 0))
+
+        document = importMorphDocument("p, div { font-color: red; } h1 { font-height: 12pt; }", True)
+
+        self.assertEqual(len(document.styleRules), 3)
+
+    def test_validate_inline_properties(self):
+
+        with self.assertRaises(MorphValidationError) as c:
+            importMorphProperties("font-height: 12pt; font-weight: heavy;", True)
+
+        self.assertEqual((c.exception.styleRuleIndex, c.exception.propertyIndex), (None, 1))
+
+    def test_importer_with_custom_validator(self):
+
+        importer = MImporter(MValidator([["width", "MLength"]], {}))
+
+        self.assertEqual(len(importer.importDocument("p { width: 1pt; }").styleRules), 1)
+
+        with self.assertRaises(MorphValidationError):
+            importer.importDocument("p { font-height: 1pt; }")
+
+
+if __name__ == "__main__":
+    unittest.main()
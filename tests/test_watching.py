@@ -0,0 +1,193 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+from morph.core import *
+from morph.validation import MorphValidationError, defaultValidator
+from morph.watching import *
+
+
+def isInotifyAvailable():
+    try:
+        MInotifyBackend().close()
+        return True
+    except (OSError, AttributeError, TypeError):
+        return False
+
+
+class TestWatching(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.time = 1000000000
+
+        self.writeFile("base.morph", "p { font-name: A; }")
+        self.writeFile("main.morph", "@include \"base.morph\";\nh1 { font-height: 20pt; }")
+        self.writeFile("other.morph", "h2 { font-height: 16pt; }")
+
+        self.mainPath = os.path.join(self.directory, "main.morph")
+        self.otherPath = os.path.join(self.directory, "other.morph")
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, name, text):
+
+        path = os.path.join(self.directory, name)
+
+        with open(path, "w") as fo:
+            fo.write(text)
+
+        self.time += 1
+        os.utime(path, ns=(self.time, self.time))
+
+    def getSelectors(self, document):
+
+        return [sr.selectorText for sr in document.styleRules]
+
+    def test_files_changed(self):
+
+        watcher = MSheetWatcher([self.mainPath, self.otherPath], MPollingBackend(0.01))
+        parseCount = watcher.resolver.parseCount
+
+        self.writeFile("base.morph", "p { font-name: B; }")
+
+        updates = watcher.filesChanged([os.path.join(self.directory, "base.morph")])
+
+        self.assertEqual([u.filePath for u in updates], [self.mainPath])
+        self.assertEqual(self.getSelectors(updates[0].document), ["p", "h1"])
+        self.assertEqual(watcher.resolver.parseCount, parseCount + 1)
+        self.assertIs(watcher.documents[self.mainPath], updates[0].document)
+
+    def test_errors_are_published(self):
+
+        watcher = MSheetWatcher([self.mainPath], MPollingBackend(0.01))
+
+        self.writeFile("main.morph", "@include \"missing.morph\";")
+
+        updates = watcher.filesChanged([self.mainPath])
+
+        self.assertEqual(updates[0].document, None)
+        self.assertTrue(isinstance(updates[0].error, MorphIncludeError))
+
+    def test_validation_errors_are_published(self):
+
+        resolver = MIncludeResolver(MImporter(defaultValidator))
+        watcher = MSheetWatcher([self.mainPath], MPollingBackend(0.01), resolver=resolver)
+
+        self.writeFile("base.morph", "p { font-height: large; }")
+
+        updates = watcher.filesChanged([os.path.join(self.directory, "base.morph")])
+
+        self.assertEqual(updates[0].document, None)
+        self.assertTrue(isinstance(updates[0].error, MorphValidationError))
+
+    def test_errors_on_the_watcher_thread_are_reported(self):
+
+        class MFailingBackend(MPollingBackend):
+
+            def wait(self, timeout):
+                if not failed.is_set():
+                    failed.set()
+                    raise RuntimeError("backend")
+
+                return super(MFailingBackend, self).wait(timeout)
+
+        failed = threading.Event()
+        errors = []
+        updates = []
+        received = threading.Event()
+
+        def failingCallback(update):
+            raise RuntimeError("callback")
+
+        def callback(update):
+            updates.append(update)
+            received.set()
+
+        watcher = MSheetWatcher([self.otherPath], MFailingBackend(0.01), debounceTime=0.01)
+        watcher.subscribe(failingCallback)
+        watcher.subscribe(callback)
+
+        with unittest.mock.patch("sys.excepthook", lambda t, e, tb: errors.append(str(e))):
+            watcher.start()
+
+            try:
+                self.assertTrue(failed.wait(5))
+
+                for i in range(2):
+                    received.clear()
+                    self.writeFile("other.morph", "h{0} {{ font-height: 14pt; }}".format(i + 3))
+                    self.assertTrue(received.wait(5))
+            finally:
+                watcher.stop()
+
+        self.assertEqual([self.getSelectors(u.document) for u in updates], [["h3"], ["h4"]])
+        self.assertEqual(errors, ["backend", "callback", "callback"])
+
+    def assertWatches(self, backend):
+
+        watcher = MSheetWatcher([self.mainPath, self.otherPath], backend, debounceTime=0.05)
+        updates = []
+        received = threading.Event()
+
+        def callback(update):
+            updates.append(update)
+            received.set()
+
+        watcher.subscribe(callback)
+        watcher.start()
+
+        try:
+            # A burst of saves should only give one update.
+            for i in range(3):
+                self.writeFile("base.morph", "p {{ font-name: {0}; }}".format("ABC"[i]))
+
+            self.assertTrue(received.wait(5))
+
+            received.clear()
+            self.assertFalse(received.wait(0.3))
+        finally:
+            watcher.stop()
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0].filePath, self.mainPath)
+        self.assertEqual(str(updates[0].document.styleRules[0].properties[0].value).strip(), "C")
+
+    def test_polling_backend(self):
+
+        self.assertWatches(MPollingBackend(0.01))
+
+    @unittest.skipUnless(isInotifyAvailable(), "inotify isn't available")
+    def test_inotify_backend(self):
+
+        self.assertWatches(MInotifyBackend())
+
+    def test_asyncio_queue(self):
+
+        watcher = MSheetWatcher([self.otherPath], MPollingBackend(0.01), debounceTime=0.01)
+
+        async def watch():
+            queue = watcher.getQueue()
+            watcher.start()
+
+            self.writeFile("other.morph", "h3 { font-height: 14pt; }")
+
+            return await asyncio.wait_for(queue.get(), 5)
+
+        try:
+            update = asyncio.run(watch())
+        finally:
+            watcher.stop()
+
+        self.assertEqual(self.getSelectors(update.document), ["h3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
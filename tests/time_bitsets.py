@@ -0,0 +1,50 @@
+from morph.bitsets import *
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 1000
+numberOfElements = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(200)]
+
+document = MDocument()
+
+for i in range(numberOfRules):
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames))] + [MClassSelector(c) for c in random.sample(classNames, random.randint(1, 2))]
+
+    if random.random() < 0.2:
+        sr.selectors = [MClassSelector(random.choice(classNames)), MSubelementSelector()] + sr.selectors
+
+    sr.properties = [MProperty("font-height", "{0}pt".format(i % 20 + 8))]
+
+    document.styleRules.append(sr)
+
+# A large, flat document - a few sections with many paragraphs each.
+root = MElement("body")
+
+for i in range(numberOfElements // 1000):
+    section = root.addSubelement(MElement("section", "", random.sample(classNames, 2)))
+
+    for j in range(999):
+        section.addSubelement(MElement(random.choice(elementNames), "", random.sample(classNames, random.randint(0, 4))))
+
+elements = list(iterateElements(root))
+
+matcher = MBitsetMatcher(document)
+
+t1 = timeit.timeit(lambda: matcher.matchElements(elements), number=1)
+
+resolver = MStyleResolver(document)
+
+t2 = timeit.timeit(lambda: [resolver.getMatchingRules(e) for e in elements], number=1)
+
+print("{0} elements x {1} rules: {2:.3f}s with bitsets, {3:.3f}s with the style resolver".format(len(elements), numberOfRules, t1, t2))
@@ -0,0 +1,58 @@
+from morph.columns import *
+from morph.core import *
+from morph.elements import *
+from morph.invalidation import *
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfElements = 100000
+propertyNames = ["font-height", "line-height", "font-colour"]
+
+document = importMorphDocument("""
+
+body { font-height: 10pt; line-height: 12pt; font-colour: black; }
+h1 { font-height: 20pt; line-height: 24pt; }
+h2 { font-height: 16pt; line-height: 20pt; }
+.note { font-height: 8pt; font-colour: gray; }
+.warning { font-colour: red; }
+
+""")
+
+root = MElement("body")
+
+for i in range(numberOfElements // 10):
+    section = root.addSubelement(MElement("section"))
+
+    section.addSubelement(MElement(random.choice(["h1", "h2"])))
+
+    for j in range(8):
+        section.addSubelement(MElement("p", "", random.sample(["note", "warning", "x"], random.randint(0, 2))))
+
+elements = list(iterateElements(root))
+tree = MStyledTree(document, root)
+
+
+def getOneAtATime():
+    values = {n: [] for n in propertyNames}
+
+    for e in elements:
+        style = tree.getStyle(e)
+
+        for n in propertyNames:
+            v = style.getPropertyValue(n)
+
+            if getPropertyType(n) == "MLength":
+                values[n].append(v.lengths[0].toPoints() if v != None else float("nan"))
+            else:
+                values[n].append(v.toPackedRGBA() if v != None else 0)
+
+    return values
+
+
+t1 = timeit.timeit(getOneAtATime, number=1)
+t2 = timeit.timeit(lambda: tree.getStyleColumns(elements, propertyNames), number=1)
+
+print("{0} elements x {1} properties: {2:.3f}s one at a time, {3:.3f}s as columns".format(len(elements), len(propertyNames), t1, t2))
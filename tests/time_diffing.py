@@ -0,0 +1,49 @@
+from morph.core import *
+from morph.diffing import *
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(2000)]
+propertyNames = ["font-name", "font-height", "font-weight", "font-colour", "line-height", "text-alignment", "page-size"]
+
+
+def makeStyleRule():
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+    sr.properties = [MProperty(random.choice(propertyNames), random.choice(["A", "B", "C"])) for i in range(2)]
+
+    return sr
+
+
+oldDocument = MDocument()
+oldDocument.styleRules = [makeStyleRule() for i in range(numberOfRules)]
+
+# A new version with some style rules added, removed, changed and moved.
+newStyleRules = list(oldDocument.styleRules)
+
+for i in range(100):
+    newStyleRules.insert(random.randrange(len(newStyleRules)), makeStyleRule())
+    del newStyleRules[random.randrange(len(newStyleRules))]
+
+    j = random.randrange(len(newStyleRules))
+    sr = MStyleRule()
+    sr.selectors = newStyleRules[j].selectors
+    sr.properties = [MProperty("font-weight", "bold")]
+    newStyleRules[j] = sr
+
+    newStyleRules.append(newStyleRules.pop(random.randrange(len(newStyleRules))))
+
+newDocument = MDocument()
+newDocument.styleRules = newStyleRules
+
+t = min(timeit.repeat(lambda: diffMorphDocuments(oldDocument, newDocument), number=1, repeat=5))
+diff = diffMorphDocuments(oldDocument, newDocument)
+
+print("{0} style rules: {1:.3f}s, {2} added, {3} removed, {4} modified, {5} moved".format(numberOfRules, t, len(diff.addedStyleRules), len(diff.removedStyleRules), len(diff.modifiedStyleRules), len(diff.movedStyleRules)))
@@ -0,0 +1,37 @@
+from morph.core import *
+
+import hashlib
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(2000)]
+propertyNames = ["font-name", "font-height", "font-weight", "font-colour", "line-height", "text-alignment", "page-size"]
+
+document = MDocument()
+
+for i in range(numberOfRules):
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+    sr.properties = [MProperty(random.choice(propertyNames), random.choice(["A", "B", "C"])) for i in range(2)]
+
+    document.styleRules.append(sr)
+
+t1 = timeit.timeit(lambda: hashlib.blake2b(exportMorphDocument(document).encode("utf-8"), digest_size=16).digest(), number=1)
+t2 = timeit.timeit(lambda: document.fingerprint, number=1)
+
+
+def edit():
+    document.styleRules[random.randrange(numberOfRules)].properties[0].value = random.choice(["A", "B", "C"])
+
+    return document.fingerprint
+
+
+t3 = timeit.timeit(edit, number=10) / 10
+
+print("{0} style rules: exporting and hashing {1:.3f}s, first fingerprint {2:.3f}s, fingerprint after changing a property {3:.4f}s".format(numberOfRules, t1, t2, t3))
@@ -0,0 +1,62 @@
+from morph.core import *
+from morph.frozen import *
+
+import copy
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(2000)]
+propertyNames = ["font-name", "font-height", "font-weight", "font-colour", "line-height", "text-alignment", "page-size"]
+
+
+def makeStyleRule():
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+    sr.properties = [MProperty(random.choice(propertyNames), random.choice(["A", "B", "C"])) for i in range(2)]
+
+    return sr
+
+
+document = MDocument()
+document.styleRules = [makeStyleRule() for i in range(numberOfRules)]
+
+t1 = min(timeit.repeat(lambda: copy.deepcopy(document), number=1, repeat=3))
+
+f = document.freeze()
+
+
+def freezeAfterChange():
+    document.styleRules[random.randrange(numberOfRules)].properties[0].value = random.choice(["A", "B", "C"])
+
+    return document.freeze()
+
+
+def evolve():
+    i = random.randrange(numberOfRules)
+    sr = f.styleRules[i].evolve(properties=[MProperty("font-name", "D")])
+
+    return f.evolve(styleRules=f.styleRules[:i] + (sr,) + f.styleRules[i + 1:])
+
+
+def freezeFromScratch():
+    for sr in document.styleRules:
+        sr._frozen = None
+
+    return document.freeze()
+
+
+t2 = min(timeit.repeat(freezeFromScratch, number=1, repeat=3))
+t3 = min(timeit.repeat(freezeAfterChange, number=1, repeat=5))
+t4 = min(timeit.repeat(evolve, number=1, repeat=5))
+
+print("{0} style rules".format(numberOfRules))
+print("copy.deepcopy: {0:.3f}s".format(t1))
+print("Freezing: {0:.3f}s".format(t2))
+print("Freezing again after changing one style rule: {0:.4f}s".format(t3))
+print("Evolving one style rule: {0:.4f}s".format(t4))
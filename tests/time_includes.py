@@ -0,0 +1,43 @@
+from morph.core import *
+from morph.includes import *
+
+import os
+import shutil
+import tempfile
+import timeit
+
+numberOfFiles = 100
+numberOfRules = 20
+
+directory = tempfile.mkdtemp()
+
+try:
+    # A main file that includes a tree of files, each of which includes the 
+    # next few files.
+    for i in range(numberOfFiles):
+        lines = ["@include \"{0}.morph\";".format(j) for j in range(i * 3 + 1, min(i * 3 + 4, numberOfFiles))]
+        lines += ["p.c{0}-{1} {{ font-name: A; font-height: 12pt; }}".format(i, j) for j in range(numberOfRules)]
+
+        with open(os.path.join(directory, "{0}.morph".format(i)), "w") as fo:
+            fo.write("\n".join(lines))
+
+    resolver = MIncludeResolver()
+    path = os.path.join(directory, "0.morph")
+
+    t1 = timeit.timeit(lambda: resolver.importFile(path), number=1)
+    t2 = timeit.timeit(lambda: resolver.importFile(path), number=1)
+
+    leaf = os.path.join(directory, "{0}.morph".format(numberOfFiles - 1))
+
+    with open(leaf, "a") as fo:
+        fo.write("\nh1 { font-height: 20pt; }")
+
+    s = os.stat(leaf)
+    os.utime(leaf, ns=(s.st_atime_ns, s.st_mtime_ns + 1000000000))
+
+    parseCount = resolver.parseCount
+    t3 = timeit.timeit(lambda: resolver.importFile(path), number=1)
+
+    print("{0} files: first import {1:.3f}s, unchanged {2:.4f}s, after changing a leaf file {3:.4f}s ({4} file parsed)".format(numberOfFiles, t1, t2, t3, resolver.parseCount - parseCount))
+finally:
+    shutil.rmtree(directory)
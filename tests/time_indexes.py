@@ -0,0 +1,47 @@
+from morph.core import *
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(2000)]
+propertyNames = ["font-name", "font-height", "font-weight", "font-colour", "line-height", "text-alignment", "page-size"]
+
+document = MDocument()
+
+for i in range(numberOfRules):
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+    sr.properties = [MProperty(random.choice(propertyNames), "A")]
+
+    document.styleRules.append(sr)
+
+
+def scan():
+    a = [sr for sr in document.styleRules if any("{0}".format(s) == ".c123" for s in sr.selectors)]
+    b = [sr for sr in document.styleRules if any(p.name == "page-size" for p in sr.properties)]
+
+    return a, b
+
+
+def query():
+    a = document.getStyleRulesBySelector(".c123")
+    b = document.getStyleRulesByPropertyName("page-size")
+
+    return a, b
+
+
+t1 = timeit.timeit(scan, number=1)
+t2 = timeit.timeit(query, number=1)
+t3 = timeit.timeit(query, number=100) / 100
+
+document.styleRules[500].selectors = [MClassSelector("c123")]
+
+t4 = timeit.timeit(query, number=1)
+
+print("{0} style rules: scanning {1:.3f}s, building the indexes {2:.3f}s, querying {3:.6f}s, querying after changing a style rule {4:.6f}s".format(numberOfRules, t1, t2, t3, t4))
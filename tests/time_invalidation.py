@@ -0,0 +1,49 @@
+from morph.core import *
+from morph.elements import *
+from morph.invalidation import *
+from tests.fixtures import makeWideElements
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 10000
+numberOfElements = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(2000)]
+
+
+def makeStyleRule(i):
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+
+    if random.random() < 0.3:
+        sr.selectors = [MClassSelector(random.choice(classNames)), MSubelementSelector()] + sr.selectors
+
+    sr.properties = [MProperty("font-height", "{0}pt".format(i % 20 + 8))]
+
+    return sr
+
+
+document1 = MDocument()
+document1.styleRules = [makeStyleRule(i) for i in range(numberOfRules)]
+
+# The same document with one style rule changed.
+document2 = MDocument()
+document2.styleRules = list(document1.styleRules)
+document2.styleRules[numberOfRules // 2] = makeStyleRule(0)
+
+root = makeWideElements(numberOfElements, elementNames, classNames)
+
+tree = MStyledTree(document1, root)
+
+t = timeit.timeit(lambda: MStyledTree(document2, root), number=1)
+
+print("Restyling {0} elements from scratch: {1:.3f}s".format(numberOfElements, t))
+
+t = timeit.timeit(lambda: tree.setDocument(document2), number=1)
+
+print("Restyling {0} elements after changing one style rule: {1:.3f}s ({2} elements restyled)".format(numberOfElements, t, tree.lastRestyleCount))
@@ -0,0 +1,51 @@
+from morph.core import *
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfDocuments = 100
+numberOfRules = 500
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(100)]
+propertyNames = ["font-name", "font-height", "font-weight", "font-colour", "line-height", "text-alignment"]
+
+
+def makeStyleRule():
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+    sr.properties = [MProperty(random.choice(propertyNames), random.choice(["A", "B", "C"])) for i in range(3)]
+
+    return sr
+
+
+# Sheets layered on top of each other mostly repeat each other, with a few 
+# changes each.
+base = [makeStyleRule() for i in range(numberOfRules)]
+documents = []
+
+for i in range(numberOfDocuments):
+    d = MDocument()
+
+    for sr in base:
+        if random.random() < 0.1:
+            sr = makeStyleRule()
+
+        copy = MStyleRule()
+        copy.selectors = list(sr.selectors)
+        copy.properties = [MProperty(p.name, p.value) for p in sr.properties]
+
+        d.styleRules.append(copy)
+
+    documents.append(d)
+
+numberOfStyleRules = sum([len(d.styleRules) for d in documents])
+
+for collapse in [False, True]:
+    t = timeit.timeit(lambda: MDocument.merge(*documents, collapse=collapse), number=1)
+    merged = MDocument.merge(*documents, collapse=collapse)
+
+    print("Merging {0} documents, collapse={1}: {2:.3f}s, {3} style rules down to {4}".format(numberOfDocuments, collapse, t, numberOfStyleRules, len(merged.styleRules)))
@@ -0,0 +1,37 @@
+from morph.core import *
+from morph.optimisation import *
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(2000)]
+propertyNames = ["font-name", "font-height", "font-weight", "font-colour", "line-height", "text-alignment", "page-size"]
+
+
+def makeStyleRule():
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+    sr.properties = [MProperty(random.choice(propertyNames), random.choice(["A", "B", "C"])) for i in range(random.randint(0, 3))]
+
+    return sr
+
+
+document = MDocument()
+document.styleRules = [makeStyleRule() for i in range(numberOfRules)]
+
+t = min(timeit.repeat(lambda: optimiseDocument(document), number=1, repeat=5))
+result = optimiseDocument(document)
+
+numberOfProperties = sum([len(sr.properties) for sr in document.styleRules])
+t1 = len(exportMorphDocument(document))
+t2 = len(exportMorphDocument(result.document, groupSelectors=True))
+
+print("{0} style rules, {1} properties: {2:.3f}s".format(numberOfRules, numberOfProperties, t))
+print("Removed {0} style rules and {1} properties, grouped {2} style rules".format(result.removedStyleRuleCount, result.removedPropertyCount, result.groupedStyleRuleCount))
+print("Exported text: {0} characters before, {1} after".format(t1, t2))
@@ -0,0 +1,62 @@
+from morph.core import *
+from morph.elements import *
+from morph.parallel import *
+from morph.resolution import *
+from tests.fixtures import makePagedElements
+
+import os
+import random
+import timeit
+
+numberOfRules = 5000
+numberOfElements = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(1000)]
+
+
+def makeCompound():
+    compound = [MClassSelector(random.choice(classNames))]
+
+    if random.random() < 0.5:
+        compound.insert(0, MElementNameSelector(random.choice(elementNames)))
+
+    return compound
+
+
+def makeDocument():
+    d = MDocument()
+
+    for i in range(numberOfRules):
+        sr = MStyleRule()
+
+        sr.selectors = makeCompound()
+
+        if random.random() < 0.5:
+            sr.selectors = makeCompound() + [MSubelementSelector()] + sr.selectors
+
+        sr.properties = [MProperty("font-height", "{0}pt".format(i % 20 + 8))]
+
+        d.styleRules.append(sr)
+
+    return d
+
+
+if __name__ == "__main__":
+    random.seed(1)
+
+    document = makeDocument()
+    root = makePagedElements(numberOfElements, elementNames, classNames)
+
+    t = timeit.timeit(lambda: MStyleResolver(document).resolveTree(root), number=1)
+
+    print("Serial: {0:.3f}s".format(t))
+
+    print("{0} CPUs".format(os.cpu_count()))
+
+    # Worker counts above the number of CPUs are timed too, but can't be 
+    # faster than the serial resolver.
+    for workers in [1, 2, 4, 8]:
+        t = timeit.timeit(lambda: resolveTreeInParallel(document, root, workers), number=1)
+
+        print("{0} workers: {1:.3f}s".format(workers, t))
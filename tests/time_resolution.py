@@ -0,0 +1,131 @@
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+from tests.fixtures import makeWideElements
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 10000
+numberOfElements = 100000
+numberOfNaiveElements = 100
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(2000)]
+ids = ["i{0}".format(i) for i in range(5000)]
+
+
+def makeCompound():
+    compound = []
+
+    if random.random() < 0.5:
+        compound.append(MElementNameSelector(random.choice(elementNames)))
+    if random.random() < 0.95 or not compound:
+        compound.append(MClassSelector(random.choice(classNames)))
+    if random.random() < 0.1:
+        compound.append(MIdSelector(random.choice(ids)))
+
+    return compound
+
+
+def makeDocument():
+    d = MDocument()
+
+    for i in range(numberOfRules):
+        sr = MStyleRule()
+
+        sr.selectors = makeCompound()
+
+        if random.random() < 0.3:
+            sr.selectors = makeCompound() + [MSubelementSelector()] + sr.selectors
+
+        sr.properties = [MProperty("font-height", "{0}pt".format(i % 20 + 8))]
+
+        d.styleRules.append(sr)
+
+    return d
+
+
+document = makeDocument()
+root = makeWideElements(numberOfElements, elementNames, classNames, ids)
+elements = list(iterateElements(root))
+
+resolver = MStyleResolver(document)
+
+t = timeit.timeit(lambda: [resolver.getMatchingRules(e) for e in elements], number=1)
+
+print("Indexed: {0} elements x {1} rules in {2:.3f}s".format(len(elements), numberOfRules, t))
+
+sample = elements[:numberOfNaiveElements]
+
+t = timeit.timeit(lambda: [[sr for sr in document.styleRules if resolver.matches(e, sr)] for e in sample], number=1)
+
+print("Naive: {0} elements x {1} rules in {2:.3f}s (about {3:.1f}s for {4} elements)".format(len(sample), numberOfRules, t, t * len(elements) / len(sample), len(elements)))
+
+
+def makeRepetitiveElements():
+    root = MElement("div")
+
+    while True:
+        section = root.addSubelement(MElement("section", "", ["c1"]))
+
+        for i in range(10):
+            p = section.addSubelement(MElement("p", "", ["c2", "c3"] if i % 2 == 0 else ["c4"]))
+            p.addSubelement(MElement("span", "", ["c5"]))
+
+            if len(root.subelements) * 21 >= numberOfElements:
+                return root
+
+
+root = makeRepetitiveElements()
+
+for cacheSize in [0, 10000]:
+    resolver = MStyleResolver(document, cacheSize)
+
+    t = timeit.timeit(lambda: resolver.resolveTree(root), number=1)
+
+    print("Repetitive: resolved {0} elements in {1:.3f}s with a cache size of {2} (hit rate {3:.3f})".format(numberOfElements, t, cacheSize, resolver.styleCache.hitRate))
+
+
+def makeDescendantDocument():
+    d = MDocument()
+
+    for i in range(numberOfRules):
+        sr = MStyleRule()
+
+        sr.selectors = makeCompound() + [MSubelementSelector()] + makeCompound() + [MSubelementSelector()] + makeCompound()
+        sr.properties = [MProperty("font-height", "{0}pt".format(i % 20 + 8))]
+
+        d.styleRules.append(sr)
+
+    return d
+
+
+def makeDeepElements(n, depth):
+    root = MElement("div")
+    element = root
+
+    for i in range(n - 1):
+        if i % depth == 0:
+            element = root
+
+        classes = random.sample(classNames, random.randint(0, 2))
+        element = element.addSubelement(MElement(random.choice(elementNames), "", classes))
+
+    return root
+
+
+document = makeDescendantDocument()
+numberOfDeepElements = 5000
+depth = 200
+
+root = makeDeepElements(numberOfDeepElements, depth)
+
+for useAncestorFilter in [False, True]:
+    resolver = MStyleResolver(document, 0, useAncestorFilter)
+
+    t = timeit.timeit(lambda: resolver.resolveTree(root), number=1)
+
+    print("Deep: resolved {0} elements nested {1} deep against {2} descendant rules in {3:.3f}s {4} an ancestor filter".format(numberOfDeepElements, depth, numberOfRules, t, "with" if useAncestorFilter else "without"))
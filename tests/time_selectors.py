@@ -0,0 +1,22 @@
+from morph.core import *
+from morph.elements import *
+from morph.selectors import *
+
+import timeit
+
+n = 100000
+
+root = MElement("div", "", ["main"])
+section = root.addSubelement(MElement("section", "", ["chapter"]))
+p = section.addSubelement(MElement("p", "big", ["red", "main"]))
+
+for text in ["p", "p.red.main", "p.blue", "div.main section p.red", "table p"]:
+    selectors = MImporter()._getSelectorSets(text, MMarker())[0]
+
+    compounds = splitSelectors(selectors)
+    match = compileSelectors(selectors)
+
+    t1 = timeit.timeit(lambda: matchesCompoundSelectors(p, compounds), number=n)
+    t2 = timeit.timeit(lambda: match(p), number=n)
+
+    print("'{0}': {1:.0f} matches per second interpreted, {2:.0f} matches per second compiled".format(text, n / t1, n / t2))
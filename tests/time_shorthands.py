@@ -0,0 +1,99 @@
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+from morph.shorthands import *
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 1000
+numberOfElements = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(200)]
+units = ["pt", "mm", "cm", "in"]
+
+
+def makeLengthSet():
+    ls = MLengthSet()
+
+    ls.lengths = [MLength(str(random.randint(1, 20)), random.choice(units)) for i in range(random.randint(1, 4))]
+
+    return ls
+
+
+document = MDocument()
+
+for i in range(numberOfRules):
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+    sr.properties = [MProperty("margin", makeLengthSet()), MProperty("padding", makeLengthSet())]
+
+    document.styleRules.append(sr)
+
+root = MElement("body")
+
+for i in range(numberOfElements):
+    root.addSubelement(MElement(random.choice(elementNames), "", [random.choice(classNames)]))
+
+elements = [root] + root.subelements
+
+
+def getBoxesFromShorthands(styles):
+    """
+    Works out the margins and padding of each element from the shorthand
+    properties, as a renderer would without the compile stage.
+    """
+    boxes = []
+
+    for e in elements:
+        properties = styles[e].cascadedProperties
+        box = []
+
+        for name in ("margin", "padding"):
+            value = properties.get(name)
+
+            if value == None:
+                box += [0.0, 0.0, 0.0, 0.0]
+            else:
+                box += getSideValues([l.toPoints() for l in value.lengths])
+
+        boxes.append(box)
+
+    return boxes
+
+
+longhandNames = shorthandProperties["margin"] + shorthandProperties["padding"]
+
+
+def getBoxesFromLonghands(styles):
+    """
+    Works out the margins and padding of each element from the expanded
+    longhand properties.
+    """
+    boxes = []
+
+    for e in elements:
+        properties = styles[e].cascadedProperties
+        boxes.append([properties[n].points if n in properties else 0.0 for n in longhandNames])
+
+    return boxes
+
+
+expandedDocument = expandShorthands(document)
+
+shorthandStyles = MStyleResolver(document).resolveTree(root)
+longhandStyles = MStyleResolver(expandedDocument).resolveTree(root)
+
+assert getBoxesFromShorthands(shorthandStyles) == getBoxesFromLonghands(longhandStyles)
+
+t0 = min(timeit.repeat(lambda: expandShorthands(document), number=1, repeat=5))
+t1 = min(timeit.repeat(lambda: getBoxesFromShorthands(shorthandStyles), number=1, repeat=5))
+t2 = min(timeit.repeat(lambda: getBoxesFromLonghands(longhandStyles), number=1, repeat=5))
+
+print("Expanding {0} style rules: {1:.4f}s".format(numberOfRules, t0))
+print("Boxes of {0} elements from shorthands: {1:.3f}s".format(numberOfElements, t1))
+print("Boxes of {0} elements from longhands: {1:.3f}s".format(numberOfElements, t2))
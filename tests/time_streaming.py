@@ -0,0 +1,89 @@
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+from morph.streaming import *
+
+import random
+import timeit
+import tracemalloc
+
+random.seed(1)
+
+numberOfRules = 1000
+numberOfElements = 100000
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+classNames = ["c{0}".format(i) for i in range(200)]
+
+document = MDocument()
+
+for i in range(numberOfRules):
+    sr = MStyleRule()
+
+    sr.selectors = [MElementNameSelector(random.choice(elementNames)), MClassSelector(random.choice(classNames))]
+
+    if random.random() < 0.2:
+        sr.selectors = [MClassSelector(random.choice(classNames)), MSubelementSelector()] + sr.selectors
+
+    sr.properties = [MProperty("font-height", "{0}pt".format(i % 20 + 8))]
+
+    document.styleRules.append(sr)
+
+
+def makeEvents():
+    """
+    Generates the events for a document with sections of paragraphs, 
+    without ever holding the whole document.
+    """
+    r = random.Random(2)
+
+    yield ("start", "body", "", [])
+
+    for i in range(numberOfElements // 100):
+        yield ("start", "section", "", [r.choice(classNames)])
+
+        for j in range(99):
+            yield ("start", r.choice(elementNames), "", r.sample(classNames, r.randint(0, 2)))
+            yield ("end",)
+
+        yield ("end",)
+
+    yield ("end",)
+
+
+def styleStream():
+    styler = MStreamingStyler(document)
+
+    for element, style in styler.styleEvents(makeEvents()):
+        pass
+
+
+def styleTree():
+    root = None
+    stack = []
+
+    for event in makeEvents():
+        if event[0] == "start":
+            element = MElement(*event[1:])
+
+            if stack:
+                stack[-1].addSubelement(element)
+            else:
+                root = element
+
+            stack.append(element)
+        else:
+            stack.pop()
+
+    MStyleResolver(document).resolveTree(root)
+
+
+for name, f in [("streaming", styleStream), ("tree", styleTree)]:
+    tracemalloc.start()
+
+    t = timeit.timeit(f, number=1)
+    peak = tracemalloc.get_traced_memory()[1]
+
+    tracemalloc.stop()
+
+    print("{0} elements, {1}: {2:.3f}s, peak memory {3:.1f} MB".format(numberOfElements, name, t, peak / 1e6))
@@ -0,0 +1,44 @@
+from morph.core import *
+from morph.elements import *
+from morph.resolution import *
+
+import timeit
+import tracemalloc
+
+# A deep document where every element has a different signature, but only a 
+# few elements set inherited properties.
+document = importMorphDocument("""
+
+body { font-name: Arial; font-colour: black; line-height: 14pt; font-height: 12pt; text-alignment: left; }
+.note { font-colour: grey; }
+.c0 { page-width: 21cm; }
+
+""")
+
+for n in [1000, 10000, 100000]:
+    root = MElement("body")
+    element = root
+
+    for i in range(n - 1):
+        # Keep the nesting to a few hundred levels.
+        if i % 500 == 0:
+            element = root
+
+        element = element.addSubelement(MElement("div", "", ["c{0}".format(i % 7)] + (["note"] if i % 1000 == 1 else [])))
+
+    tracemalloc.start()
+
+    resolver = MStyleResolver(document, 0)
+    styles = resolver.resolveTree(root)
+
+    for style in styles.values():
+        style.getPropertyValue("font-colour")
+
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t = timeit.timeit(lambda: [s.getPropertyValue("line-height") for s in styles.values()], number=1)
+
+    tables = len(set([id(s._getInheritedValues()) for s in styles.values()]))
+
+    print("{0} elements: {1:.0f} bytes per element, {2} tables of inherited values, {3:.0f} inherited lookups per second".format(n, size / n, tables, n / t))
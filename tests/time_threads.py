@@ -0,0 +1,59 @@
+from morph.core import *
+from morph.parallel import *
+
+import os
+import random
+import sys
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+# Run this with a normal build and a free-threaded build of CPython, such as
+# python3.13 and python3.13t, to compare them.
+
+random.seed(1)
+
+numberOfDocuments = 64
+numberOfRules = 100
+
+elementNames = ["p", "div", "section", "span", "h1", "h2", "h3", "ul", "li", "table"]
+propertyNames = ["font-name", "font-height", "font-weight", "line-height", "text-alignment", "page-size"]
+
+
+def makeDocument():
+    styleRules = []
+
+    for i in range(numberOfRules):
+        selectors = "{0}.c{1}".format(random.choice(elementNames), random.randrange(200))
+        properties = " ".join(["{0}: {1};".format(random.choice(propertyNames), random.choice(["A", "B", "12pt"])) for j in range(3)])
+
+        styleRules.append("{0} {{ {1} }}".format(selectors, properties))
+
+    return "\n".join(styleRules)
+
+
+documents = [makeDocument() for i in range(numberOfDocuments)]
+
+
+def importSerially():
+    return [importMorphDocument(d) for d in documents]
+
+
+def importInProcesses(workers):
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(importMorphDocument, documents))
+
+
+if __name__ == "__main__":
+    print("Python {0}, GIL {1}, {2} CPUs".format(sys.version.split()[0], "enabled" if isGILEnabled() else "disabled", os.cpu_count()))
+    print("{0} documents of {1} style rules".format(numberOfDocuments, numberOfRules))
+
+    t = min(timeit.repeat(importSerially, number=1, repeat=3))
+    print("Serial: {0:.3f}s".format(t))
+
+    for workers in [1, 2, 4, 8]:
+        t = min(timeit.repeat(lambda: importMorphDocumentsInParallel(documents, workers), number=1, repeat=3))
+        print("{0} threads: {1:.3f}s".format(workers, t))
+
+    for workers in [2, 4]:
+        t = min(timeit.repeat(lambda: importInProcesses(workers), number=1, repeat=3))
+        print("{0} processes: {1:.3f}s".format(workers, t))
@@ -0,0 +1,49 @@
+from morph.core import *
+from morph.validation import *
+
+import random
+import timeit
+
+random.seed(1)
+
+numberOfRules = 10000
+
+values = [
+    ("font-name", "Times New Roman"),
+    ("font-height", "12pt"),
+    ("font-weight", "bold"),
+    ("font-weight", "700"),
+    ("font-colour", "red"),
+    ("font-color", "#336699"),
+    ("line-height", "14pt"),
+    ("text-alignment", "left"),
+    ("page-size", "a4"),
+    ("page-width", "210mm"),
+    ("font-sise", "12pt"),
+    ("font-height", "large"),
+]
+
+text = "\n".join(["p.c{0} {{ {1} }}".format(i, " ".join(["{0}: {1};".format(*random.choice(values)) for j in range(8)])) for i in range(numberOfRules)])
+
+document = importMorphDocument(text)
+
+# Importing is much slower than validating, so use a smaller document to 
+# compare validating while importing with validating afterwards.
+validText = "\n".join(["p.c{0} {{ {1} }}".format(i, " ".join(["{0}: {1};".format(*random.choice(values[:10])) for j in range(8)])) for i in range(numberOfRules // 10)])
+
+numberOfProperties = sum([len(sr.properties) for sr in document.styleRules])
+
+validator = MValidator()
+
+n = 10
+
+t = timeit.timeit(lambda: validator.validateDocument(document), number=n) / n
+
+print("{0} properties: {1:.3f}s, {2:.0f} properties per second, {3} errors".format(numberOfProperties, t, numberOfProperties / t, len(validator.validateDocument(document))))
+
+# The two take about as long, so take the fastest of a few runs of each, 
+# which is less affected by anything else running at the time.
+t1 = min(timeit.repeat(lambda: validateDocument(importMorphDocument(validText)), number=1, repeat=5))
+t2 = min(timeit.repeat(lambda: importMorphDocument(validText, True), number=1, repeat=5))
+
+print("Importing then validating a valid document: {0:.3f}s, validating while importing: {1:.3f}s".format(t1, t2))